@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .busqueda import registrar_funciones_sqlite
+
+        connection_created.connect(registrar_funciones_sqlite, dispatch_uid="core_funciones_sqlite")
@@ -0,0 +1,191 @@
+import threading
+import time
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .busqueda import normalizar_texto
+from .formato import valor_plano
+from .models import Compras, ComprasDetalle, Contactos, Productos, Ventas, VentasDetalle
+from .versiones import incrementar_version, obtener_version
+
+# ============================================================
+# Autocompletado
+# ============================================================
+
+# Cada proceso arma en memoria un indice de prefijos por catalogo: la lista
+# ordenada de palabras normalizadas (sin acentos, minusculas) de los campos de
+# busqueda, recorrida con bisect. Las entradas se guardan ordenadas por uso
+# reciente en Ventas y Compras (su posicion es el ranking), y la busqueda las
+# recorre en ese orden y corta al llegar al limite:
+#   - prefijo selectivo (hasta COINCIDENCIAS_A_ORDENAR palabras): se ordenan
+#     solo las posiciones del rango de bisect.
+#   - prefijo corto o comun: se recorren las entradas desde la primera; como
+#     muchas coinciden, el limite se junta enseguida.
+#
+# El indice se reconstruye cuando cambia la version del catalogo (ver
+# core.versiones, en la cache compartida por todos los workers; la cambian
+# signals al modificar un Contacto o Producto) o cuando pasan TTL_USO
+# segundos, para refrescar el ranking.
+
+DIAS_USO = 90
+TTL_USO = 600
+COINCIDENCIAS_A_ORDENAR = 256
+
+
+def version_catalogo(nombre):
+    return obtener_version(f"autocompletado:{nombre}")
+
+
+def invalidar_catalogo(nombre):
+    incrementar_version(f"autocompletado:{nombre}")
+
+
+class IndicePrefijos:
+    def __init__(self, entradas, textos):
+        self.entradas = entradas
+        self.palabras_entrada = [set(texto.split()) for texto in textos]
+        pares = sorted(
+            (palabra, posicion)
+            for posicion, palabras in enumerate(self.palabras_entrada)
+            for palabra in palabras
+        )
+        self.palabras = [palabra for palabra, _ in pares]
+        self.posiciones = [posicion for _, posicion in pares]
+
+    def _con_prefijo(self, prefijo):
+        # Posiciones de las entradas con alguna palabra que empieza con `prefijo`, en orden de ranking
+        inicio = bisect_left(self.palabras, prefijo)
+        fin = bisect_left(self.palabras, prefijo[:-1] + chr(ord(prefijo[-1]) + 1), inicio)
+        if fin - inicio <= COINCIDENCIAS_A_ORDENAR:
+            yield from sorted(set(self.posiciones[inicio:fin]))
+            return
+        for posicion, palabras in enumerate(self.palabras_entrada):
+            if any(palabra.startswith(prefijo) for palabra in palabras):
+                yield posicion
+
+    def buscar(self, texto, limite, filtro=None):
+        consulta = normalizar_texto(texto).split()
+        if not consulta:
+            return []
+        # La palabra mas larga es la mas selectiva
+        principal = max(consulta, key=len)
+        resto = [palabra for palabra in consulta if palabra != principal]
+
+        resultados = []
+        for posicion in self._con_prefijo(principal):
+            entrada = self.entradas[posicion]
+            palabras = self.palabras_entrada[posicion]
+            if not all(any(p.startswith(prefijo) for p in palabras) for prefijo in resto):
+                continue
+            if filtro is not None and not filtro(entrada):
+                continue
+            resultados.append(entrada)
+            if len(resultados) >= limite:
+                break
+        return resultados
+
+
+class Catalogo:
+    modelo = None
+    campos_busqueda = []
+    campos_salida = []
+    filtros = []
+
+    def usos(self, desde):
+        return {}
+
+    def construir(self):
+        desde = timezone.localdate() - timedelta(days=DIAS_USO)
+        usos = self.usos(desde)
+        filas = [
+            {campo: valor_plano(valor) for campo, valor in fila.items()}
+            for fila in self.modelo.objects.filter(activo=True).values(*self.campos_salida)
+        ]
+        filas.sort(key=lambda fila: (-usos.get(fila["id"], 0), normalizar_texto(fila["nombre"]), fila["id"]))
+        textos = [
+            normalizar_texto(" ".join(fila[campo] or "" for campo in self.campos_busqueda))
+            for fila in filas
+        ]
+        return IndicePrefijos(filas, textos)
+
+    def filtro(self, params):
+        condiciones = {campo: params[campo] for campo in self.filtros if params.get(campo)}
+        if not condiciones:
+            return None
+        return lambda fila: all(str(fila[campo]) == valor for campo, valor in condiciones.items())
+
+
+def _contar(queryset, campo):
+    return {
+        fila[campo]: fila["usos"]
+        for fila in queryset.values(campo).annotate(usos=Count("id")).order_by()
+    }
+
+
+def _sumar(*conteos):
+    total = {}
+    for conteo in conteos:
+        for clave, cantidad in conteo.items():
+            total[clave] = total.get(clave, 0) + cantidad
+    return total
+
+
+class CatalogoContactos(Catalogo):
+    modelo = Contactos
+    campos_busqueda = ["nombre", "nombre_fantasia"]
+    campos_salida = ["id", "nombre", "nombre_fantasia", "tipo"]
+    filtros = ["tipo"]
+
+    def usos(self, desde):
+        return _sumar(
+            _contar(Ventas.objects.filter(fecha_venta__gte=desde), "cliente"),
+            _contar(Compras.objects.filter(fecha_compra__gte=desde), "proveedor"),
+        )
+
+
+class CatalogoProductos(Catalogo):
+    modelo = Productos
+    campos_busqueda = ["nombre"]
+    campos_salida = [
+        "id",
+        "nombre",
+        "rubro",
+        "unidad_medida",
+        "precio_minorista",
+        "precio_mayorista",
+        "precio_mayorista_exclusivo",
+        "precio_oferta",
+    ]
+    filtros = ["rubro"]
+
+    def usos(self, desde):
+        return _sumar(
+            _contar(VentasDetalle.objects.filter(venta__fecha_venta__gte=desde), "producto"),
+            _contar(ComprasDetalle.objects.filter(compra__fecha_compra__gte=desde), "producto"),
+        )
+
+
+CATALOGOS = {
+    "contactos": CatalogoContactos(),
+    "productos": CatalogoProductos(),
+}
+
+_indices = {}
+_lock = threading.Lock()
+
+
+def obtener_indice(nombre):
+    version = version_catalogo(nombre)
+    actual = _indices.get(nombre)
+    if actual is not None and actual[0] == version and time.monotonic() - actual[1] < TTL_USO:
+        return actual[2]
+
+    with _lock:
+        actual = _indices.get(nombre)
+        if actual is None or actual[0] != version or time.monotonic() - actual[1] >= TTL_USO:
+            actual = (version, time.monotonic(), CATALOGOS[nombre].construir())
+            _indices[nombre] = actual
+    return actual[2]
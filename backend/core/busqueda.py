@@ -0,0 +1,73 @@
+import unicodedata
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Func, Q, TextField, Value, When
+from django.db.models.functions import Greatest, Lower
+
+# ============================================================
+# Busqueda por nombre
+# ============================================================
+
+# Los listados buscan sobre lower(sin_acentos(campo)):
+#   - PostgreSQL: indices GIN con gin_trgm_ops sobre esa expresion (migracion
+#     0028). Coincide por subcadena (LIKE) o por similitud de palabra (<%,
+#     tolera errores de tipeo) y ordena por word_similarity.
+#   - SQLite (tests): sin_acentos se registra como funcion de Python al abrir
+#     la conexion; coincide por subcadena y ordena prefijos primero.
+
+
+def quitar_acentos(texto):
+    if texto is None:
+        return None
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+
+def normalizar_texto(texto):
+    return " ".join(quitar_acentos(texto or "").lower().split())
+
+
+class SinAcentos(Func):
+    function = "sin_acentos"
+    output_field = TextField()
+
+
+def expresion_busqueda(campo):
+    return Lower(SinAcentos(F(campo)))
+
+
+def registrar_funciones_sqlite(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        connection.connection.create_function("sin_acentos", 1, quitar_acentos, deterministic=True)
+
+
+def filtrar_busqueda(queryset, texto, campos):
+    """Filtra por `texto` en `campos` y anota `relevancia` (mayor = mejor)."""
+    texto = normalizar_texto(texto)
+    if not texto:
+        return queryset
+
+    alias = {f"_busqueda_{i}": expresion_busqueda(campo) for i, campo in enumerate(campos)}
+    queryset = queryset.alias(**alias)
+
+    filtro = Q()
+    puntajes = []
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        for nombre, expresion in alias.items():
+            filtro |= Q(**{f"{nombre}__contains": texto})
+            filtro |= Q(**{f"{nombre}__trigram_word_similar": texto})
+            puntajes.append(TrigramWordSimilarity(texto, expresion))
+    else:
+        for nombre in alias:
+            filtro |= Q(**{f"{nombre}__contains": texto})
+            puntajes.append(Case(
+                When(**{f"{nombre}__startswith": texto}, then=Value(1.0)),
+                When(**{f"{nombre}__contains": texto}, then=Value(0.5)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ))
+
+    relevancia = Greatest(*puntajes) if len(puntajes) > 1 else puntajes[0]
+    return queryset.filter(filtro).annotate(relevancia=relevancia)
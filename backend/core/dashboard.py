@@ -0,0 +1,174 @@
+import atexit
+import calendar
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+
+from .versiones import incrementar_version, obtener_version
+
+# ============================================================
+# Cache del dashboard
+# ============================================================
+
+# La respuesta de DashboardView se guarda por conjunto de filtros. La clave
+# lleva la version de los datos (incrementada por signals al escribir ventas,
+# compras, cobros, pagos, notas de credito, sus hijos o contactos) y la fecha
+# del dia, porque `hoy` define los buckets de vencimiento. Las entradas de
+# versiones viejas no se vuelven a leer y expiran con TTL_DASHBOARD.
+
+TTL_DASHBOARD = 300
+VERSION_DASHBOARD = "dashboard"
+
+
+def version_dashboard():
+    return obtener_version(VERSION_DASHBOARD)
+
+
+def invalidar_dashboard():
+    incrementar_version(VERSION_DASHBOARD)
+
+
+def clave_dashboard(filtros, hoy, version):
+    contenido = json.dumps(filtros, sort_keys=True, default=str)
+    resumen = hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+    return f"dashboard:{version}:{hoy.isoformat()}:{resumen}"
+
+
+def dashboard_cacheado(filtros, hoy, calcular):
+    # La version se lee antes de calcular: si entra una escritura en el medio,
+    # el resultado queda guardado bajo una version que ya nadie pide.
+    clave = clave_dashboard(filtros, hoy, version_dashboard())
+    data = cache.get(clave)
+    if data is None:
+        data = calcular()
+        cache.set(clave, data, TTL_DASHBOARD)
+    return data
+
+
+# ============================================================
+# Secciones en paralelo
+# ============================================================
+
+# Las secciones del dashboard (tarjetas, vencimientos, clientes con deuda,
+# compras pendientes) no dependen entre si. Con DASHBOARD_HILOS > 1 se evaluan
+# en un pool de hilos compartido por el proceso. Cada hilo abre su propia
+# conexion a la base (Django las guarda por hilo) y la conserva entre tareas,
+# sin mirar CONN_MAX_AGE: con el valor por defecto (0) cerrarla al final de
+# cada tarea costaria una conexion nueva por seccion, mas que la seccion.
+# Una conexion con errores se descarta si ya no responde, y al salir el
+# proceso se apaga el pool y se cierran las de sus hilos.
+# Dentro de una transaccion se evaluan en el hilo actual, porque las otras
+# conexiones no verian sus cambios.
+
+_pools = {}
+_conexiones_pool = set()
+_lock_pool = threading.Lock()
+
+
+def _obtener_pool(hilos):
+    with _lock_pool:
+        if hilos not in _pools:
+            _pools[hilos] = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="dashboard")
+        return _pools[hilos]
+
+
+def _descartar_conexiones_rotas():
+    # Lo mismo que close_if_unusable_or_obsolete, sin el vencimiento por CONN_MAX_AGE
+    for conexion in connections.all(initialized_only=True):
+        if conexion.connection is not None and conexion.errors_occurred:
+            if conexion.is_usable():
+                conexion.errors_occurred = False
+            else:
+                conexion.close()
+
+
+def _en_hilo(funcion):
+    _descartar_conexiones_rotas()
+    try:
+        return funcion()
+    finally:
+        with _lock_pool:
+            _conexiones_pool.update(connections.all(initialized_only=True))
+
+
+def cerrar_pools():
+    """Apaga los pools de secciones y cierra las conexiones que abrieron sus hilos."""
+    with _lock_pool:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+    with _lock_pool:
+        conexiones = list(_conexiones_pool)
+        _conexiones_pool.clear()
+    for conexion in conexiones:
+        # Los hilos ya terminaron: se cierran desde este hilo
+        conexion.inc_thread_sharing()
+        try:
+            conexion.close()
+        finally:
+            conexion.dec_thread_sharing()
+
+
+atexit.register(cerrar_pools)
+
+
+def evaluar_secciones(secciones):
+    """Evalua {nombre: funcion} y devuelve {nombre: resultado}, en paralelo si esta habilitado."""
+    hilos = getattr(settings, "DASHBOARD_HILOS", 0)
+    if hilos <= 1 or len(secciones) <= 1 or connection.in_atomic_block:
+        return {nombre: funcion() for nombre, funcion in secciones.items()}
+
+    pool = _obtener_pool(hilos)
+    futuros = {nombre: pool.submit(_en_hilo, funcion) for nombre, funcion in secciones.items()}
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+
+# ============================================================
+# Series del dashboard
+# ============================================================
+
+# /api/dashboard/series/ agrupa por dia, semana (lunes) o mes. Cada periodo se
+# identifica por su primer dia; el periodo anterior de la comparacion son los
+# mismos N periodos corridos hacia atras.
+
+GRANULARIDADES = ["day", "week", "month"]
+PERIODOS_POR_DEFECTO = {"day": 30, "week": 12, "month": 12}
+MAXIMO_PERIODOS = 366
+
+
+def inicio_periodo(fecha, granularidad):
+    if granularidad == "week":
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == "month":
+        return fecha.replace(day=1)
+    return fecha
+
+
+def sumar_periodos(fecha, granularidad, cantidad):
+    if granularidad == "week":
+        return fecha + timedelta(weeks=cantidad)
+    if granularidad == "month":
+        meses = fecha.year * 12 + fecha.month - 1 + cantidad
+        anio, mes = divmod(meses, 12)
+        dia = min(fecha.day, calendar.monthrange(anio, mes + 1)[1])
+        return date(anio, mes + 1, dia)
+    return fecha + timedelta(days=cantidad)
+
+
+def periodos(desde, hasta, granularidad):
+    actual = inicio_periodo(desde, granularidad)
+    fin = inicio_periodo(hasta, granularidad)
+    resultado = []
+    while actual <= fin:
+        resultado.append(actual)
+        if len(resultado) > MAXIMO_PERIODOS:
+            break
+        actual = sumar_periodos(actual, granularidad, 1)
+    return resultado
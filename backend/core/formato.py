@@ -0,0 +1,18 @@
+from datetime import date
+from decimal import Decimal
+
+# ============================================================
+# Valores planos
+# ============================================================
+
+# Los listados planos, el autocompletado y los cursores de la paginacion
+# devuelven filas de .values(): decimales y fechas se pasan al mismo texto que
+# producen los serializers (Decimal como string, fechas en ISO 8601).
+
+
+def valor_plano(valor):
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
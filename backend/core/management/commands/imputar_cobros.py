@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.servicios.imputacion import CLIENTES_POR_LOTE, imputar_cobros, imputar_todos
+
+
+class Command(BaseCommand):
+    help = "Aplica el saldo disponible de los cobros a las ventas abiertas de cada cliente, por vencimiento."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cliente", type=int, action="append", dest="clientes",
+            help="Id del cliente a imputar (se puede repetir; todos si no se indica).",
+        )
+        parser.add_argument(
+            "--tamano-lote", type=int, default=CLIENTES_POR_LOTE, dest="tamano",
+            help=f"Clientes por transaccion (por defecto {CLIENTES_POR_LOTE}).",
+        )
+
+    def handle(self, *args, clientes=None, tamano=CLIENTES_POR_LOTE, **options):
+        if clientes:
+            detalles = len(imputar_cobros(clientes=clientes))
+        else:
+            detalles = imputar_todos(tamano)
+        self.stdout.write(self.style.SUCCESS(f"Cobros imputados: {detalles} aplicaciones."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.dashboard import invalidar_dashboard
+from core.servicios.reconciliacion import TAMANO_BLOQUE, reconciliar_saldos
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara saldo_contacto, saldo_pendiente y saldo_disponible con los calculados desde "
+        "ventas, compras, cobros, pagos y notas de credito."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corregir", action="store_true", help="Guarda el saldo esperado donde difiere.")
+        parser.add_argument(
+            "--tamano-bloque", type=int, default=TAMANO_BLOQUE, dest="tamano",
+            help=f"Filas por bloque (por defecto {TAMANO_BLOQUE}).",
+        )
+
+    def handle(self, *args, corregir=False, tamano=TAMANO_BLOQUE, **options):
+        resultado = reconciliar_saldos(corregir=corregir, tamano=tamano)
+        total = 0
+        for cuenta, diferencias in resultado.items():
+            total += len(diferencias)
+            for diferencia in diferencias:
+                self.stdout.write(
+                    f"{cuenta} #{diferencia.documento}: guardado {diferencia.guardado}, "
+                    f"esperado {diferencia.esperado}"
+                )
+
+        if not total:
+            self.stdout.write(self.style.SUCCESS("Saldos conciliados: sin diferencias."))
+        elif corregir:
+            invalidar_dashboard()
+            self.stdout.write(self.style.SUCCESS(f"Saldos corregidos: {total} diferencias."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{total} diferencias de saldo (usar --corregir para guardarlas)."))
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dashboard import invalidar_dashboard
+from core.servicios.resumen_diario import reconstruir_resumen
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Fecha invalida '{valor}'. Usa YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Reconstruye ResumenDiario desde ventas, compras, cobros y pagos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", type=_fecha, help="Primera fecha a reconstruir (YYYY-MM-DD).")
+        parser.add_argument("--hasta", type=_fecha, help="Ultima fecha a reconstruir (YYYY-MM-DD).")
+
+    def handle(self, *args, desde=None, hasta=None, **options):
+        filas = reconstruir_resumen(desde=desde, hasta=hasta)
+        invalidar_dashboard()
+        self.stdout.write(self.style.SUCCESS(f"ResumenDiario reconstruido: {filas} filas."))
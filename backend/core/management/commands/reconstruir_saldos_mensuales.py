@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.servicios.saldos_mensuales import reconstruir_saldos_mensuales
+
+
+class Command(BaseCommand):
+    help = "Reconstruye SaldoMensual (cierres de cuenta corriente por cliente) desde ventas y cobros."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--contacto", type=int, action="append", dest="contactos",
+            help="Id del cliente a reconstruir (se puede repetir; todos si no se indica).",
+        )
+
+    def handle(self, *args, contactos=None, **options):
+        filas = reconstruir_saldos_mensuales(contactos)
+        self.stdout.write(self.style.SUCCESS(f"SaldoMensual reconstruido: {filas} filas."))
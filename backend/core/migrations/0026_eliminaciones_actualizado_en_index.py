@@ -0,0 +1,68 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_remove_ventas_pedido_compra_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cobros',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='compras',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='contactos',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='notascredito',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='pagos',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='productos',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='usuarios',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='ventas',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='Eliminaciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('objeto_id', models.BigIntegerField()),
+                ('eliminado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Eliminación',
+                'verbose_name_plural': 'Eliminaciones',
+                'indexes': [models.Index(fields=['modelo', 'eliminado_en'], name='eliminaciones_modelo_fecha')],
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_eliminaciones_actualizado_en_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cobros',
+            index=models.Index(fields=['-fecha_cobro', 'id'], name='cobros_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cobros',
+            index=models.Index(fields=['cliente', '-fecha_cobro'], name='cobros_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compras',
+            index=models.Index(fields=['-fecha_compra', 'id'], name='compras_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compras',
+            index=models.Index(fields=['proveedor', '-fecha_compra'], name='compras_proveedor_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compras',
+            index=models.Index(fields=['estado_pago', 'fecha_compra'], name='compras_pago_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compras',
+            index=models.Index(condition=models.Q(('saldo_pendiente__gt', 0), models.Q(('estado_compra', 'cancelada'), _negated=True)), fields=['proveedor', 'fecha_compra'], name='compras_abiertas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactos',
+            index=models.Index(fields=['tipo', 'nombre'], name='contactos_tipo_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactos',
+            index=models.Index(condition=models.Q(('saldo_contacto__gt', 0), ('tipo', 'cliente')), fields=['-saldo_contacto', 'nombre'], name='contactos_deudores_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notascredito',
+            index=models.Index(fields=['contacto', '-fecha_nota'], name='notas_contacto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagos',
+            index=models.Index(fields=['-fecha_pago', 'id'], name='pagos_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagos',
+            index=models.Index(fields=['proveedor', '-fecha_pago'], name='pagos_proveedor_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(fields=['-fecha_venta', 'id'], name='ventas_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(fields=['cliente', '-fecha_venta'], name='ventas_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(fields=['estado_venta', '-fecha_venta'], name='ventas_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(fields=['estado_cobro', 'fecha_venta'], name='ventas_cobro_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(fields=['fecha_entrega'], name='ventas_fecha_entrega_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(condition=models.Q(('saldo_pendiente__gt', 0), models.Q(('estado_venta', 'cancelada'), _negated=True)), fields=['cliente', 'fecha_venta'], name='ventas_abiertas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventas',
+            index=models.Index(condition=models.Q(('saldo_pendiente__gt', 0), ('vencimiento__isnull', False), models.Q(('estado_venta', 'cancelada'), _negated=True)), fields=['vencimiento'], name='ventas_abiertas_venc_idx'),
+        ),
+    ]
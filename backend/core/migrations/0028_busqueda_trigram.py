@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Indices de busqueda solo para PostgreSQL: pg_trgm + unaccent y un indice GIN
+# por columna sobre lower(sin_acentos(col)), la misma expresion que arma
+# core.busqueda.filtrar_busqueda. En otros motores no hace nada.
+
+INDICES = [
+    ("contactos_nombre_trgm_idx", "core_contactos", "nombre"),
+    ("contactos_fantasia_trgm_idx", "core_contactos", "nombre_fantasia"),
+    ("productos_nombre_trgm_idx", "core_productos", "nombre"),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() es STABLE; el indice necesita una funcion IMMUTABLE
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION sin_acentos(text) RETURNS text AS "
+        "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+    for nombre, tabla, columna in INDICES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} "
+            f"USING gin (lower(sin_acentos({columna})) gin_trgm_ops)"
+        )
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for nombre, _, _ in INDICES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {nombre}")
+    schema_editor.execute("DROP FUNCTION IF EXISTS sin_acentos(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0027_indices_listados_dashboard"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
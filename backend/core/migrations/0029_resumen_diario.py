@@ -0,0 +1,134 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:46
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+CERO = Decimal('0')
+
+# tipo -> (modelo, fecha, contacto, estado, estado que no entra)
+DOCUMENTOS = {
+    'venta': ('Ventas', 'fecha_venta', 'cliente_id', 'estado_cobro', {'estado_venta': 'cancelada'}),
+    'compra': ('Compras', 'fecha_compra', 'proveedor_id', 'estado_pago', {'estado_compra': 'cancelada'}),
+}
+
+# tipo -> (modelo, modelo de medios de pago, relacion, fecha, contacto)
+MOVIMIENTOS = {
+    'cobro': ('Cobros', 'CobrosMedioPago', 'cobro', 'fecha_cobro', 'cliente_id'),
+    'pago': ('Pagos', 'PagosMedioPago', 'pago', 'fecha_pago', 'proveedor_id'),
+}
+
+
+def _filas_documentos(apps, tipo):
+    modelo, campo_fecha, campo_contacto, campo_estado, excluidos = DOCUMENTOS[tipo]
+    filas = (
+        apps.get_model('core', modelo).objects
+        .exclude(**excluidos)
+        .values(campo_fecha, campo_contacto, 'forma_pago', campo_estado)
+        .annotate(
+            cantidad=Count('id'),
+            total=Sum('total'),
+            saldo=Sum('saldo_pendiente', filter=Q(saldo_pendiente__gt=0)),
+        )
+        .order_by()
+    )
+    for fila in filas:
+        yield {
+            'fecha': fila[campo_fecha],
+            'contacto_id': fila[campo_contacto],
+            'forma_pago': fila['forma_pago'],
+            'estado': fila[campo_estado],
+            'cantidad': fila['cantidad'],
+            'total': fila['total'] or CERO,
+            'saldo': fila['saldo'] or CERO,
+        }
+
+
+def _filas_movimientos(apps, tipo):
+    # Los movimientos sin medios de pago (legado) se cuentan por su medio_pago
+    modelo, modelo_medios, relacion, campo_fecha, campo_contacto = MOVIMIENTOS[tipo]
+    Medios = apps.get_model('core', modelo_medios)
+    filas = (
+        apps.get_model('core', modelo).objects
+        .annotate(con_medios=Exists(Medios.objects.filter(**{relacion: OuterRef('pk')})))
+        .values(campo_fecha, campo_contacto)
+        .annotate(
+            cantidad=Count('id'),
+            total=Sum('monto'),
+            efectivo=Sum('monto', filter=Q(con_medios=False, medio_pago='efectivo')),
+            transferencia=Sum('monto', filter=Q(con_medios=False, medio_pago='transferencia')),
+        )
+        .order_by()
+    )
+    medios = (
+        Medios.objects
+        .values(f'{relacion}__{campo_fecha}', f'{relacion}__{campo_contacto}')
+        .annotate(
+            efectivo=Sum('monto', filter=Q(medio_pago='efectivo')),
+            transferencia=Sum('monto', filter=Q(medio_pago='transferencia')),
+        )
+        .order_by()
+    )
+    por_medio = {
+        (fila[f'{relacion}__{campo_fecha}'], fila[f'{relacion}__{campo_contacto}']): fila
+        for fila in medios
+    }
+    for fila in filas:
+        medio = por_medio.get((fila[campo_fecha], fila[campo_contacto]), {})
+        yield {
+            'fecha': fila[campo_fecha],
+            'contacto_id': fila[campo_contacto],
+            'cantidad': fila['cantidad'],
+            'total': fila['total'] or CERO,
+            'efectivo': (fila['efectivo'] or CERO) + (medio.get('efectivo') or CERO),
+            'transferencia': (fila['transferencia'] or CERO) + (medio.get('transferencia') or CERO),
+        }
+
+
+def armar_resumen(apps, schema_editor):
+    # El resumen de la historia existente (mismo calculo que reconstruir_resumen),
+    # asi el dashboard no arranca en cero despues del deploy
+    ResumenDiario = apps.get_model('core', 'ResumenDiario')
+    for tipo in DOCUMENTOS:
+        ResumenDiario.objects.bulk_create(
+            [ResumenDiario(tipo=tipo, **fila) for fila in _filas_documentos(apps, tipo)], batch_size=2000,
+        )
+    for tipo in MOVIMIENTOS:
+        ResumenDiario.objects.bulk_create(
+            [ResumenDiario(tipo=tipo, **fila) for fila in _filas_movimientos(apps, tipo)], batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_busqueda_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('tipo', models.CharField(choices=[('venta', 'Venta'), ('compra', 'Compra'), ('cobro', 'Cobro'), ('pago', 'Pago')], max_length=10)),
+                ('forma_pago', models.CharField(blank=True, default='', max_length=50)),
+                ('estado', models.CharField(blank=True, default='', max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('saldo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('efectivo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transferencia', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('contacto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='core.contactos')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario',
+                'verbose_name_plural': 'Resumenes diarios',
+                'indexes': [models.Index(fields=['fecha', 'tipo'], name='resumen_fecha_tipo_idx'), models.Index(fields=['contacto', 'fecha'], name='resumen_contacto_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'fecha', 'contacto', 'forma_pago', 'estado'), name='resumen_diario_unico')],
+            },
+        ),
+        migrations.RunPython(armar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:04
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.utils import timezone
+
+# Cuentas de documentos con saldo al crear el libro: (cuenta, modelo, campo del saldo, contacto, fecha)
+DOCUMENTOS = [
+    ('venta', 'Ventas', 'saldo_pendiente', 'cliente_id', 'fecha_venta'),
+    ('compra', 'Compras', 'saldo_pendiente', 'proveedor_id', 'fecha_compra'),
+    ('cobro', 'Cobros', 'saldo_disponible', 'cliente_id', 'fecha_cobro'),
+    ('pago', 'Pagos', 'saldo_disponible', 'proveedor_id', 'fecha_pago'),
+]
+
+# Lo que movio el saldo de un contacto: (modelo, filtro, contacto, fecha, monto, signo)
+HISTORIA_CONTACTOS = [
+    ('Ventas', {'fecha_cancelacion__isnull': True}, 'cliente_id', 'fecha_venta', 'total', 1),
+    ('Cobros', {}, 'cliente_id', 'fecha_cobro', 'monto', -1),
+    ('Pagos', {}, 'proveedor_id', 'fecha_pago', 'monto', -1),
+    ('NotasCredito', {'estado': 'aplicada'}, 'contacto_id', 'fecha_nota', 'total', -1),
+    ('Compras', {'fecha_cancelacion__isnull': False}, 'proveedor_id', 'fecha_cancelacion', 'total', -1),
+]
+
+LOTE = 2000
+
+
+def _guardar(MovimientosCuenta, movimientos):
+    lote = []
+    for movimiento in movimientos:
+        lote.append(movimiento)
+        if len(lote) == LOTE:
+            MovimientosCuenta.objects.bulk_create(lote)
+            lote = []
+    MovimientosCuenta.objects.bulk_create(lote)
+
+
+def _aperturas_documentos(apps, MovimientosCuenta):
+    # El saldo vigente de cada documento entra con la fecha del documento
+    for cuenta, modelo, campo, contacto, fecha in DOCUMENTOS:
+        filas = (
+            apps.get_model('core', modelo).objects
+            .exclude(**{campo: 0})
+            .values_list('id', contacto, fecha, campo)
+            .iterator(chunk_size=LOTE)
+        )
+        yield from (
+            MovimientosCuenta(
+                contacto_id=contacto_id, fecha=fecha_documento, cuenta=cuenta, documento=documento,
+                tipo='apertura', delta=saldo, saldo=saldo,
+            )
+            for documento, contacto_id, fecha_documento, saldo in filas
+        )
+
+
+def _aperturas_contactos(apps, MovimientosCuenta, hoy):
+    # El saldo de cada contacto se rearma dia por dia desde sus documentos (lo
+    # mismo que suman las automatizaciones); lo que los documentos no explican
+    # entra como una ultima apertura con la fecha de hoy.
+    Contactos = apps.get_model('core', 'Contactos')
+    ids = list(Contactos.objects.order_by('id').values_list('id', flat=True))
+    for inicio in range(0, len(ids), LOTE):
+        bloque = ids[inicio:inicio + LOTE]
+        deltas = defaultdict(lambda: defaultdict(Decimal))
+        for modelo, filtro, contacto, fecha, monto, signo in HISTORIA_CONTACTOS:
+            filas = (
+                apps.get_model('core', modelo).objects
+                .filter(**filtro, **{f'{contacto}__in': bloque})
+                .values(contacto, fecha)
+                .annotate(total=Sum(monto))
+                .order_by()
+            )
+            for fila in filas:
+                deltas[fila[contacto]][fila[fecha]] += signo * (fila['total'] or Decimal('0'))
+
+        guardados = Contactos.objects.filter(id__in=bloque).order_by('id').values_list('id', 'saldo_contacto')
+        for contacto_id, guardado in guardados:
+            por_fecha = deltas[contacto_id]
+            explicado = sum(por_fecha.values(), Decimal('0'))
+            if guardado != explicado:
+                por_fecha[hoy] += guardado - explicado
+            saldo = Decimal('0')
+            for fecha, delta in sorted(por_fecha.items()):
+                if not delta:
+                    continue
+                saldo += delta
+                yield MovimientosCuenta(
+                    contacto_id=contacto_id, fecha=fecha, cuenta='contacto', documento=contacto_id,
+                    tipo='apertura', delta=delta, saldo=saldo,
+                )
+
+
+def registrar_aperturas(apps, schema_editor):
+    # Los saldos vigentes entran al libro como movimientos de apertura, con
+    # las fechas de los documentos: saldo_contacto_al responde tambien para
+    # fechas anteriores a la creacion del libro.
+    MovimientosCuenta = apps.get_model('core', 'MovimientosCuenta')
+    _guardar(MovimientosCuenta, _aperturas_contactos(apps, MovimientosCuenta, timezone.localdate()))
+    _guardar(MovimientosCuenta, _aperturas_documentos(apps, MovimientosCuenta))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_resumen_diario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientosCuenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cuenta', models.CharField(choices=[('contacto', 'Contacto'), ('venta', 'Venta'), ('compra', 'Compra'), ('cobro', 'Cobro'), ('pago', 'Pago')], max_length=10)),
+                ('documento', models.BigIntegerField()),
+                ('tipo', models.CharField(choices=[('apertura', 'Apertura'), ('venta', 'Venta'), ('cancelacion_venta', 'Cancelación de venta'), ('compra', 'Compra'), ('cancelacion_compra', 'Cancelación de compra'), ('cobro', 'Cobro'), ('pago', 'Pago'), ('nota_credito', 'Nota de crédito'), ('ajuste', 'Ajuste')], max_length=20)),
+                ('origen', models.BigIntegerField(blank=True, null=True)),
+                ('delta', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('saldo', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('contacto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos_cuenta', to='core.contactos')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de cuenta',
+                'verbose_name_plural': 'Movimientos de cuenta',
+                'indexes': [models.Index(condition=models.Q(('cuenta', 'contacto')), fields=['contacto', 'fecha', 'id'], name='movimiento_contacto_fecha_idx'), models.Index(fields=['cuenta', 'documento', 'id'], name='movimiento_documento_idx')],
+            },
+        ),
+        migrations.RunPython(registrar_aperturas, migrations.RunPython.noop),
+    ]
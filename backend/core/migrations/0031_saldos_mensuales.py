@@ -0,0 +1,67 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:08
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def _por_mes(queryset, campo_fecha, campo_monto):
+    filas = (
+        queryset
+        .annotate(mes=TruncMonth(campo_fecha, output_field=models.DateField()))
+        .values('cliente_id', 'mes')
+        .annotate(monto=Sum(campo_monto))
+        .order_by()
+    )
+    return {(fila['cliente_id'], fila['mes']): fila['monto'] or Decimal('0') for fila in filas}
+
+
+def armar_saldos_mensuales(apps, schema_editor):
+    # Los cierres de la historia existente (mismo calculo que reconstruir_saldos_mensuales)
+    Ventas = apps.get_model('core', 'Ventas')
+    Cobros = apps.get_model('core', 'Cobros')
+    SaldoMensual = apps.get_model('core', 'SaldoMensual')
+    debe = _por_mes(Ventas.objects.exclude(estado_venta='cancelada'), 'fecha_venta', 'total')
+    haber = _por_mes(Cobros.objects.all(), 'fecha_cobro', 'monto')
+
+    saldos = defaultdict(Decimal)
+    filas = []
+    for contacto_id, mes in sorted(debe.keys() | haber.keys()):
+        fila_debe = debe.get((contacto_id, mes), Decimal('0'))
+        fila_haber = haber.get((contacto_id, mes), Decimal('0'))
+        saldos[contacto_id] += fila_debe - fila_haber
+        filas.append(SaldoMensual(
+            contacto_id=contacto_id, mes=mes, debe=fila_debe, haber=fila_haber, saldo=saldos[contacto_id],
+        ))
+    SaldoMensual.objects.bulk_create(filas, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_movimientos_cuenta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('debe', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('haber', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('saldo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('contacto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos_mensuales', to='core.contactos')),
+            ],
+            options={
+                'verbose_name': 'Saldo mensual',
+                'verbose_name_plural': 'Saldos mensuales',
+                'constraints': [models.UniqueConstraint(fields=('contacto', 'mes'), name='saldo_mensual_unico')],
+            },
+        ),
+        migrations.RunPython(armar_saldos_mensuales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,439 @@
+import calendar
+import copy
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+
+from .models import Eliminaciones
+from .renderers import NdjsonRenderer, linea_ndjson
+from .servicios.resumen_diario import actualizar_resumen
+from .servicios.saldos import CUENTAS, bloquear_contactos, contactos_de
+
+# ============================================================
+# Mixins de ViewSets
+# ============================================================
+
+# Optimizacion de querysets
+#
+# Cada serializer declara lo que lee por fila, como lista (siempre) o como
+# dict {campo_serializer: [...]} (solo si ese campo se devuelve):
+#   select_related_fields   -> FKs que se acceden (ej. obj.cliente.nombre)
+#   prefetch_related_fields -> relaciones inversas / many (ej. obj.medios_pago.all())
+#   only_fields             -> columnas extra que lee un SerializerMethodField
+# Los serializers anidados se agregan solos (many -> prefetch, FK -> select) y
+# sus propias declaraciones se prefijan con el source del campo, asi una vista
+# solo necesita conocer su serializer.
+# Solo se aplica en lecturas: en escrituras la cache de prefetch quedaria
+# desactualizada para las automatizaciones que releen `detalles`.
+
+
+def _como_instancia(serializer):
+    if isinstance(serializer, type):
+        return serializer()
+    return serializer
+
+
+def _declaradas(serializer, atributo, campos):
+    declaradas = getattr(type(serializer), atributo, [])
+    if isinstance(declaradas, dict):
+        return [
+            relacion
+            for campo, relaciones in declaradas.items()
+            if campo in campos
+            for relacion in relaciones
+        ]
+    return list(declaradas)
+
+
+def relaciones_serializer(serializer, prefijo="", en_prefetch=False):
+    serializer = _como_instancia(serializer)
+    campos = serializer.fields
+    select = []
+    prefetch = []
+
+    def con_prefijo(campo):
+        return f"{prefijo}{campo}"
+
+    for campo in _declaradas(serializer, "select_related_fields", campos):
+        (prefetch if en_prefetch else select).append(con_prefijo(campo))
+    for campo in _declaradas(serializer, "prefetch_related_fields", campos):
+        prefetch.append(con_prefijo(campo))
+
+    for nombre, field in campos.items():
+        many = isinstance(field, serializers.ListSerializer)
+        anidado = field.child if many else field
+        if not isinstance(anidado, serializers.BaseSerializer) or field.write_only:
+            continue
+        source = field.source or nombre
+        if source == "*":
+            continue
+        if many or en_prefetch:
+            prefetch.append(con_prefijo(source))
+        else:
+            select.append(con_prefijo(source))
+        sub_select, sub_prefetch = relaciones_serializer(
+            anidado,
+            prefijo=con_prefijo(f"{source}__"),
+            en_prefetch=en_prefetch or many,
+        )
+        select.extend(sub_select)
+        prefetch.extend(sub_prefetch)
+
+    return select, prefetch
+
+
+def columnas_serializer(serializer, select):
+    model = serializer.Meta.model
+    concretos = {field.name for field in model._meta.concrete_fields}
+    ordering = [campo.lstrip("-") for campo in model._meta.ordering]
+
+    columnas = [model._meta.pk.name, *ordering]
+    for nombre, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        raiz = (field.source or nombre).split(".")[0]
+        if raiz in concretos:
+            columnas.append(raiz)
+    columnas.extend(_declaradas(serializer, "only_fields", serializer.fields))
+    columnas.extend(relacion.split("__")[0] for relacion in select)
+    return list(dict.fromkeys(columnas))
+
+
+def optimizar_queryset(queryset, serializer):
+    if serializer is None:
+        return queryset
+    serializer = _como_instancia(serializer)
+    if not isinstance(serializer, serializers.Serializer):
+        return queryset
+    select, prefetch = relaciones_serializer(serializer)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+    if getattr(serializer, "campos_solicitados", None):
+        queryset = queryset.only(*columnas_serializer(serializer, select))
+    return queryset
+
+
+class QuerysetOptimizadoMixin:
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        serializer = serializer_class(context=self.get_serializer_context())
+        return optimizar_queryset(queryset, serializer)
+
+
+# Listado plano
+#
+# En `list` se usa `list_serializer_class` (un ListadoSerializer) y el queryset
+# filtrado se convierte en .values(). Si el cliente pide `expand` se vuelve al
+# serializer completo, que es el que sabe anidar relaciones.
+
+
+class ListadoPlanoMixin:
+    list_serializer_class = None
+
+    def usa_listado_plano(self):
+        return (
+            self.action == "list"
+            and self.list_serializer_class is not None
+            and not self.request.query_params.get("expand")
+        )
+
+    def get_serializer_class(self):
+        if self.usa_listado_plano():
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.usa_listado_plano():
+            return self.get_serializer().valores(queryset)
+        return queryset
+
+
+# GET condicional
+#
+# Validadores baratos a partir de `actualizado_en`, sin serializar:
+#   - detalle: ETag fuerte con (modelo, pk, actualizado_en)
+#   - listado: ETag con Max(actualizado_en), cantidad de filas y la URL
+#     completa (filtros, fields, cursor). La ultima modificacion tambien toma
+#     la ultima baja del modelo (Eliminaciones), asi If-Modified-Since no
+#     responde 304 despues de borrar una fila.
+# Las respuestas tambien muestran datos de otras tablas: la vista declara en
+# `relaciones_modificacion` la relacion de cada campo que las lee (ej.
+# cliente_nombre -> cliente) y en `expansiones_modificacion` la de cada
+# `expand` (ej. cobros_detalle -> el cobro de cada aplicacion). Si el campo
+# sale en la respuesta, el actualizado_en de la relacion entra en el maximo. Las filas hijas sin actualizado_en
+# (detalles, medios de pago, aplicaciones) marcan a su documento al cambiar
+# (core.signals).
+# Si el cliente manda If-None-Match / If-Modified-Since y nada cambio se
+# responde 304 sin ejecutar el serializer.
+
+
+def _etag(*partes):
+    contenido = "|".join(str(parte) for parte in partes)
+    return '"%s"' % hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def _lista(request, nombre):
+    return {item.strip() for item in request.query_params.get(nombre, "").split(",") if item.strip()}
+
+
+def _mas_reciente(fechas):
+    return max((fecha for fecha in fechas if fecha), default=None)
+
+
+class GetCondicionalMixin:
+    campo_modificacion = "actualizado_en"
+    relaciones_modificacion = {}
+    expansiones_modificacion = {}
+
+    def usa_validadores(self):
+        campos = {field.name for field in self.queryset.model._meta.concrete_fields}
+        return self.campo_modificacion in campos
+
+    def validadores_extra(self):
+        return []
+
+    def relaciones_pedidas(self):
+        # (relaciones a uno, relaciones inversas) cuyos datos salen en la respuesta
+        campos = _lista(self.request, "fields")
+        expand = _lista(self.request, "expand")
+        return (
+            [relacion for campo, relacion in self.relaciones_modificacion.items() if not campos or campo in campos],
+            [relacion for nombre, relacion in self.expansiones_modificacion.items() if nombre in expand],
+        )
+
+    def campos_validadores(self, relaciones):
+        return [self.campo_modificacion, *(f"{relacion}__{self.campo_modificacion}" for relacion in relaciones)]
+
+    def queryset_validadores(self):
+        queryset = self.get_queryset()
+        for backend in list(self.filter_backends):
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset.order_by()
+
+    def respuesta_condicional(self, request, etag, ultima_modificacion, generar_respuesta):
+        last_modified = (
+            calendar.timegm(ultima_modificacion.utctimetuple()) if ultima_modificacion else None
+        )
+        no_modificado = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if no_modificado is not None:
+            return no_modificado
+
+        response = generar_respuesta()
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if not self.usa_validadores():
+            return super().list(request, *args, **kwargs)
+
+        ultima_baja = (
+            Eliminaciones.objects.filter(modelo=self.queryset.model._meta.label)
+            .order_by("-eliminado_en").values("eliminado_en")[:1]
+        )
+        relaciones, expansiones = self.relaciones_pedidas()
+        datos = self.queryset_validadores().aggregate(
+            *(Max(campo) for campo in self.campos_validadores(relaciones + expansiones)),
+            ultima_baja=Max(Subquery(ultima_baja)),
+            # Las expansiones son relaciones inversas: el JOIN repite las filas
+            cantidad=Count("pk", distinct=bool(expansiones)),
+        )
+        cantidad = datos.pop("cantidad")
+        ultima = _mas_reciente(datos.values())
+        etag = _etag(
+            self.basename,
+            request.get_full_path(),
+            cantidad,
+            ultima.isoformat() if ultima else "",
+            *self.validadores_extra(),
+        )
+        return self.respuesta_condicional(
+            request, etag, ultima,
+            lambda: super(GetCondicionalMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.usa_validadores():
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # Con expansiones hay una fila por relacion: se toma la mas reciente
+        relaciones, expansiones = self.relaciones_pedidas()
+        filas = list(
+            self.queryset_validadores()
+            .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .values_list("pk", *self.campos_validadores(relaciones + expansiones))
+        )
+        if not filas:
+            return super().retrieve(request, *args, **kwargs)
+
+        pk = filas[0][0]
+        ultima = _mas_reciente(fecha for fila in filas for fecha in fila[1:])
+        etag = _etag(
+            self.queryset.model._meta.label,
+            pk,
+            ultima.isoformat() if ultima else "",
+            request.get_full_path(),
+        )
+        return self.respuesta_condicional(
+            request, etag, ultima,
+            lambda: super(GetCondicionalMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+
+# Sincronizacion incremental
+#
+# `?updated_since=<ISO 8601>` en un listado devuelve solo las filas con
+# actualizado_en >= ese instante y los ids eliminados desde entonces
+# (tabla Eliminaciones). El cliente guarda `server_time` y lo usa como
+# updated_since en la proxima sincronizacion.
+
+
+def parse_updated_since(valor):
+    fecha = parse_datetime(valor.strip().replace(" ", "+"))
+    if fecha is None:
+        raise ValidationError("Formato de updated_since invalido. Usa ISO 8601 (YYYY-MM-DDTHH:MM:SSZ).")
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+class SincronizacionDeltaMixin:
+    updated_since_param = "updated_since"
+
+    def get_updated_since(self):
+        if getattr(self, "action", None) != "list":
+            return None
+        valor = self.request.query_params.get(self.updated_since_param)
+        if not valor:
+            return None
+        return parse_updated_since(valor)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        desde = self.get_updated_since()
+        if desde is not None:
+            queryset = queryset.filter(actualizado_en__gte=desde)
+        return queryset
+
+    def eliminaciones_desde(self, desde):
+        return Eliminaciones.objects.filter(
+            modelo=self.queryset.model._meta.label,
+            eliminado_en__gte=desde,
+        )
+
+    def validadores_extra(self):
+        extra = super().validadores_extra()
+        desde = self.get_updated_since()
+        if desde is None:
+            return extra
+        datos = self.eliminaciones_desde(desde).aggregate(ultima=Max("eliminado_en"), cantidad=Count("pk"))
+        return [*extra, datos["cantidad"], datos["ultima"].isoformat() if datos["ultima"] else ""]
+
+    def list(self, request, *args, **kwargs):
+        desde = self.get_updated_since()
+        if desde is None:
+            return super().list(request, *args, **kwargs)
+
+        server_time = timezone.now()
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        data = response.data if isinstance(response.data, dict) else {"results": response.data}
+        data["deleted"] = list(
+            self.eliminaciones_desde(desde)
+            .order_by("objeto_id")
+            .values_list("objeto_id", flat=True)
+            .distinct()
+        )
+        data["server_time"] = server_time.isoformat()
+        response.data = data
+        return response
+
+
+# Exportacion NDJSON
+#
+# `?format=ndjson` (o Accept: application/x-ndjson) en un listado responde con
+# StreamingHttpResponse: las filas se leen con .iterator(chunk_size) y se
+# serializan de a una, asi la memoria no depende del rango de fechas pedido y
+# los primeros bytes salen apenas llega el primer bloque. No se pagina.
+
+
+class ExportacionNdjsonMixin:
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NdjsonRenderer]
+    ndjson_chunk_size = 2000
+    ndjson_filas_por_envio = 200
+
+    def usa_exportacion_ndjson(self):
+        renderer = getattr(self.request, "accepted_renderer", None)
+        return self.action == "list" and isinstance(renderer, NdjsonRenderer)
+
+    def filas_ndjson(self, queryset, serializer):
+        bloque = []
+        for fila in queryset.iterator(chunk_size=self.ndjson_chunk_size):
+            bloque.append(linea_ndjson(serializer.to_representation(fila)))
+            if len(bloque) >= self.ndjson_filas_por_envio:
+                yield "".join(bloque)
+                bloque = []
+        if bloque:
+            yield "".join(bloque)
+
+    def list(self, request, *args, **kwargs):
+        if not self.usa_exportacion_ndjson():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            self.filas_ndjson(queryset, self.get_serializer()),
+            content_type=NdjsonRenderer.media_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{self.basename}.ndjson"'
+        return response
+
+
+# Resumen diario en ediciones y bajas
+#
+# PUT/PATCH/DELETE de ventas, compras, cobros y pagos: en la misma transaccion
+# se rearman las filas de ResumenDiario (y los saldos mensuales) de la fecha y
+# el contacto que tenia el documento y de los que tiene despues. La copia de
+# la instancia se toma antes de guardar, con los valores leidos de la base.
+
+
+class ResumenDiarioMixin:
+    resumen_documentos = None  # argumento de actualizar_resumen: 'ventas', 'compras', 'cobros' o 'pagos'
+
+    def perform_update(self, serializer):
+        anterior = copy.copy(serializer.instance)
+        # El contacto se bloquea antes que el documento (ver core.servicios.saldos)
+        campo_contacto = CUENTAS[type(anterior)][2].removesuffix('_id')
+        with transaction.atomic():
+            bloquear_contactos(contactos_de([anterior, serializer.validated_data.get(campo_contacto)]))
+            documento = serializer.save()
+            actualizar_resumen(**{self.resumen_documentos: [anterior, documento]})
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            bloquear_contactos(contactos_de([instance]))
+            instance.delete()
+            actualizar_resumen(**{self.resumen_documentos: [instance]})
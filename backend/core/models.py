@@ -11,7 +11,7 @@ class Usuarios(models.Model):
     activo = models.BooleanField(default=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.nombre_completo
@@ -48,7 +48,7 @@ class Contactos(models.Model):
     activo = models.BooleanField(default=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_display()})"
@@ -57,6 +57,15 @@ class Contactos(models.Model):
         ordering = ['nombre']
         verbose_name = 'Contacto'
         verbose_name_plural = 'Contactos'
+        indexes = [
+            models.Index(fields=['tipo', 'nombre'], name='contactos_tipo_nombre_idx'),
+            # Clientes con deuda del dashboard
+            models.Index(
+                fields=['-saldo_contacto', 'nombre'],
+                condition=models.Q(tipo='cliente', saldo_contacto__gt=0),
+                name='contactos_deudores_idx',
+            ),
+        ]
 
 class Productos(models.Model):
     RUBRO_CHOICES = [
@@ -89,7 +98,7 @@ class Productos(models.Model):
     precio_compra = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     creado_en = models.DateTimeField(default=tz.now, null=True,)
-    actualizado_en = models.DateTimeField(auto_now=True, null=True)
+    actualizado_en = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     es_oferta = models.BooleanField(default=False)
     fecha_inicio_oferta = models.DateField(null=True, blank=True)
@@ -156,7 +165,7 @@ class Ventas(models.Model):
     vencimiento = models.DateField(null=True, blank=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-fecha_venta']
@@ -166,6 +175,27 @@ class Ventas(models.Model):
                 name='saldo_pendiente_no_negativo'
             ),
         ]
+        indexes = [
+            models.Index(fields=['-fecha_venta', 'id'], name='ventas_fecha_idx'),
+            models.Index(fields=['cliente', '-fecha_venta'], name='ventas_cliente_fecha_idx'),
+            models.Index(fields=['estado_venta', '-fecha_venta'], name='ventas_estado_fecha_idx'),
+            models.Index(fields=['estado_cobro', 'fecha_venta'], name='ventas_cobro_fecha_idx'),
+            models.Index(fields=['fecha_entrega'], name='ventas_fecha_entrega_idx'),
+            # Ventas abiertas: deuda de clientes, cuenta corriente y vencimientos
+            models.Index(
+                fields=['cliente', 'fecha_venta'],
+                condition=models.Q(saldo_pendiente__gt=0) & ~models.Q(estado_venta='cancelada'),
+                name='ventas_abiertas_idx',
+            ),
+            models.Index(
+                fields=['vencimiento'],
+                condition=(
+                    models.Q(saldo_pendiente__gt=0, vencimiento__isnull=False)
+                    & ~models.Q(estado_venta='cancelada')
+                ),
+                name='ventas_abiertas_venc_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Venta #{self.id} - {self.cliente.nombre}"
@@ -204,10 +234,14 @@ class Cobros(models.Model):
     observaciones = models.CharField(max_length=255, blank=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-fecha_cobro']
+        indexes = [
+            models.Index(fields=['-fecha_cobro', 'id'], name='cobros_fecha_idx'),
+            models.Index(fields=['cliente', '-fecha_cobro'], name='cobros_cliente_fecha_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=models.Q(saldo_disponible__gte=0),
@@ -300,7 +334,7 @@ class Compras(models.Model):
     observaciones = models.CharField(max_length=255, blank=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-fecha_compra']
@@ -310,6 +344,17 @@ class Compras(models.Model):
             name='compra_saldo_pendiente_no_negativo'
             ),
         ]
+        indexes = [
+            models.Index(fields=['-fecha_compra', 'id'], name='compras_fecha_idx'),
+            models.Index(fields=['proveedor', '-fecha_compra'], name='compras_proveedor_fecha_idx'),
+            models.Index(fields=['estado_pago', 'fecha_compra'], name='compras_pago_fecha_idx'),
+            # Compras abiertas: deuda con proveedores
+            models.Index(
+                fields=['proveedor', 'fecha_compra'],
+                condition=models.Q(saldo_pendiente__gt=0) & ~models.Q(estado_compra='cancelada'),
+                name='compras_abiertas_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Compra #{self.id} - {self.proveedor.nombre}"
@@ -348,10 +393,14 @@ class Pagos(models.Model):
     observaciones = models.CharField(max_length=255, blank=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-fecha_pago']
+        indexes = [
+            models.Index(fields=['-fecha_pago', 'id'], name='pagos_fecha_idx'),
+            models.Index(fields=['proveedor', '-fecha_pago'], name='pagos_proveedor_fecha_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=models.Q(saldo_disponible__gte=0),
@@ -425,10 +474,13 @@ class NotasCredito(models.Model):
     motivo = models.CharField(max_length=255, blank=True)
 
     creado_en = models.DateTimeField(default=tz.now)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-fecha_nota']
+        indexes = [
+            models.Index(fields=['contacto', '-fecha_nota'], name='notas_contacto_fecha_idx'),
+        ]
         verbose_name = 'Nota de Crédito'
         verbose_name_plural = 'Notas de Crédito'
 
@@ -476,3 +528,132 @@ class NotasCreditoAplicacion(models.Model):
             return f"Aplicación Nota Crédito #{self.id} - Nota #{self.nota_credito.id} - Compra #{self.compra.id}"
         if self.venta:
             return f"Aplicación Nota Crédito #{self.id} - Nota #{self.nota_credito.id} - Venta #{self.venta.id}"
+
+class ResumenDiario(models.Model):
+    # Modelo de lectura del dashboard: una fila por (fecha, contacto, tipo de
+    # documento, forma de pago, estado). Lo mantiene core.servicios.resumen_diario
+    TIPO_CHOICES = [
+        ('venta', 'Venta'),
+        ('compra', 'Compra'),
+        ('cobro', 'Cobro'),
+        ('pago', 'Pago'),
+    ]
+
+    fecha = models.DateField()
+    contacto = models.ForeignKey(Contactos, on_delete=models.CASCADE, related_name='resumenes_diarios')
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    forma_pago = models.CharField(max_length=50, blank=True, default='')
+    estado = models.CharField(max_length=20, blank=True, default='')
+
+    cantidad = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    saldo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    efectivo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transferencia = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Resumen diario'
+        verbose_name_plural = 'Resumenes diarios'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tipo', 'fecha', 'contacto', 'forma_pago', 'estado'],
+                name='resumen_diario_unico',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['fecha', 'tipo'], name='resumen_fecha_tipo_idx'),
+            models.Index(fields=['contacto', 'fecha'], name='resumen_contacto_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.fecha} - {self.contacto_id}: {self.total}"
+
+class SaldoMensual(models.Model):
+    # Saldo de cuenta corriente de cada cliente al cierre de los meses con
+    # movimientos: ventas no canceladas (debe) menos cobros (haber). Lo
+    # mantiene core.servicios.saldos_mensuales
+    contacto = models.ForeignKey(Contactos, on_delete=models.CASCADE, related_name='saldos_mensuales')
+    mes = models.DateField()
+    debe = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    haber = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    saldo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Saldo mensual'
+        verbose_name_plural = 'Saldos mensuales'
+        constraints = [
+            models.UniqueConstraint(fields=['contacto', 'mes'], name='saldo_mensual_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.contacto_id} {self.mes:%Y-%m}: {self.saldo}"
+
+class MovimientosCuenta(models.Model):
+    # Libro de movimientos de saldos: una fila por cada cambio de
+    # saldo_contacto, saldo_pendiente (ventas, compras) o saldo_disponible
+    # (cobros, pagos), con el saldo que quedo despues. Solo se agregan filas;
+    # lo escribe core.servicios.saldos
+    CUENTA_CHOICES = [
+        ('contacto', 'Contacto'),
+        ('venta', 'Venta'),
+        ('compra', 'Compra'),
+        ('cobro', 'Cobro'),
+        ('pago', 'Pago'),
+    ]
+    TIPO_CHOICES = [
+        ('apertura', 'Apertura'),
+        ('venta', 'Venta'),
+        ('cancelacion_venta', 'Cancelación de venta'),
+        ('compra', 'Compra'),
+        ('cancelacion_compra', 'Cancelación de compra'),
+        ('cobro', 'Cobro'),
+        ('pago', 'Pago'),
+        ('nota_credito', 'Nota de crédito'),
+        ('ajuste', 'Ajuste'),
+    ]
+
+    contacto = models.ForeignKey(Contactos, on_delete=models.CASCADE, related_name='movimientos_cuenta')
+    fecha = models.DateField()
+    cuenta = models.CharField(max_length=10, choices=CUENTA_CHOICES)
+    documento = models.BigIntegerField()
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    origen = models.BigIntegerField(null=True, blank=True)
+    delta = models.DecimalField(max_digits=12, decimal_places=2)
+    saldo = models.DecimalField(max_digits=12, decimal_places=2)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimiento de cuenta'
+        verbose_name_plural = 'Movimientos de cuenta'
+        indexes = [
+            models.Index(
+                fields=['contacto', 'fecha', 'id'],
+                condition=models.Q(cuenta='contacto'),
+                name='movimiento_contacto_fecha_idx',
+            ),
+            models.Index(fields=['cuenta', 'documento', 'id'], name='movimiento_documento_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Los movimientos de cuenta no se modifican: registra un ajuste.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.cuenta} #{self.documento} {self.fecha}: {self.delta} -> {self.saldo}"
+
+class Eliminaciones(models.Model):
+    # Tombstones para la sincronizacion incremental (?updated_since=)
+    modelo = models.CharField(max_length=100)
+    objeto_id = models.BigIntegerField()
+    eliminado_en = models.DateTimeField(default=tz.now)
+
+    class Meta:
+        verbose_name = 'Eliminación'
+        verbose_name_plural = 'Eliminaciones'
+        indexes = [
+            models.Index(fields=['modelo', 'eliminado_en'], name='eliminaciones_modelo_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} eliminado {self.eliminado_en}"
@@ -0,0 +1,146 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .formato import valor_plano
+
+# ============================================================
+# Paginacion por keyset (cursor)
+# ============================================================
+
+# La paginacion es opt-in: solo se activa cuando el cliente envia `cursor` o
+# `page_size`, asi los listados existentes siguen recibiendo la lista plana.
+# El orden sale del queryset (order_by de la vista o Meta.ordering) y siempre
+# se completa con `id` para que la clave sea unica y estable. Los campos de
+# orden deben ser columnas propias del modelo y no nulas.
+
+
+def _valor_fila(fila, campo):
+    if isinstance(fila, dict):
+        return fila[campo]
+    return getattr(fila, campo)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "include_count"
+    max_page_size = 500
+    invalid_cursor_message = "Cursor invalido."
+
+    def get_page_size(self, request):
+        default = api_settings.PAGE_SIZE or 50
+        valor = request.query_params.get(self.page_size_query_param)
+        if not valor:
+            return default
+        try:
+            page_size = int(valor)
+        except ValueError:
+            return default
+        if page_size <= 0:
+            return default
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = [
+            campo for campo in (queryset.query.order_by or queryset.model._meta.ordering or [])
+            if isinstance(campo, str)
+        ]
+        campos = [campo.lstrip("-") for campo in ordering]
+        if "id" not in campos and "pk" not in campos:
+            ordering.append("id")
+
+        return [
+            ("id" if campo.lstrip("-") == "pk" else campo.lstrip("-"), campo.startswith("-"))
+            for campo in ordering
+        ]
+
+    def encode_cursor(self, fila):
+        posicion = [valor_plano(_valor_fila(fila, campo)) for campo, _ in self.ordering]
+        raw = json.dumps(posicion, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            posicion = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (binascii.Error, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(posicion, list) or len(posicion) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return posicion
+
+    def get_keyset_filter(self, posicion):
+        # (a, b, c) "despues de" (x, y, z) respetando la direccion de cada campo:
+        # a>x OR (a=x AND b>y) OR (a=x AND b=y AND c>z)
+        filtro = Q()
+        iguales = {}
+        for (campo, descendente), valor in zip(self.ordering, posicion):
+            lookup = "lt" if descendente else "gt"
+            filtro |= Q(**iguales, **{f"{campo}__{lookup}": valor})
+            iguales[campo] = valor
+        return filtro
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+
+        queryset = queryset.order_by(
+            *[f"-{campo}" if descendente else campo for campo, descendente in self.ordering]
+        )
+
+        self.count = None
+        if params.get(self.count_query_param, "").lower() in ("1", "true"):
+            self.count = queryset.count()
+
+        posicion = self.decode_cursor(request)
+        if posicion is not None:
+            queryset = queryset.filter(self.get_keyset_filter(posicion))
+
+        filas = list(queryset[: self.page_size + 1])
+        self.has_next = len(filas) > self.page_size
+        filas = filas[: self.page_size]
+        self.next_cursor = self.encode_cursor(filas[-1]) if self.has_next else None
+        return filas
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        response = {
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+        }
+        if self.count is not None:
+            response["count"] = self.count
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "next_cursor": {"type": "string", "nullable": True},
+                "count": {"type": "integer"},
+                "results": schema,
+            },
+        }
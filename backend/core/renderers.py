@@ -0,0 +1,28 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# ============================================================
+# Renderers
+# ============================================================
+
+# NDJSON: un objeto JSON por linea. Los listados lo generan en streaming
+# (ExportacionNdjsonMixin); este renderer cubre el resto de las respuestas
+# (detalle, errores) cuando se pide ?format=ndjson.
+
+
+def linea_ndjson(fila):
+    return json.dumps(fila, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class NdjsonRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        filas = data if isinstance(data, list) else [data]
+        return "".join(linea_ndjson(fila) for fila in filas).encode(self.charset)
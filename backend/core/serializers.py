@@ -10,8 +10,168 @@ from .domain.validaciones_cobros import validar_cobro, validar_actualizacion_cob
 from .domain.validaciones_compras import validar_compra
 from .domain.validaciones_pagos import validar_pago, validar_actualizacion_pago
 from .domain.validaciones_notascredito import validar_nota_credito
-from .servicios.automatizaciones import saldos_al_crear_venta, saldos_al_crear_cobro, saldos_al_crear_cobro_detalle, actualizar_estado_ventas_al_cobrar, saldos_al_crear_pago, saldo_al_crear_pago_detalle, actualizar_estado_compras_al_pagar, recalcular_estado_pago, aplicar_nota_credito
+from .dashboard import invalidar_dashboard
+from .formato import valor_plano
+from .servicios.resumen_diario import actualizar_resumen
+from .servicios.saldos import abrir_saldos, bloquear, bloquear_contactos, bloquear_documentos, contactos_de
+from .servicios.automatizaciones import saldos_al_crear_venta, saldos_al_crear_ventas, saldos_al_crear_cobro, saldos_al_crear_cobro_detalle, actualizar_estado_ventas_al_cobrar, saldos_al_crear_pago, saldo_al_crear_pago_detalle, actualizar_estado_compras_al_pagar, recalcular_estado_pago, aplicar_nota_credito
 from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework.permissions import SAFE_METHODS
+
+# ============================================================
+# Campos dinamicos (?fields= / ?expand=)
+# ============================================================
+
+# En lecturas, `fields` limita la respuesta a los campos pedidos y `expand`
+# agrega relaciones opcionales declaradas en `expandable_fields`. Los campos
+# que queden fuera tampoco se consultan (ver core.mixins.optimizar_queryset).
+
+def _parametro_lista(request, nombre):
+    valor = request.query_params.get(nombre, "")
+    return [item.strip() for item in valor.split(",") if item.strip()]
+
+
+class CamposDinamicosMixin:
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.campos_solicitados = []
+
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        expand = _parametro_lista(request, "expand")
+        for nombre in expand:
+            if nombre in self.expandable_fields and nombre not in self.fields:
+                serializer_class, opciones = self.expandable_fields[nombre]
+                self.fields[nombre] = serializer_class(**opciones)
+
+        self.campos_solicitados = _parametro_lista(request, "fields")
+        if self.campos_solicitados:
+            permitidos = set(self.campos_solicitados) | set(expand)
+            for nombre in list(self.fields):
+                if nombre not in permitidos:
+                    self.fields.pop(nombre)
+
+# ============================================================
+# Listados planos (solo lectura)
+# ============================================================
+
+# Para la accion `list` las vistas usan un ListadoSerializer: la consulta se
+# arma con .values() (sin instanciar modelos por fila) y cada fila se
+# convierte a JSON con el mismo formato que los ModelSerializer (decimales
+# como string, fechas ISO). `fields` tambien aplica aca.
+
+def resumir_medio_pago(medio_pago, cantidad_medios, primer_medio):
+    if not cantidad_medios:
+        return medio_pago or ""
+    if cantidad_medios == 1:
+        return primer_medio
+    return "multiple"
+
+
+class ListadoSerializer(serializers.BaseSerializer):
+    campos = []
+    anotaciones = {}
+    salida = None
+    # campo de salida -> campos y anotaciones que usa preparar_fila para armarlo
+    dependencias = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.campos_salida = list(self.salida or [*self.campos, *self.anotaciones])
+        request = self.context.get("request")
+        if request is not None:
+            solicitados = _parametro_lista(request, "fields")
+            if solicitados:
+                self.campos_salida = [campo for campo in self.campos_salida if campo in solicitados]
+
+    def valores(self, queryset):
+        # Solo se consultan los campos pedidos, lo que necesitan y los del orden (cursor)
+        necesarios = {"id"}
+        for campo in self.campos_salida:
+            necesarios.update(self.dependencias.get(campo, [campo]))
+        orden = queryset.query.order_by or queryset.model._meta.ordering or []
+        necesarios.update(campo.lstrip("-") for campo in orden if isinstance(campo, str))
+        return queryset.values(
+            *[campo for campo in self.campos if campo in necesarios],
+            **{nombre: expresion for nombre, expresion in self.anotaciones.items() if nombre in necesarios},
+        )
+
+    def preparar_fila(self, fila):
+        return fila
+
+    def to_representation(self, fila):
+        fila = self.preparar_fila(fila)
+        return {campo: valor_plano(fila[campo]) for campo in self.campos_salida}
+
+# ============================================================
+# Alta masiva (many=True)
+# ============================================================
+
+# Con many=True cada PrimaryKeyRelatedField haria un SELECT por fila. La lista
+# junta primero todos los ids de la carga (incluidos los detalles anidados) y
+# los trae con un SELECT por campo; el campo despues resuelve desde memoria.
+
+class PrecargadoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        precargados = self.context.get("precargados", {}).get(self)
+        if precargados is None or self.pk_field is not None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return precargados[str(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+def _campos_precargables(serializer):
+    for nombre, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        if isinstance(field, PrecargadoPrimaryKeyRelatedField):
+            yield (nombre,), field
+        elif isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.Serializer):
+            for ruta, subcampo in _campos_precargables(field.child):
+                yield (nombre, *ruta), subcampo
+
+
+def _valores_en_ruta(item, ruta):
+    if not isinstance(item, dict):
+        return []
+    valor = item.get(ruta[0])
+    if len(ruta) == 1:
+        return [] if valor is None else [valor]
+    if not isinstance(valor, list):
+        return []
+    return [final for sub in valor for final in _valores_en_ruta(sub, ruta[1:])]
+
+
+class AltaMasivaListSerializer(serializers.ListSerializer):
+    def precargar(self, data):
+        precargados = {}
+        for ruta, field in _campos_precargables(self.child):
+            ids = {
+                str(valor)
+                for item in data
+                for valor in _valores_en_ruta(item, ruta)
+                if isinstance(valor, (int, str)) and not isinstance(valor, bool)
+            }
+            ids = {pk for pk in ids if pk.isdigit()}
+            precargados[field] = {
+                str(obj.pk): obj for obj in field.get_queryset().filter(pk__in=ids)
+            }
+        self._context["precargados"] = precargados
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.precargar(data)
+        return super().to_internal_value(data)
 
 # ============================================================
 # Serializers
@@ -20,6 +180,8 @@ from django.db import transaction
 # Usuarios
 
 class UsuariosSerializer(serializers.ModelSerializer):
+    select_related_fields = ['user']
+
     email = serializers.EmailField(source="user.email", required=False)
     password = serializers.CharField(write_only=True, required=False)
     confirm_password = serializers.CharField(write_only=True, required=False)
@@ -150,7 +312,7 @@ class CambiarEstadoUsuarioSerializer(serializers.Serializer):
 
 # Contactos
 
-class ContactosSerializer(serializers.ModelSerializer):
+class ContactosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     calle = serializers.CharField(required=False, write_only=True)
     numero = serializers.CharField(required=False, write_only=True)
     ciudad = serializers.CharField(required=False, write_only=True)
@@ -186,7 +348,7 @@ class ContactosSerializer(serializers.ModelSerializer):
 
 # Productos
 
-class ProductosSerializer(serializers.ModelSerializer):
+class ProductosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Productos
         fields = "__all__"
@@ -195,12 +357,68 @@ class ProductosSerializer(serializers.ModelSerializer):
 # Ventas
 
 class VentasDetalleSerializer(serializers.ModelSerializer):
+    serializer_related_field = PrecargadoPrimaryKeyRelatedField
+
     class Meta:
         model = VentasDetalle
         fields = "__all__"
         read_only_fields = ['id', 'venta']
 
-class VentasSerializer(serializers.ModelSerializer):
+class CobrosAplicadosVentaSerializer(serializers.ModelSerializer):
+    fecha_cobro = serializers.DateField(source='cobro.fecha_cobro', read_only=True)
+
+    select_related_fields = ['cobro']
+
+    class Meta:
+        model = CobrosDetalle
+        fields = ['id', 'cobro', 'fecha_cobro', 'monto_aplicado']
+
+class VentasBulkSerializer(AltaMasivaListSerializer):
+    max_length = 500
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", self.max_length)
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+
+    def run_child_validation(self, data):
+        # Errores de campo y de dominio quedan en la posicion de cada venta
+        datos = super().run_child_validation(data)
+        validar_venta(datos)
+        validar_venta_detalles(datos.get('detalles', []))
+        return datos
+
+    @transaction.atomic
+    def create(self, validated_data):
+        ventas = []
+        detalles = []
+        for datos in validated_data:
+            detalles_data = datos.pop('detalles', [])
+            venta = Ventas(**datos)
+            filas = [VentasDetalle(venta=venta, **detalle_data) for detalle_data in detalles_data]
+
+            venta.subtotal = calcular_subtotal(filas)
+            venta.total = calcular_total(subtotal=venta.subtotal, costo_entrega=venta.costo_entrega, descuento=venta.descuento)
+            venta.saldo_pendiente = venta.total
+            ventas.append(venta)
+            detalles.extend(filas)
+
+        Ventas.objects.bulk_create(ventas)
+        VentasDetalle.objects.bulk_create(detalles)
+
+        saldos_al_crear_ventas(ventas)
+        # bulk_create y update() no disparan los signals que invalidan el dashboard
+        transaction.on_commit(invalidar_dashboard)
+        return ventas
+
+class VentasSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    select_related_fields = {'cliente_nombre': ['cliente']}
+    expandable_fields = {
+        'cobros_detalle': (CobrosAplicadosVentaSerializer, {'many': True, 'read_only': True}),
+    }
+
+    serializer_related_field = PrecargadoPrimaryKeyRelatedField
+
     detalles = VentasDetalleSerializer(many=True)
     cliente_nombre = serializers.SerializerMethodField()
 
@@ -209,6 +427,7 @@ class VentasSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ventas
+        list_serializer_class = VentasBulkSerializer
         fields = [
             'id',
             'fecha_venta',
@@ -251,6 +470,44 @@ class VentasSerializer(serializers.ModelSerializer):
         saldos_al_crear_venta(venta)
         return venta
 
+class VentasListadoSerializer(ListadoSerializer):
+    campos = [
+        'id',
+        'fecha_venta',
+        'cliente',
+        'direccion_entrega',
+        'fecha_entrega',
+        'forma_pago',
+        'subtotal',
+        'costo_entrega',
+        'descuento',
+        'total',
+        'saldo_pendiente',
+        'estado_venta',
+        'estado_cobro',
+        'vencimiento',
+    ]
+    anotaciones = {
+        'cliente_nombre': Coalesce(F('cliente__nombre'), Value('-')),
+    }
+    salida = [
+        'id',
+        'fecha_venta',
+        'cliente',
+        'cliente_nombre',
+        'direccion_entrega',
+        'fecha_entrega',
+        'forma_pago',
+        'subtotal',
+        'costo_entrega',
+        'descuento',
+        'total',
+        'saldo_pendiente',
+        'estado_venta',
+        'estado_cobro',
+        'vencimiento',
+    ]
+
 class CambiarEstadoVentaSerializer(serializers.Serializer):
     ESTADOS = ['confirmada', 'en_camino', 'entregada', 'cancelada']
     estado_venta = serializers.ChoiceField(choices=ESTADOS, required=True)
@@ -276,7 +533,10 @@ class CobrosMedioPagoSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "cobro"]
 
 
-class CobrosSerializer(serializers.ModelSerializer):
+class CobrosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    prefetch_related_fields = {'medio_pago_resumen': ['medios_pago']}
+    only_fields = {'medio_pago_resumen': ['medio_pago']}
+
     detalles = CobrosDetalleSerializer(many=True, required=False)
     medios_pago = CobrosMedioPagoSerializer(many=True, required=False)
     medio_pago_resumen = serializers.SerializerMethodField(read_only=True)
@@ -299,11 +559,8 @@ class CobrosSerializer(serializers.ModelSerializer):
 
     def get_medio_pago_resumen(self, obj):
         medios = list(obj.medios_pago.all())
-        if not medios:
-            return obj.medio_pago or ""
-        if len(medios) == 1:
-            return medios[0].medio_pago
-        return "multiple"
+        primer_medio = medios[0].medio_pago if medios else None
+        return resumir_medio_pago(obj.medio_pago, len(medios), primer_medio)
 
     def validate(self, attrs):
         attrs = super().validate(attrs)
@@ -333,6 +590,8 @@ class CobrosSerializer(serializers.ModelSerializer):
             medios_pago_data[0]["medio_pago"] if len(medios_pago_data) == 1 else ""
         )
 
+        bloquear_contactos(contactos_de([validated_data.get('cliente'), *(d.get('venta') for d in detalles_data)]))
+        bloquear_documentos(detalles_data, 'venta')
         validar_cobro(validated_data, detalles_data)
 
         cobro = Cobros.objects.create(**validated_data)
@@ -355,6 +614,9 @@ class CobrosSerializer(serializers.ModelSerializer):
         detalles_data = validated_data.pop('detalles', None)
         validated_data.pop("medios_pago", None)
 
+        bloquear_contactos(contactos_de([instance, *(d.get('venta') for d in detalles_data or [])]))
+        bloquear(instance)
+        bloquear_documentos(detalles_data or [], 'venta')
         validar_actualizacion_cobro(instance, validated_data, detalles_data or [])
 
         for attr, value in validated_data.items():
@@ -370,6 +632,47 @@ class CobrosSerializer(serializers.ModelSerializer):
 
         return instance
 
+class CobrosListadoSerializer(ListadoSerializer):
+    campos = [
+        'id',
+        'cliente',
+        'fecha_cobro',
+        'medio_pago',
+        'monto',
+        'observaciones',
+        'saldo_disponible',
+    ]
+    anotaciones = {
+        'cantidad_medios': Subquery(
+            CobrosMedioPago.objects.filter(cobro=OuterRef('pk'))
+            .values('cobro')
+            .annotate(cantidad=Count('id'))
+            .values('cantidad')[:1]
+        ),
+        'primer_medio': Subquery(
+            CobrosMedioPago.objects.filter(cobro=OuterRef('pk')).order_by('id').values('medio_pago')[:1]
+        ),
+    }
+    salida = [
+        'id',
+        'cliente',
+        'fecha_cobro',
+        'medio_pago',
+        'medio_pago_resumen',
+        'monto',
+        'observaciones',
+        'saldo_disponible',
+    ]
+
+    dependencias = {'medio_pago_resumen': ['medio_pago', 'cantidad_medios', 'primer_medio']}
+
+    def preparar_fila(self, fila):
+        if 'medio_pago_resumen' in self.campos_salida:
+            fila['medio_pago_resumen'] = resumir_medio_pago(
+                fila['medio_pago'], fila['cantidad_medios'], fila['primer_medio']
+            )
+        return fila
+
 # Compras
 
 class ComprasDetalleSerializer(serializers.ModelSerializer):
@@ -378,7 +681,20 @@ class ComprasDetalleSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ['id', 'compra']
 
-class ComprasSerializer(serializers.ModelSerializer):
+class PagosAplicadosCompraSerializer(serializers.ModelSerializer):
+    fecha_pago = serializers.DateField(source='pago.fecha_pago', read_only=True)
+
+    select_related_fields = ['pago']
+
+    class Meta:
+        model = PagosDetalle
+        fields = ['id', 'pago', 'fecha_pago', 'monto_aplicado']
+
+class ComprasSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'pagos_detalle': (PagosAplicadosCompraSerializer, {'many': True, 'read_only': True}),
+    }
+
     detalles = ComprasDetalleSerializer(many=True)
 
     class Meta:
@@ -421,8 +737,10 @@ class ComprasSerializer(serializers.ModelSerializer):
         compra.total = total
         compra.saldo_pendiente = total
         compra.save(update_fields=['subtotal', 'total', 'saldo_pendiente'])
+        abrir_saldos([compra])
 
         recalcular_estado_pago(compra)
+        actualizar_resumen(compras=[compra])
 
         return compra
 
@@ -430,6 +748,22 @@ class ComprasSerializer(serializers.ModelSerializer):
         validar_compra(attrs, attrs.get('detalles', []))
         return attrs
 
+class ComprasListadoSerializer(ListadoSerializer):
+    campos = [
+        'id',
+        'proveedor',
+        'fecha_compra',
+        'extra',
+        'estado_compra',
+        'descuento',
+        'observaciones',
+        'numero_documento',
+        'subtotal',
+        'total',
+        'saldo_pendiente',
+        'estado_pago',
+    ]
+
 class CambiarEstadoCompraSerializer(serializers.Serializer):
     estado_compra = serializers.CharField(required=True)
 
@@ -454,7 +788,10 @@ class PagosMedioPagoSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "pago"]
 
 
-class PagosSerializer(serializers.ModelSerializer):
+class PagosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    prefetch_related_fields = {'medio_pago_resumen': ['medios_pago']}
+    only_fields = {'medio_pago_resumen': ['medio_pago']}
+
     detalles = PagosDetalleSerializer(many=True, required=False)
     medios_pago = PagosMedioPagoSerializer(many=True, required=False)
     medio_pago_resumen = serializers.SerializerMethodField(read_only=True)
@@ -477,11 +814,8 @@ class PagosSerializer(serializers.ModelSerializer):
 
     def get_medio_pago_resumen(self, obj):
         medios = list(obj.medios_pago.all())
-        if not medios:
-            return obj.medio_pago or ""
-        if len(medios) == 1:
-            return medios[0].medio_pago
-        return "multiple"
+        primer_medio = medios[0].medio_pago if medios else None
+        return resumir_medio_pago(obj.medio_pago, len(medios), primer_medio)
 
     def validate(self, attrs):
         attrs = super().validate(attrs)
@@ -511,6 +845,8 @@ class PagosSerializer(serializers.ModelSerializer):
             medios_pago_data[0]["medio_pago"] if len(medios_pago_data) == 1 else ""
         )
 
+        bloquear_contactos(contactos_de([validated_data.get('proveedor'), *(d.get('compra') for d in detalles_data)]))
+        bloquear_documentos(detalles_data, 'compra')
         validar_pago(validated_data, detalles_data)
 
         pago = Pagos.objects.create(**validated_data)
@@ -528,10 +864,14 @@ class PagosSerializer(serializers.ModelSerializer):
 
         return pago
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         detalles_data = validated_data.pop('detalles', None)
         validated_data.pop("medios_pago", None)
 
+        bloquear_contactos(contactos_de([instance, *(d.get('compra') for d in detalles_data or [])]))
+        bloquear(instance)
+        bloquear_documentos(detalles_data or [], 'compra')
         validar_actualizacion_pago(instance, validated_data, detalles_data or [])
 
         for attr, value in validated_data.items():
@@ -543,12 +883,51 @@ class PagosSerializer(serializers.ModelSerializer):
                 detalle = PagosDetalle.objects.create(pago=instance, **detalle_data)
                 saldo_al_crear_pago_detalle(detalle)
 
-            instance.save(update_fields=['saldo_disponible'])
-
         actualizar_estado_compras_al_pagar(instance)
 
         return instance
 
+class PagosListadoSerializer(ListadoSerializer):
+    campos = [
+        'id',
+        'proveedor',
+        'fecha_pago',
+        'medio_pago',
+        'monto',
+        'observaciones',
+        'saldo_disponible',
+    ]
+    anotaciones = {
+        'cantidad_medios': Subquery(
+            PagosMedioPago.objects.filter(pago=OuterRef('pk'))
+            .values('pago')
+            .annotate(cantidad=Count('id'))
+            .values('cantidad')[:1]
+        ),
+        'primer_medio': Subquery(
+            PagosMedioPago.objects.filter(pago=OuterRef('pk')).order_by('id').values('medio_pago')[:1]
+        ),
+    }
+    salida = [
+        'id',
+        'proveedor',
+        'fecha_pago',
+        'medio_pago',
+        'medio_pago_resumen',
+        'monto',
+        'observaciones',
+        'saldo_disponible',
+    ]
+
+    dependencias = {'medio_pago_resumen': ['medio_pago', 'cantidad_medios', 'primer_medio']}
+
+    def preparar_fila(self, fila):
+        if 'medio_pago_resumen' in self.campos_salida:
+            fila['medio_pago_resumen'] = resumir_medio_pago(
+                fila['medio_pago'], fila['cantidad_medios'], fila['primer_medio']
+            )
+        return fila
+
 # Notas de Credito
 
 class NotasCreditoDetalleSerializer(serializers.ModelSerializer):
@@ -573,7 +952,7 @@ class NotasCreditoAplicacionSerializer(serializers.ModelSerializer):
             'monto_aplicado'
         ]
 
-class NotasCreditoSerializer(serializers.ModelSerializer):
+class NotasCreditoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     monto = serializers.DecimalField(max_digits=12, decimal_places=2, write_only=True, required=True)
     detalles = NotasCreditoDetalleSerializer(many=True, required=False)
     aplicaciones = NotasCreditoAplicacionSerializer(many=True, required=False)
@@ -598,6 +977,14 @@ class NotasCreditoSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
+        aplicaciones = validated_data.get('aplicaciones', [])
+        bloquear_contactos(contactos_de([
+            validated_data.get('contacto'),
+            *(a.get('venta') for a in aplicaciones),
+            *(a.get('compra') for a in aplicaciones),
+        ]))
+        bloquear_documentos(aplicaciones, 'venta')
+        bloquear_documentos(aplicaciones, 'compra')
         validar_nota_credito({
             'tipo': validated_data.get('tipo'),
             'detalles': validated_data.get('detalles', []),
@@ -631,3 +1018,25 @@ class NotasCreditoSerializer(serializers.ModelSerializer):
         aplicar_nota_credito(nota_credito)
 
         return nota_credito
+
+class NotasCreditoListadoSerializer(ListadoSerializer):
+    campos = [
+        'id',
+        'contacto',
+        'tipo',
+        'fecha_nota',
+        'subtotal',
+        'numero_documento',
+        'estado',
+        'motivo',
+        'total',
+    ]
+
+# Batch
+
+class BatchSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=serializers.CharField(),
+        min_length=1,
+        max_length=20,
+    )
@@ -1,16 +1,48 @@
-from decimal import Decimal
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 
 from core.domain.logica import calcular_precios_producto, calcular_subtotal
+from core.models import CobrosDetalle, Compras, NotasCreditoAplicacion, Ventas
+from core.servicios.resumen_diario import actualizar_resumen
+from core.servicios.saldos import (
+    abrir_saldos,
+    bloquear_contactos,
+    fijar_saldo,
+    mover_saldo,
+    mover_saldos,
+    mover_saldos_contactos,
+)
 
 # ======================================================
 # VENTAS & COBROS
 # ======================================================
 
+# Las ventas que se cargan con con_aplicaciones() traen tiene_cobros y
+# tiene_notas_credito: el estado se calcula sin una query por venta.
+
+def con_aplicaciones(ventas):
+    return ventas.annotate(
+        tiene_cobros=Exists(CobrosDetalle.objects.filter(venta=OuterRef('pk'))),
+        tiene_notas_credito=Exists(NotasCreditoAplicacion.objects.filter(venta=OuterRef('pk'))),
+    )
+
+
+def _tiene_cobros(venta):
+    tiene = getattr(venta, 'tiene_cobros', None)
+    return venta.cobros_detalle.exists() if tiene is None else tiene
+
+
+def _tiene_notas_credito(venta):
+    tiene = getattr(venta, 'tiene_notas_credito', None)
+    return venta.notas_credito_aplicadas.exists() if tiene is None else tiene
+
+
 def recalcular_estado_cobro(venta):
     if venta.estado_venta == 'cancelada':
         return 'cancelado'
 
-    if (venta.saldo_pendiente == 0 and not venta.cobros_detalle.exists() and venta.notas_credito_aplicadas.exists()):
+    if (venta.saldo_pendiente == 0 and not _tiene_cobros(venta) and _tiene_notas_credito(venta)):
         return "cancelado"
 
     if venta.saldo_pendiente == 0:
@@ -29,8 +61,8 @@ def recalcular_estado_venta(venta):
     # NC que cubre el total sin cobros reales → cancelada contablemente
     if (
         venta.saldo_pendiente == 0
-        and not venta.cobros_detalle.exists()
-        and venta.notas_credito_aplicadas.exists()
+        and not _tiene_cobros(venta)
+        and _tiene_notas_credito(venta)
     ):
         return 'cancelada'
 
@@ -38,50 +70,65 @@ def recalcular_estado_venta(venta):
 
 
 def saldos_al_crear_venta(venta):
-    contacto = venta.cliente
-    contacto.saldo_contacto += venta.total
-    contacto.save(update_fields=['saldo_contacto'])
+    mover_saldo(venta.cliente, venta.total, venta)
 
     venta.saldo_pendiente = venta.total
-    venta.save(update_fields=['saldo_pendiente'])
+    venta.save(update_fields=['saldo_pendiente', 'actualizado_en'])
+    abrir_saldos([venta])
 
+    actualizar_resumen(ventas=[venta])
 
+
+def saldos_al_crear_ventas(ventas):
+    # Alta masiva: las ventas ya se insertaron con saldo_pendiente = total;
+    # los deltas de saldo_contacto por cliente se aplican en un unico UPDATE.
+    mover_saldos_contactos([(venta.cliente_id, venta.total, venta) for venta in ventas])
+    abrir_saldos(ventas)
+
+    actualizar_resumen(ventas=ventas)
+
+
+@transaction.atomic
 def cancelar_venta_domain(venta):
-    contacto = venta.cliente
-    contacto.saldo_contacto -= venta.total
-    contacto.save(update_fields=['saldo_contacto'])
+    bloquear_contactos([venta.cliente_id])
+    hoy = timezone.localdate()
+    mover_saldo(venta.cliente, -venta.total, venta, tipo='cancelacion_venta', fecha=hoy)
+    fijar_saldo(venta, 0, venta, tipo='cancelacion_venta', fecha=hoy)
 
-    venta.saldo_pendiente = 0
     venta.estado_venta = 'cancelada'
     venta.estado_cobro = recalcular_estado_cobro(venta)
-    venta.save(update_fields=['saldo_pendiente', 'estado_cobro', 'estado_venta'])
+    venta.save(update_fields=['estado_cobro', 'estado_venta', 'actualizado_en'])
+
+    actualizar_resumen(ventas=[venta])
 
 
 def saldos_al_crear_cobro(cobro):
-    contacto = cobro.cliente
-    contacto.saldo_contacto -= cobro.monto
-    contacto.save(update_fields=['saldo_contacto'])
+    mover_saldo(cobro.cliente, -cobro.monto, cobro)
 
     cobro.saldo_disponible = cobro.monto
-    cobro.save(update_fields=['saldo_disponible'])
+    cobro.save(update_fields=['saldo_disponible', 'actualizado_en'])
+    abrir_saldos([cobro])
+
+    actualizar_resumen(cobros=[cobro])
 
 
 def saldos_al_crear_cobro_detalle(cobro_detalle):
-    venta = cobro_detalle.venta
     cobro = cobro_detalle.cobro
-
-    venta.saldo_pendiente -= cobro_detalle.monto_aplicado
-    venta.save(update_fields=['saldo_pendiente'])
-
-    cobro.saldo_disponible -= cobro_detalle.monto_aplicado
-    cobro.save(update_fields=['saldo_disponible'])
+    mover_saldo(cobro_detalle.venta, -cobro_detalle.monto_aplicado, cobro)
+    mover_saldo(cobro, -cobro_detalle.monto_aplicado, cobro)
 
 
 def actualizar_estado_ventas_al_cobrar(cobro):
-    ventas = {detalle.venta for detalle in cobro.detalles.all()}
+    ventas = list(con_aplicaciones(
+        Ventas.objects.filter(pk__in=CobrosDetalle.objects.filter(cobro=cobro).values('venta'))
+    ).order_by('pk'))
+    ahora = timezone.now()
     for venta in ventas:
         venta.estado_cobro = recalcular_estado_cobro(venta)
-        venta.save(update_fields=['estado_cobro'])
+        venta.actualizado_en = ahora
+    Ventas.objects.bulk_update(ventas, ['estado_cobro', 'actualizado_en'])
+
+    actualizar_resumen(ventas=ventas)
 
 
 # ======================================================
@@ -101,42 +148,43 @@ def recalcular_estado_pago(compra):
     return 'pendiente'
 
 
+@transaction.atomic
 def cancelar_compra(compra):
-    proveedor = compra.proveedor
-    proveedor.saldo_contacto -= compra.total
-    proveedor.save(update_fields=['saldo_contacto'])
+    bloquear_contactos([compra.proveedor_id])
+    hoy = timezone.localdate()
+    mover_saldo(compra.proveedor, -compra.total, compra, tipo='cancelacion_compra', fecha=hoy)
+    fijar_saldo(compra, 0, compra, tipo='cancelacion_compra', fecha=hoy)
 
-    compra.saldo_pendiente = 0
     compra.estado_compra = 'cancelada'
     compra.estado_pago = recalcular_estado_pago(compra)
-    compra.save(update_fields=['saldo_pendiente', 'estado_compra', 'estado_pago'])
+    compra.save(update_fields=['estado_compra', 'estado_pago', 'actualizado_en'])
+
+    actualizar_resumen(compras=[compra])
 
 
 def saldos_al_crear_pago(pago):
-    contacto = pago.proveedor
-    contacto.saldo_contacto -= pago.monto
-    contacto.save(update_fields=['saldo_contacto'])
+    mover_saldo(pago.proveedor, -pago.monto, pago)
 
     pago.saldo_disponible = pago.monto
-    pago.save(update_fields=['saldo_disponible'])
+    pago.save(update_fields=['saldo_disponible', 'actualizado_en'])
+    abrir_saldos([pago])
+
+    actualizar_resumen(pagos=[pago])
 
 
 def saldo_al_crear_pago_detalle(detalle):
-    compra = detalle.compra
     pago = detalle.pago
-
-    compra.saldo_pendiente -= detalle.monto_aplicado
-    compra.save(update_fields=['saldo_pendiente'])
-
-    pago.saldo_disponible -= detalle.monto_aplicado
-    pago.save(update_fields=['saldo_disponible'])
+    mover_saldo(detalle.compra, -detalle.monto_aplicado, pago)
+    mover_saldo(pago, -detalle.monto_aplicado, pago)
 
 
 def actualizar_estado_compras_al_pagar(pago):
     compras = {detalle.compra for detalle in pago.detalles.all()}
     for compra in compras:
         compra.estado_pago = recalcular_estado_pago(compra)
-        compra.save(update_fields=['estado_pago'])
+        compra.save(update_fields=['estado_pago', 'actualizado_en'])
+
+    actualizar_resumen(compras=compras)
 
 
 def recalcular_precios_producto(producto):
@@ -145,33 +193,35 @@ def recalcular_precios_producto(producto):
     for campo, valor in precios.items():
         setattr(producto, campo, valor)
 
-    producto.save(update_fields=list(precios.keys()))
+    producto.save(update_fields=[*precios.keys(), 'actualizado_en'])
 
 
 def aplicar_nota_credito(nota_credito):
-    for aplicacion in nota_credito.aplicaciones.all():
-        documento = aplicacion.compra or aplicacion.venta
-
-        documento.saldo_pendiente -= aplicacion.monto_aplicado
-
-        if aplicacion.venta:
-            documento.estado_cobro = recalcular_estado_cobro(documento)
-            documento.estado_venta = recalcular_estado_venta(documento)
-            documento.save(update_fields=[
-                'saldo_pendiente',
-                'estado_cobro',
-                'estado_venta',
-            ])
-        else:
-            documento.estado_pago = recalcular_estado_pago(documento)
-            documento.save(update_fields=[
-                'saldo_pendiente',
-                'estado_pago',
-            ])
-
-    contacto = nota_credito.contacto
-    contacto.saldo_contacto -= nota_credito.total
-    contacto.save(update_fields=['saldo_contacto'])
+    aplicaciones = list(nota_credito.aplicaciones.select_related('venta', 'compra'))
+    de_compras = [aplicacion for aplicacion in aplicaciones if aplicacion.compra]
+    de_ventas = [aplicacion for aplicacion in aplicaciones if not aplicacion.compra and aplicacion.venta]
+    mover_saldos(Ventas, [(aplicacion.venta, -aplicacion.monto_aplicado, nota_credito) for aplicacion in de_ventas])
+    mover_saldos(Compras, [(aplicacion.compra, -aplicacion.monto_aplicado, nota_credito) for aplicacion in de_compras])
+
+    ahora = timezone.now()
+    ventas = list(con_aplicaciones(
+        Ventas.objects.filter(pk__in={aplicacion.venta_id for aplicacion in de_ventas})
+    ).order_by('pk'))
+    for venta in ventas:
+        venta.estado_cobro = recalcular_estado_cobro(venta)
+        venta.estado_venta = recalcular_estado_venta(venta)
+        venta.actualizado_en = ahora
+    Ventas.objects.bulk_update(ventas, ['estado_cobro', 'estado_venta', 'actualizado_en'])
+
+    compras = list({aplicacion.compra_id: aplicacion.compra for aplicacion in de_compras}.values())
+    for compra in compras:
+        compra.estado_pago = recalcular_estado_pago(compra)
+        compra.actualizado_en = ahora
+    Compras.objects.bulk_update(compras, ['estado_pago', 'actualizado_en'])
+
+    actualizar_resumen(ventas=ventas, compras=compras)
+
+    mover_saldo(nota_credito.contacto, -nota_credito.total, nota_credito)
 
     nota_credito.estado = 'aplicada'
-    nota_credito.save(update_fields=['estado'])
+    nota_credito.save(update_fields=['estado', 'actualizado_en'])
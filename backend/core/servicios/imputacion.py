@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from core.dashboard import invalidar_dashboard
+from core.models import Cobros, CobrosDetalle, Ventas
+from core.servicios.resumen_diario import actualizar_resumen
+from core.servicios.saldos import bloquear_contactos, mover_saldos
+
+# ======================================================
+# IMPUTACION AUTOMATICA DE COBROS (FIFO)
+# ======================================================
+
+# El saldo_disponible de los cobros de un cliente se aplica a sus ventas con
+# saldo pendiente, de la que vence primero a la ultima (sin vencimiento vence
+# el dia de la venta), y cobro por cobro del mas antiguo al mas nuevo.
+# El reparto se arma en memoria sobre las filas bloqueadas (cobros y despues
+# ventas, en orden de pk) y se escribe con un bulk_create de CobrosDetalle, un
+# UPDATE agrupado para las ventas (saldo_pendiente y estado_cobro) y otro para
+# los cobros, con sus movimientos en el libro.
+
+CLIENTES_POR_LOTE = 500
+
+
+def _orden_venta(venta):
+    return (venta.vencimiento or venta.fecha_venta, venta.fecha_venta, venta.pk)
+
+
+def repartir(cobros, ventas):
+    """Reparto FIFO en memoria: [(cobro, venta, monto)] sin tocar la base."""
+    pendientes = {venta.pk: venta.saldo_pendiente for venta in ventas}
+    ventas = sorted(ventas, key=_orden_venta)
+    imputaciones = []
+    i = 0
+    for cobro in sorted(cobros, key=lambda cobro: (cobro.fecha_cobro, cobro.pk)):
+        disponible = cobro.saldo_disponible
+        while disponible > 0 and i < len(ventas):
+            venta = ventas[i]
+            monto = min(disponible, pendientes[venta.pk])
+            imputaciones.append((cobro, venta, monto))
+            disponible -= monto
+            pendientes[venta.pk] -= monto
+            if pendientes[venta.pk] == 0:
+                i += 1
+    return imputaciones
+
+
+@transaction.atomic
+def imputar_cobros(clientes=None, cobros=None):
+    """Aplica el saldo_disponible de `cobros` (o de todos los cobros de `clientes`) a ventas abiertas.
+
+    Devuelve los CobrosDetalle creados.
+    """
+    cobros_qs = Cobros.objects.filter(saldo_disponible__gt=0)
+    if cobros is not None:
+        cobros_qs = cobros_qs.filter(pk__in=[cobro.pk for cobro in cobros])
+    if clientes is not None:
+        cobros_qs = cobros_qs.filter(cliente_id__in=clientes)
+    bloquear_contactos(cobros_qs.values('cliente_id'))
+    bloqueados = list(cobros_qs.select_for_update().order_by('pk'))
+    if not bloqueados:
+        return []
+
+    ventas = list(
+        Ventas.objects.select_for_update()
+        .filter(cliente_id__in={cobro.cliente_id for cobro in bloqueados}, saldo_pendiente__gt=0)
+        .exclude(estado_venta='cancelada')
+        .order_by('pk')
+    )
+    cobros_por_cliente = defaultdict(list)
+    for cobro in bloqueados:
+        cobros_por_cliente[cobro.cliente_id].append(cobro)
+    ventas_por_cliente = defaultdict(list)
+    for venta in ventas:
+        ventas_por_cliente[venta.cliente_id].append(venta)
+
+    imputaciones = []
+    for cliente_id, del_cliente in cobros_por_cliente.items():
+        imputaciones.extend(repartir(del_cliente, ventas_por_cliente[cliente_id]))
+    if not imputaciones:
+        return []
+
+    detalles = CobrosDetalle.objects.bulk_create([
+        CobrosDetalle(cobro=cobro, venta=venta, monto_aplicado=monto) for cobro, venta, monto in imputaciones
+    ])
+
+    # Con un cobro aplicado, el estado solo depende de lo que queda pendiente
+    restante = {venta.pk: venta.saldo_pendiente for venta in ventas}
+    for _, venta, monto in imputaciones:
+        restante[venta.pk] -= monto
+    estados = {
+        venta.pk: 'cobrado' if restante[venta.pk] == 0 else 'parcial'
+        for _, venta, _ in imputaciones
+    }
+    mover_saldos(Ventas, [(venta, -monto, cobro) for cobro, venta, monto in imputaciones], estado_cobro=estados)
+    mover_saldos(Cobros, [(cobro, -monto, cobro) for cobro, _, monto in imputaciones])
+
+    tocadas = {venta.pk: venta for _, venta, _ in imputaciones}
+    for venta in tocadas.values():
+        venta.estado_cobro = estados[venta.pk]
+    actualizar_resumen(ventas=list(tocadas.values()))
+    transaction.on_commit(invalidar_dashboard)
+    return detalles
+
+
+def imputar_todos(tamano=CLIENTES_POR_LOTE):
+    """Imputa los cobros con saldo de todos los clientes, en transacciones de `tamano` clientes."""
+    clientes = list(
+        Cobros.objects.filter(saldo_disponible__gt=0)
+        .order_by('cliente_id').values_list('cliente_id', flat=True).distinct()
+    )
+    detalles = 0
+    for inicio in range(0, len(clientes), tamano):
+        detalles += len(imputar_cobros(clientes=clientes[inicio:inicio + tamano]))
+    return detalles
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import (
+    Cobros,
+    CobrosDetalle,
+    Compras,
+    Contactos,
+    MovimientosCuenta,
+    NotasCredito,
+    NotasCreditoAplicacion,
+    Pagos,
+    PagosDetalle,
+    Ventas,
+)
+from core.servicios.resumen_diario import actualizar_resumen
+from core.servicios.saldos import CUENTAS, bloquear_contactos
+from core.servicios.saldos_mensuales import reconstruir_saldos_mensuales
+
+# ======================================================
+# RECONCILIACION DE SALDOS
+# ======================================================
+
+# El saldo esperado de cada cuenta se calcula en SQL desde los documentos, con
+# una suma agrupada por documento o contacto (subconsulta correlacionada), y se
+# lee junto al guardado de a bloques de pk. La comparacion se hace en Python
+# con los valores ya convertidos a Decimal. Con `corregir`, las diferencias de
+# cada bloque se bloquean, se vuelven a medir y se guardan con bulk_update,
+# con un movimiento de 'ajuste' en el libro por cada una, y se rearman desde
+# cero los saldos mensuales de los contactos corregidos.
+#
+# El esperado replica lo que hacen las automatizaciones:
+#   ventas:    total - cobrado - NC aplicadas (0 si se cancelo)
+#   compras:   total - pagado - NC aplicadas (0 si se cancelo)
+#   cobros:    monto - aplicado a ventas
+#   pagos:     monto - aplicado a compras
+#   contactos: ventas no canceladas - cobros - pagos - NC aplicadas
+#              - compras canceladas (el alta de una compra no suma al saldo
+#              del proveedor, la cancelacion si resta)
+# "Se cancelo" es tener fecha_cancelacion: la cancelacion es la que mueve los
+# saldos. Una venta que queda 'cancelada' porque una NC la cubre entera sigue
+# sumando su total al saldo del cliente (la NC ya lo resto).
+
+TAMANO_BLOQUE = 2000
+
+CERO = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def _suma(queryset, campo_relacion, campo_monto):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{campo_relacion: OuterRef('pk')})
+            .values(campo_relacion)
+            .annotate(total=Sum(campo_monto))
+            .values('total')
+        ),
+        CERO,
+    )
+
+
+def _aplicado_nc(campo_relacion):
+    return _suma(NotasCreditoAplicacion.objects.filter(nota_credito__estado='aplicada'), campo_relacion, 'monto_aplicado')
+
+
+def _esperado_ventas():
+    return Case(
+        When(fecha_cancelacion__isnull=False, then=CERO),
+        default=F('total') - _suma(CobrosDetalle.objects.all(), 'venta', 'monto_aplicado') - _aplicado_nc('venta'),
+    )
+
+
+def _esperado_compras():
+    return Case(
+        When(fecha_cancelacion__isnull=False, then=CERO),
+        default=F('total') - _suma(PagosDetalle.objects.all(), 'compra', 'monto_aplicado') - _aplicado_nc('compra'),
+    )
+
+
+def _esperado_cobros():
+    return F('monto') - _suma(CobrosDetalle.objects.all(), 'cobro', 'monto_aplicado')
+
+
+def _esperado_pagos():
+    return F('monto') - _suma(PagosDetalle.objects.all(), 'pago', 'monto_aplicado')
+
+
+def _esperado_contactos():
+    return (
+        _suma(Ventas.objects.filter(fecha_cancelacion__isnull=True), 'cliente', 'total')
+        - _suma(Cobros.objects.all(), 'cliente', 'monto')
+        - _suma(Pagos.objects.all(), 'proveedor', 'monto')
+        - _suma(NotasCredito.objects.filter(estado='aplicada'), 'contacto', 'total')
+        - _suma(Compras.objects.filter(fecha_cancelacion__isnull=False), 'proveedor', 'total')
+    )
+
+
+# modelo -> expresion del saldo esperado
+ESPERADOS = {
+    Contactos: _esperado_contactos,
+    Ventas: _esperado_ventas,
+    Compras: _esperado_compras,
+    Cobros: _esperado_cobros,
+    Pagos: _esperado_pagos,
+}
+
+
+@dataclass
+class Diferencia:
+    cuenta: str
+    documento: int
+    contacto_id: int
+    guardado: Decimal
+    esperado: Decimal
+
+    @property
+    def delta(self):
+        return self.esperado - self.guardado
+
+
+def _diferencias(modelo, queryset):
+    # Lee saldo guardado y esperado de las filas de `queryset` y devuelve las que no coinciden
+    cuenta, campo, campo_contacto = CUENTAS[modelo]
+    esperado = ESPERADOS[modelo]
+    escala = Decimal(1).scaleb(-modelo._meta.get_field(campo).decimal_places)
+    filas = list(queryset.annotate(esperado=esperado()).values_list('pk', campo_contacto, campo, 'esperado'))
+    diferencias = []
+    for pk, contacto_id, guardado, valor in filas:
+        # En SQLite la resta puede llegar como float: se lleva a la escala del campo
+        valor = Decimal(str(valor)).quantize(escala)
+        if valor != guardado:
+            diferencias.append(Diferencia(cuenta, pk, contacto_id, guardado, valor))
+    return filas, diferencias
+
+
+@transaction.atomic
+def _corregir(modelo, pks):
+    _, campo, campo_contacto = CUENTAS[modelo]
+    # Bloqueo en orden de pk (contactos primero) y nueva medicion: lo que cambio mientras tanto no se pisa
+    bloquear_contactos(modelo.objects.filter(pk__in=pks).values(campo_contacto))
+    list(modelo.objects.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk'))
+    _, diferencias = _diferencias(modelo, modelo.objects.filter(pk__in=pks))
+    if not diferencias:
+        return []
+
+    ahora = timezone.now()
+    instancias = [modelo(pk=d.documento, **{campo: d.esperado, 'actualizado_en': ahora}) for d in diferencias]
+    modelo.objects.bulk_update(instancias, [campo, 'actualizado_en'])
+
+    hoy = timezone.localdate()
+    MovimientosCuenta.objects.bulk_create([
+        MovimientosCuenta(
+            contacto_id=d.contacto_id, fecha=hoy, cuenta=d.cuenta, documento=d.documento,
+            tipo='ajuste', delta=d.delta, saldo=d.esperado,
+        )
+        for d in diferencias
+    ])
+
+    # saldo_pendiente entra en el resumen diario
+    if modelo in (Ventas, Compras):
+        documentos = list(modelo.objects.filter(pk__in=[d.documento for d in diferencias]))
+        actualizar_resumen(**{'ventas' if modelo is Ventas else 'compras': documentos})
+    reconstruir_saldos_mensuales(contactos={d.contacto_id for d in diferencias})
+    return diferencias
+
+
+def reconciliar_saldos(modelos=None, corregir=False, tamano=TAMANO_BLOQUE):
+    """Compara los saldos guardados con los esperados; devuelve {cuenta: [Diferencia]}.
+
+    Recorre cada tabla en bloques de `tamano` filas por pk. Con `corregir`, guarda el esperado.
+    """
+    resultado = {}
+    for modelo in modelos or ESPERADOS:
+        diferencias = []
+        ultimo = 0
+        while True:
+            filas, bloque = _diferencias(modelo, modelo.objects.filter(pk__gt=ultimo).order_by('pk')[:tamano])
+            if not filas:
+                break
+            ultimo = filas[-1][0]
+            if bloque and corregir:
+                bloque = _corregir(modelo, [d.documento for d in bloque])
+            diferencias.extend(bloque)
+        resultado[CUENTAS[modelo][0]] = diferencias
+    return resultado
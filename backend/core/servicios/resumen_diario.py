@@ -0,0 +1,186 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+from core.models import Cobros, CobrosMedioPago, Compras, Pagos, PagosMedioPago, ResumenDiario, Ventas
+from core.servicios.saldos import bloquear_contactos
+from core.servicios.saldos_mensuales import actualizar_saldos_mensuales
+
+# ======================================================
+# RESUMEN DIARIO
+# ======================================================
+
+# ResumenDiario guarda, por (fecha, contacto, tipo, forma_pago, estado), la
+# cantidad de documentos, el total, el saldo pendiente y lo ingresado por
+# medio de pago. Las automatizaciones llaman a actualizar_resumen con los
+# documentos que tocaron: las filas de esas fechas y contactos se vuelven a
+# agrupar desde las tablas de documentos dentro de la misma transaccion.
+# `manage.py reconstruir_resumen_diario` lo arma desde cero. Con las ventas y
+# cobros tambien se actualizan los saldos mensuales de cuenta corriente.
+#
+# Al editar o borrar un documento se pasan la version anterior y la nueva,
+# asi se rearman tanto la fecha y el contacto viejos como los nuevos.
+# Las filas se borran y se vuelven a insertar: antes se bloquean los
+# contactos, asi dos transacciones que tocan el mismo contacto se esperan en
+# lugar de chocar contra la restriccion unica (o de dejar filas con datos de
+# una lectura vieja).
+
+
+def _agrupar_documentos(queryset, campo_fecha, campo_contacto, campo_estado):
+    filas = (
+        queryset
+        .values(campo_fecha, campo_contacto, 'forma_pago', campo_estado)
+        .annotate(
+            cantidad=Count('id'),
+            total=Sum('total'),
+            saldo=Sum('saldo_pendiente', filter=Q(saldo_pendiente__gt=0)),
+        )
+        .order_by()
+    )
+    for fila in filas:
+        yield {
+            'fecha': fila[campo_fecha],
+            'contacto_id': fila[campo_contacto],
+            'forma_pago': fila['forma_pago'],
+            'estado': fila[campo_estado],
+            'cantidad': fila['cantidad'],
+            'total': fila['total'] or Decimal('0'),
+            'saldo': fila['saldo'] or Decimal('0'),
+        }
+
+
+def _agrupar_movimientos(queryset, modelo_medios, relacion, campo_fecha, campo_contacto):
+    # Los movimientos sin medios de pago (legado) se cuentan por su medio_pago
+    filas = (
+        queryset
+        .annotate(con_medios=Exists(modelo_medios.objects.filter(**{relacion: OuterRef('pk')})))
+        .values(campo_fecha, campo_contacto)
+        .annotate(
+            cantidad=Count('id'),
+            total=Sum('monto'),
+            efectivo=Sum('monto', filter=Q(con_medios=False, medio_pago='efectivo')),
+            transferencia=Sum('monto', filter=Q(con_medios=False, medio_pago='transferencia')),
+        )
+        .order_by()
+    )
+    medios = (
+        modelo_medios.objects
+        .filter(**{f'{relacion}__in': queryset})
+        .values(f'{relacion}__{campo_fecha}', f'{relacion}__{campo_contacto}')
+        .annotate(
+            efectivo=Sum('monto', filter=Q(medio_pago='efectivo')),
+            transferencia=Sum('monto', filter=Q(medio_pago='transferencia')),
+        )
+        .order_by()
+    )
+    por_medio = {
+        (fila[f'{relacion}__{campo_fecha}'], fila[f'{relacion}__{campo_contacto}']): fila
+        for fila in medios
+    }
+
+    for fila in filas:
+        clave = (fila[campo_fecha], fila[campo_contacto])
+        medio = por_medio.get(clave, {})
+        yield {
+            'fecha': fila[campo_fecha],
+            'contacto_id': fila[campo_contacto],
+            'cantidad': fila['cantidad'],
+            'total': fila['total'] or Decimal('0'),
+            'efectivo': (fila['efectivo'] or Decimal('0')) + (medio.get('efectivo') or Decimal('0')),
+            'transferencia': (
+                (fila['transferencia'] or Decimal('0')) + (medio.get('transferencia') or Decimal('0'))
+            ),
+        }
+
+
+def _filas_ventas(filtro):
+    ventas = Ventas.objects.exclude(estado_venta='cancelada').filter(filtro('fecha_venta', 'cliente_id'))
+    return _agrupar_documentos(ventas, 'fecha_venta', 'cliente_id', 'estado_cobro')
+
+
+def _filas_compras(filtro):
+    compras = Compras.objects.exclude(estado_compra='cancelada').filter(filtro('fecha_compra', 'proveedor_id'))
+    return _agrupar_documentos(compras, 'fecha_compra', 'proveedor_id', 'estado_pago')
+
+
+def _filas_cobros(filtro):
+    cobros = Cobros.objects.filter(filtro('fecha_cobro', 'cliente_id'))
+    return _agrupar_movimientos(cobros, CobrosMedioPago, 'cobro', 'fecha_cobro', 'cliente_id')
+
+
+def _filas_pagos(filtro):
+    pagos = Pagos.objects.filter(filtro('fecha_pago', 'proveedor_id'))
+    return _agrupar_movimientos(pagos, PagosMedioPago, 'pago', 'fecha_pago', 'proveedor_id')
+
+
+FUENTES = {
+    'venta': _filas_ventas,
+    'compra': _filas_compras,
+    'cobro': _filas_cobros,
+    'pago': _filas_pagos,
+}
+
+
+def _reemplazar(tipo, filtro):
+    # Se borran y se vuelven a insertar todas las filas del tipo que cumplen el
+    # filtro; como se agrupa con el mismo filtro, no quedan filas a medias.
+    ResumenDiario.objects.filter(tipo=tipo).filter(filtro('fecha', 'contacto_id')).delete()
+    ResumenDiario.objects.bulk_create(
+        [ResumenDiario(tipo=tipo, **fila) for fila in FUENTES[tipo](filtro)],
+        batch_size=1000,
+    )
+
+
+def _claves(documentos, campo_fecha, campo_contacto):
+    fechas = set()
+    contactos = set()
+    for documento in documentos:
+        fechas.add(getattr(documento, campo_fecha))
+        contactos.add(getattr(documento, campo_contacto))
+    return fechas, contactos
+
+
+@transaction.atomic
+def actualizar_resumen(ventas=(), compras=(), cobros=(), pagos=()):
+    """Recalcula las filas de ResumenDiario de las fechas y contactos de los documentos."""
+    documentos = {
+        'venta': (ventas, 'fecha_venta', 'cliente_id'),
+        'compra': (compras, 'fecha_compra', 'proveedor_id'),
+        'cobro': (cobros, 'fecha_cobro', 'cliente_id'),
+        'pago': (pagos, 'fecha_pago', 'proveedor_id'),
+    }
+    claves = {
+        tipo: _claves(lista, campo_fecha, campo_contacto)
+        for tipo, (lista, campo_fecha, campo_contacto) in documentos.items()
+        if lista
+    }
+    if not claves:
+        return
+    bloquear_contactos(set().union(*(contactos for _, contactos in claves.values())))
+
+    for tipo, (fechas, contactos) in claves.items():
+
+        def filtro(campo_fecha, campo_contacto, fechas=fechas, contactos=contactos):
+            return Q(**{f'{campo_fecha}__in': fechas, f'{campo_contacto}__in': contactos})
+
+        _reemplazar(tipo, filtro)
+
+    if ventas or cobros:
+        actualizar_saldos_mensuales(ventas=ventas, cobros=cobros)
+
+
+@transaction.atomic
+def reconstruir_resumen(desde=None, hasta=None):
+    """Arma ResumenDiario desde cero para el rango de fechas (todo si no se indica)."""
+    def filtro(campo_fecha, campo_contacto):
+        condicion = Q()
+        if desde:
+            condicion &= Q(**{f'{campo_fecha}__gte': desde})
+        if hasta:
+            condicion &= Q(**{f'{campo_fecha}__lte': hasta})
+        return condicion
+
+    for tipo in FUENTES:
+        _reemplazar(tipo, filtro)
+    return ResumenDiario.objects.filter(filtro('fecha', 'contacto_id')).count()
@@ -0,0 +1,209 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.utils import timezone
+
+from core.models import Cobros, Compras, Contactos, MovimientosCuenta, NotasCredito, Pagos, Ventas
+
+# ======================================================
+# SALDOS
+# ======================================================
+
+# Los saldos (saldo_contacto, saldo_pendiente, saldo_disponible) se modifican
+# con un unico UPDATE ... SET saldo = saldo + delta ... RETURNING saldo: la base
+# aplica el delta sobre el valor vigente, asi dos workers que tocan la misma
+# fila no pisan sus cambios, y el valor nuevo queda en la instancia sin un
+# SELECT extra. RETURNING lo soportan PostgreSQL y SQLite >= 3.35.
+#
+# Cada cambio agrega una fila a MovimientosCuenta con el delta y el saldo que
+# quedo, y el documento que lo origino. Por cuenta, la suma de los deltas es
+# el saldo guardado.
+
+# modelo -> (cuenta, campo del saldo, campo del contacto)
+CUENTAS = {
+    Contactos: ('contacto', 'saldo_contacto', 'id'),
+    Ventas: ('venta', 'saldo_pendiente', 'cliente_id'),
+    Compras: ('compra', 'saldo_pendiente', 'proveedor_id'),
+    Cobros: ('cobro', 'saldo_disponible', 'cliente_id'),
+    Pagos: ('pago', 'saldo_disponible', 'proveedor_id'),
+}
+
+# modelo -> (tipo de movimiento, campo de fecha)
+ORIGENES = {
+    Ventas: ('venta', 'fecha_venta'),
+    Compras: ('compra', 'fecha_compra'),
+    Cobros: ('cobro', 'fecha_cobro'),
+    Pagos: ('pago', 'fecha_pago'),
+    NotasCredito: ('nota_credito', 'fecha_nota'),
+}
+
+
+def _movimiento(instancia, delta, saldo, origen, tipo=None, fecha=None):
+    cuenta, _, campo_contacto = CUENTAS[type(instancia)]
+    tipo_origen, campo_fecha = ORIGENES[type(origen)]
+    return MovimientosCuenta(
+        contacto_id=getattr(instancia, campo_contacto),
+        fecha=fecha or getattr(origen, campo_fecha) or timezone.localdate(),
+        cuenta=cuenta,
+        documento=instancia.pk,
+        tipo=tipo or tipo_origen,
+        origen=origen.pk,
+        delta=delta,
+        saldo=saldo,
+    )
+
+
+def mover_saldo(instancia, delta, origen, tipo=None, fecha=None):
+    """Suma `delta` al saldo de `instancia`, lo registra en el libro y devuelve el saldo nuevo.
+
+    `origen` es el documento que causa el movimiento; `fecha` toma por defecto su fecha.
+    Si la fila ya no existe levanta DoesNotExist, como un .get().
+    """
+    meta = instancia._meta
+    campo = meta.get_field(CUENTAS[type(instancia)][1])
+    actualizado_en = meta.get_field('actualizado_en')
+    quote = connection.ops.quote_name
+
+    sql = (
+        f"UPDATE {quote(meta.db_table)} "
+        f"SET {quote(campo.column)} = {quote(campo.column)} + %s, {quote(actualizado_en.column)} = %s "
+        f"WHERE {quote(meta.pk.column)} = %s "
+        f"RETURNING {quote(campo.column)}"
+    )
+    parametros = [
+        campo.get_db_prep_save(delta, connection),
+        actualizado_en.get_db_prep_save(timezone.now(), connection),
+        instancia.pk,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        fila = cursor.fetchone()
+    if fila is None:
+        raise type(instancia).DoesNotExist(f"{meta.object_name} matching query does not exist.")
+    (valor,) = fila
+
+    columna = campo.get_col(meta.db_table)
+    for convertir in connection.ops.get_db_converters(columna) + campo.get_db_converters(connection):
+        valor = convertir(valor, columna, connection)
+    setattr(instancia, campo.attname, valor)
+
+    _movimiento(instancia, delta, valor, origen, tipo, fecha).save()
+    return valor
+
+
+@transaction.atomic
+def fijar_saldo(instancia, saldo, origen, tipo=None, fecha=None):
+    """Lleva el saldo de `instancia` a `saldo` (lee el vigente con FOR UPDATE) y registra la diferencia."""
+    campo = CUENTAS[type(instancia)][1]
+    actual = type(instancia).objects.select_for_update().values_list(campo, flat=True).get(pk=instancia.pk)
+    return mover_saldo(instancia, saldo - actual, origen, tipo, fecha)
+
+
+def abrir_saldos(documentos):
+    """Registra el saldo con el que se crearon `documentos` como su primer movimiento."""
+    movimientos = []
+    for documento in documentos:
+        saldo = getattr(documento, CUENTAS[type(documento)][1])
+        movimientos.append(_movimiento(documento, saldo, saldo, documento))
+    MovimientosCuenta.objects.bulk_create(movimientos)
+
+
+def _por_pk(valores, output_field, default=None):
+    return Case(
+        *[When(pk=pk, then=Value(valor)) for pk, valor in valores.items()],
+        default=default,
+        output_field=output_field,
+    )
+
+
+def mover_saldos(modelo, movimientos, **otros):
+    """Aplica [(instancia, delta, origen)] de `modelo` con un unico UPDATE agrupado por fila.
+
+    `otros` suma columnas al mismo UPDATE: {campo: {pk: valor}}. Deja el saldo nuevo en cada instancia.
+    """
+    deltas = defaultdict(Decimal)
+    for instancia, delta, _ in movimientos:
+        deltas[instancia.pk] += delta
+    if not deltas:
+        return
+
+    campo = CUENTAS[modelo][1]
+    saldo = modelo._meta.get_field(campo)
+    tipo_delta = DecimalField(max_digits=saldo.max_digits, decimal_places=saldo.decimal_places)
+    modelo.objects.filter(pk__in=deltas).update(
+        **{campo: F(campo) + _por_pk(deltas, tipo_delta)},
+        **{
+            nombre: _por_pk(valores, modelo._meta.get_field(nombre), default=F(nombre))
+            for nombre, valores in otros.items()
+        },
+        actualizado_en=timezone.now(),
+    )
+    # El UPDATE deja las filas bloqueadas: el saldo leido es el que dejo este lote.
+    # Hacia atras desde el saldo final sale el saldo despues de cada movimiento.
+    saldos = dict(modelo.objects.filter(pk__in=deltas).values_list('pk', campo))
+    for instancia, _, _ in movimientos:
+        setattr(instancia, saldo.attname, saldos[instancia.pk])
+    filas = []
+    for instancia, delta, origen in reversed(movimientos):
+        filas.append(_movimiento(instancia, delta, saldos[instancia.pk], origen))
+        saldos[instancia.pk] -= delta
+    MovimientosCuenta.objects.bulk_create(reversed(filas))
+
+
+def mover_saldos_contactos(movimientos):
+    """Aplica [(contacto_id, delta, origen)] con un unico UPDATE agrupado por contacto."""
+    mover_saldos(Contactos, [(Contactos(pk=contacto_id), delta, origen) for contacto_id, delta, origen in movimientos])
+
+
+def saldo_contacto_al(contacto, fecha):
+    """saldo_contacto al final de `fecha`, segun el libro (rango del indice por contacto y fecha).
+
+    Para fechas anteriores al libro responde con las aperturas, que la migracion 0030 fecho con los
+    documentos de cada contacto.
+    """
+    return MovimientosCuenta.objects.filter(
+        cuenta='contacto', contacto=contacto, fecha__lte=fecha
+    ).aggregate(saldo=Sum('delta'))['saldo'] or Decimal('0')
+
+
+# Antes de validar montos contra saldos, los documentos involucrados se
+# vuelven a leer con SELECT ... FOR UPDATE: todos los de una tabla en una
+# query y en orden de pk, asi dos transacciones que toman los mismos
+# documentos los esperan en el mismo orden y no se trancan entre si. Orden
+# entre tablas, en toda escritura: contactos (bloquear_contactos, al empezar
+# la transaccion), el cobro o pago que se modifica, ventas, compras.
+
+
+def bloquear_documentos(items, campo):
+    """Reemplaza item[campo] en cada item por la misma fila bloqueada hasta el fin de la transaccion."""
+    documentos = [item[campo] for item in items if item.get(campo) is not None]
+    if not documentos:
+        return
+    modelo = type(documentos[0])
+    bloqueados = {
+        documento.pk: documento
+        for documento in modelo.objects.select_for_update().filter(
+            pk__in={documento.pk for documento in documentos}
+        ).order_by('pk')
+    }
+    for item in items:
+        if item.get(campo) is not None:
+            item[campo] = bloqueados[item[campo].pk]
+
+
+def contactos_de(documentos):
+    """Ids de los contactos de `documentos` (contactos, ventas, compras, cobros o pagos; ignora None)."""
+    return {getattr(documento, CUENTAS[type(documento)][2]) for documento in documentos if documento is not None}
+
+
+def bloquear_contactos(contactos):
+    """Toma las filas de los contactos (ids) con SELECT ... FOR UPDATE, en orden de pk."""
+    list(Contactos.objects.select_for_update().filter(pk__in=contactos).order_by('pk').values_list('pk', flat=True))
+
+
+def bloquear(instancia):
+    """Vuelve a leer `instancia` con SELECT ... FOR UPDATE."""
+    instancia.refresh_from_db(from_queryset=type(instancia).objects.select_for_update())
+    return instancia
@@ -0,0 +1,133 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DateField, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth
+
+from core.models import Cobros, Contactos, SaldoMensual, Ventas
+from core.servicios.saldos import bloquear_contactos
+
+# ======================================================
+# SALDOS MENSUALES (cuenta corriente)
+# ======================================================
+
+# SaldoMensual guarda el saldo de cuenta corriente de cada cliente al cierre
+# de cada mes con ventas o cobros. El saldo inicial de un resumen desde una
+# fecha sale del ultimo cierre anterior a ese mes mas las ventas y cobros del
+# mes hasta la fecha, sin recorrer la historia.
+#
+# actualizar_resumen (resumen_diario) llama a actualizar_saldos_mensuales con
+# las ventas y cobros que tocaron las automatizaciones: se rearman los meses
+# del cliente desde el mas antiguo afectado. `manage.py
+# reconstruir_saldos_mensuales` los arma desde cero.
+
+
+def _mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _por_mes(queryset, campo_fecha, campo_contacto, campo_monto):
+    filas = (
+        queryset
+        .annotate(mes=TruncMonth(campo_fecha, output_field=DateField()))
+        .values(campo_contacto, 'mes')
+        .annotate(monto=Sum(campo_monto))
+        .order_by()
+    )
+    return {(fila[campo_contacto], fila['mes']): fila['monto'] or Decimal('0') for fila in filas}
+
+
+def _recalcular(contactos=None, desde=None):
+    # Rearma los cierres desde el mes `desde` (todos si es None) de `contactos`
+    # (todos si es None), partiendo del ultimo cierre anterior de cada uno.
+    ventas = Ventas.objects.exclude(estado_venta='cancelada')
+    cobros = Cobros.objects.all()
+    existentes = SaldoMensual.objects.all()
+    if contactos is not None:
+        ventas = ventas.filter(cliente_id__in=contactos)
+        cobros = cobros.filter(cliente_id__in=contactos)
+        existentes = existentes.filter(contacto_id__in=contactos)
+
+    saldos = defaultdict(Decimal)
+    if desde is not None:
+        ventas = ventas.filter(fecha_venta__gte=desde)
+        cobros = cobros.filter(fecha_cobro__gte=desde)
+        existentes = existentes.filter(mes__gte=desde)
+        anteriores = Contactos.objects.filter(pk__in=contactos).annotate(
+            saldo=Subquery(
+                SaldoMensual.objects.filter(contacto=OuterRef('pk'), mes__lt=desde)
+                .order_by('-mes').values('saldo')[:1]
+            )
+        ).values_list('pk', 'saldo')
+        saldos.update({contacto_id: saldo for contacto_id, saldo in anteriores if saldo is not None})
+
+    debe = _por_mes(ventas, 'fecha_venta', 'cliente_id', 'total')
+    haber = _por_mes(cobros, 'fecha_cobro', 'cliente_id', 'monto')
+
+    filas = []
+    for contacto_id, mes in sorted(debe.keys() | haber.keys()):
+        fila = SaldoMensual(
+            contacto_id=contacto_id,
+            mes=mes,
+            debe=debe.get((contacto_id, mes), Decimal('0')),
+            haber=haber.get((contacto_id, mes), Decimal('0')),
+        )
+        saldos[contacto_id] += fila.debe - fila.haber
+        fila.saldo = saldos[contacto_id]
+        filas.append(fila)
+
+    existentes.delete()
+    SaldoMensual.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+@transaction.atomic
+def actualizar_saldos_mensuales(ventas=(), cobros=()):
+    """Rearma los cierres de los clientes de `ventas` y `cobros` desde el mes mas antiguo que tocan."""
+    desde = {}
+    documentos = [(venta.cliente_id, venta.fecha_venta) for venta in ventas]
+    documentos += [(cobro.cliente_id, cobro.fecha_cobro) for cobro in cobros]
+    for contacto_id, fecha in documentos:
+        mes = _mes(fecha)
+        desde[contacto_id] = min(desde.get(contacto_id, mes), mes)
+
+    # Se borran y se vuelven a insertar las filas: con los contactos bloqueados
+    bloquear_contactos(desde)
+
+    # Normalmente todos caen en el mismo mes: una pasada por mes distinto
+    por_mes = defaultdict(list)
+    for contacto_id, mes in desde.items():
+        por_mes[mes].append(contacto_id)
+    for mes, contactos in por_mes.items():
+        _recalcular(contactos, mes)
+
+
+@transaction.atomic
+def reconstruir_saldos_mensuales(contactos=None):
+    """Arma SaldoMensual desde cero (para `contactos`, o todos). Devuelve la cantidad de filas."""
+    return _recalcular(contactos)
+
+
+def _suma_del_cliente(queryset, campo_monto):
+    return Subquery(
+        queryset.filter(cliente=OuterRef('pk')).values('cliente').annotate(total=Sum(campo_monto)).values('total')
+    )
+
+
+def saldo_cuenta_corriente_al_inicio(cliente, fecha):
+    """Saldo de cuenta corriente de `cliente` antes de `fecha` (ventas no canceladas menos cobros).
+
+    Una sola query: ultimo cierre anterior al mes de `fecha` mas ventas y cobros del mes hasta `fecha`.
+    """
+    mes = _mes(fecha)
+    ventas = Ventas.objects.filter(fecha_venta__gte=mes, fecha_venta__lt=fecha).exclude(estado_venta='cancelada')
+    cobros = Cobros.objects.filter(fecha_cobro__gte=mes, fecha_cobro__lt=fecha)
+    cierre, debe, haber = Contactos.objects.filter(pk=cliente.pk).annotate(
+        cierre=Subquery(
+            SaldoMensual.objects.filter(contacto=OuterRef('pk'), mes__lt=mes).order_by('-mes').values('saldo')[:1]
+        ),
+        debe=_suma_del_cliente(ventas, 'total'),
+        haber=_suma_del_cliente(cobros, 'monto'),
+    ).values_list('cierre', 'debe', 'haber').get()
+    return (cierre or Decimal('0')) + (debe or Decimal('0')) - (haber or Decimal('0'))
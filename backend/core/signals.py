@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .autocompletado import invalidar_catalogo
+from .dashboard import invalidar_dashboard
+from .models import (
+    Usuarios,
+    Contactos,
+    Productos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosDetalle,
+    CobrosMedioPago,
+    Compras,
+    ComprasDetalle,
+    Pagos,
+    PagosDetalle,
+    PagosMedioPago,
+    NotasCredito,
+    NotasCreditoDetalle,
+    NotasCreditoAplicacion,
+    Eliminaciones,
+)
+
+# ============================================================
+# Tombstones para sincronizacion incremental
+# ============================================================
+
+MODELOS_SINCRONIZADOS = [
+    Usuarios,
+    Contactos,
+    Productos,
+    Ventas,
+    Cobros,
+    Compras,
+    Pagos,
+    NotasCredito,
+]
+
+
+def registrar_eliminacion(sender, instance, **kwargs):
+    Eliminaciones.objects.create(modelo=sender._meta.label, objeto_id=instance.pk)
+
+
+for modelo in MODELOS_SINCRONIZADOS:
+    receiver(post_delete, sender=modelo, dispatch_uid=f"eliminacion_{modelo._meta.label}")(
+        registrar_eliminacion
+    )
+
+
+# ============================================================
+# Version de los indices de autocompletado
+# ============================================================
+
+CATALOGOS_AUTOCOMPLETADO = {
+    Contactos: ("contactos", {"nombre", "nombre_fantasia", "tipo", "activo"}),
+    Productos: ("productos", {
+        "nombre",
+        "rubro",
+        "unidad_medida",
+        "activo",
+        "precio_minorista",
+        "precio_mayorista",
+        "precio_mayorista_exclusivo",
+        "precio_oferta",
+    }),
+}
+
+
+def invalidar_autocompletado(sender, instance, update_fields=None, **kwargs):
+    catalogo, campos = CATALOGOS_AUTOCOMPLETADO[sender]
+    # Guardados parciales que no tocan el indice (ej. saldo_contacto) no lo invalidan
+    if update_fields is not None and not campos.intersection(update_fields):
+        return
+    # Despues del commit, para que ningun proceso reconstruya con datos viejos
+    transaction.on_commit(lambda: invalidar_catalogo(catalogo))
+
+
+for modelo in CATALOGOS_AUTOCOMPLETADO:
+    receiver(post_save, sender=modelo, dispatch_uid=f"autocompletado_save_{modelo._meta.label}")(
+        invalidar_autocompletado
+    )
+    receiver(post_delete, sender=modelo, dispatch_uid=f"autocompletado_delete_{modelo._meta.label}")(
+        invalidar_autocompletado
+    )
+
+
+# ============================================================
+# Version de los datos del dashboard
+# ============================================================
+
+MODELOS_DASHBOARD = [
+    Contactos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosDetalle,
+    CobrosMedioPago,
+    Compras,
+    ComprasDetalle,
+    Pagos,
+    PagosDetalle,
+    PagosMedioPago,
+    NotasCredito,
+    NotasCreditoDetalle,
+    NotasCreditoAplicacion,
+]
+
+
+def invalidar_cache_dashboard(sender, **kwargs):
+    # Despues del commit: antes, otro request podria cachear datos viejos con la version nueva
+    transaction.on_commit(invalidar_dashboard)
+
+
+for modelo in MODELOS_DASHBOARD:
+    receiver(post_save, sender=modelo, dispatch_uid=f"dashboard_save_{modelo._meta.label}")(
+        invalidar_cache_dashboard
+    )
+    receiver(post_delete, sender=modelo, dispatch_uid=f"dashboard_delete_{modelo._meta.label}")(
+        invalidar_cache_dashboard
+    )
+
+
+# ============================================================
+# Documentos modificados por sus filas hijas
+# ============================================================
+
+# Detalles, medios de pago y aplicaciones no tienen actualizado_en: al
+# guardarlos o borrarlos se actualiza el del documento que los muestra, asi el
+# GET condicional (core.mixins) no responde 304 con datos viejos.
+
+DOCUMENTOS_DE_FILAS_HIJAS = {
+    VentasDetalle: ["venta"],
+    CobrosDetalle: ["cobro", "venta"],
+    CobrosMedioPago: ["cobro"],
+    ComprasDetalle: ["compra"],
+    PagosDetalle: ["pago", "compra"],
+    PagosMedioPago: ["pago"],
+    NotasCreditoDetalle: ["nota_credito"],
+    NotasCreditoAplicacion: ["nota_credito", "venta", "compra"],
+}
+
+
+def marcar_documentos_modificados(sender, instance, **kwargs):
+    ahora = timezone.now()
+    for campo in DOCUMENTOS_DE_FILAS_HIJAS[sender]:
+        documento_id = getattr(instance, f"{campo}_id")
+        if documento_id is not None:
+            modelo = sender._meta.get_field(campo).related_model
+            modelo.objects.filter(pk=documento_id).update(actualizado_en=ahora)
+
+
+for modelo in DOCUMENTOS_DE_FILAS_HIJAS:
+    receiver(post_save, sender=modelo, dispatch_uid=f"modificacion_save_{modelo._meta.label}")(
+        marcar_documentos_modificados
+    )
+    receiver(post_delete, sender=modelo, dispatch_uid=f"modificacion_delete_{modelo._meta.label}")(
+        marcar_documentos_modificados
+    )
@@ -0,0 +1,142 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from core.models import Contactos, Compras, Pagos, Ventas
+from core.serializers import CobrosSerializer, NotasCreditoSerializer, PagosSerializer
+from core.servicios.automatizaciones import cancelar_venta_domain
+
+pytestmark = pytest.mark.django_db
+
+# Entre is_valid() y save() otro cobro puede bajar el saldo de la venta: la
+# validacion de montos tiene que usar la fila bloqueada y no la que se leyo
+# al validar los ids.
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente Test", tipo="cliente", saldo_contacto=Decimal("300"))
+
+
+@pytest.fixture
+def proveedor():
+    return Contactos.objects.create(nombre="Proveedor Test", tipo="proveedor", saldo_contacto=Decimal("100"))
+
+
+@pytest.fixture
+def ventas(cliente):
+    return [
+        Ventas.objects.create(
+            cliente=cliente, fecha_venta=date.today(), total=Decimal("100"), saldo_pendiente=Decimal("100")
+        )
+        for _ in range(3)
+    ]
+
+
+@pytest.fixture
+def compra(proveedor):
+    return Compras.objects.create(
+        proveedor=proveedor, fecha_compra=date.today(), total=Decimal("100"), saldo_pendiente=Decimal("100")
+    )
+
+
+def _cobro(cliente, detalles):
+    return CobrosSerializer(data={
+        "cliente": cliente.id,
+        "fecha_cobro": date.today(),
+        "medio_pago": "efectivo",
+        "monto": sum(Decimal(d["monto_aplicado"]) for d in detalles),
+        "detalles": detalles,
+    })
+
+
+def test_cobro_valida_contra_el_saldo_vigente(cliente, ventas):
+    serializer = _cobro(cliente, [{"venta": ventas[0].id, "monto_aplicado": "80"}])
+    assert serializer.is_valid(), serializer.errors
+
+    # Otro cobro entra despues de is_valid()
+    Ventas.objects.filter(pk=ventas[0].pk).update(saldo_pendiente=Decimal("50"))
+
+    with pytest.raises(ValidationError):
+        serializer.save()
+    ventas[0].refresh_from_db()
+    assert ventas[0].saldo_pendiente == Decimal("50")
+
+
+def test_cobro_bloquea_ventas_en_una_query_en_orden_de_pk(cliente, ventas):
+    detalles = [{"venta": venta.id, "monto_aplicado": "10"} for venta in reversed(ventas)]
+    detalles.append({"venta": ventas[2].id, "monto_aplicado": "10"})
+    serializer = _cobro(cliente, detalles)
+    assert serializer.is_valid(), serializer.errors
+
+    with CaptureQueriesContext(connection) as ctx:
+        serializer.save()
+
+    tabla = Ventas._meta.db_table
+    lecturas = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and f'FROM "{tabla}"' in q["sql"]]
+    bloqueo = lecturas[0]
+    assert f'"{tabla}"."id" IN ({", ".join(str(venta.id) for venta in ventas)})' in bloqueo
+    assert f'ORDER BY "{tabla}"."id" ASC' in bloqueo
+    # La misma venta dos veces comparte la fila bloqueada: los saldos se acumulan
+    ventas[2].refresh_from_db()
+    assert ventas[2].saldo_pendiente == Decimal("80")
+
+
+def test_actualizar_pago_usa_saldo_disponible_vigente(proveedor, compra):
+    pago = Pagos.objects.create(
+        proveedor=proveedor, fecha_pago=date.today(), monto=Decimal("100"), saldo_disponible=Decimal("100")
+    )
+    serializer = PagosSerializer(pago, data={"detalles": [{"compra": compra.id, "monto_aplicado": "60"}]}, partial=True)
+    assert serializer.is_valid(), serializer.errors
+
+    # Otra aplicacion del mismo pago entra despues de is_valid()
+    Pagos.objects.filter(pk=pago.pk).update(saldo_disponible=Decimal("40"))
+
+    with pytest.raises(ValidationError):
+        serializer.save()
+    pago.refresh_from_db()
+    assert pago.saldo_disponible == Decimal("40")
+
+
+def test_nota_credito_aplica_sobre_la_fila_bloqueada(cliente, ventas):
+    serializer = NotasCreditoSerializer(data={
+        "contacto": cliente.id,
+        "tipo": "venta",
+        "monto": "30",
+        "aplicaciones": [{"venta": ventas[1].id, "monto_aplicado": "30"}],
+    })
+    assert serializer.is_valid(), serializer.errors
+    Ventas.objects.filter(pk=ventas[1].pk).update(saldo_pendiente=Decimal("70"))
+
+    serializer.save()
+
+    ventas[1].refresh_from_db()
+    assert ventas[1].saldo_pendiente == Decimal("40")
+    assert ventas[1].estado_cobro == "parcial"
+
+
+def _primer_bloqueo(ctx, modelo):
+    tabla = modelo._meta.db_table
+    for posicion, query in enumerate(ctx.captured_queries):
+        sql = query["sql"]
+        if sql.startswith("SELECT") and f'FROM "{tabla}"' in sql and "ORDER BY" in sql:
+            return posicion
+    return None
+
+
+def test_cobro_y_cancelacion_bloquean_el_contacto_antes_que_las_ventas(cliente, ventas):
+    # Mismo orden entre tablas en toda escritura: contactos, despues documentos
+    serializer = _cobro(cliente, [{"venta": ventas[0].id, "monto_aplicado": "10"}])
+    assert serializer.is_valid(), serializer.errors
+    with CaptureQueriesContext(connection) as ctx:
+        serializer.save()
+    assert _primer_bloqueo(ctx, Contactos) < _primer_bloqueo(ctx, Ventas)
+
+    with CaptureQueriesContext(connection) as ctx:
+        cancelar_venta_domain(ventas[1])
+    primera_escritura = next(i for i, q in enumerate(ctx.captured_queries) if q["sql"].startswith("UPDATE"))
+    assert _primer_bloqueo(ctx, Contactos) < primera_escritura
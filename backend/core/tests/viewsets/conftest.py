@@ -0,0 +1,155 @@
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import (
+    Usuarios,
+    Contactos,
+    Productos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosDetalle,
+    CobrosMedioPago,
+    Compras,
+    ComprasDetalle,
+    Pagos,
+    PagosDetalle,
+    PagosMedioPago,
+    NotasCredito,
+    NotasCreditoDetalle,
+    NotasCreditoAplicacion,
+)
+from core.servicios.resumen_diario import reconstruir_resumen
+from core.servicios.saldos_mensuales import reconstruir_saldos_mensuales
+
+# ============================================================
+# Presupuesto de queries
+# ============================================================
+
+# `sembrador` crea un juego de datos que crece de a "unidades": cada unidad
+# agrega contactos, productos y documentos con sus detalles, y ademas suma
+# filas hijas a los documentos principales (los que usan las rutas de
+# detalle). `medir_queries` hace un GET y devuelve cuantas queries ejecuto,
+# cuanto tardaron y el tiempo total de la respuesta. Con ambos, un test
+# compara N contra 10xN unidades.
+
+
+@dataclass
+class Medicion:
+    status: int
+    queries: int
+    ms: float
+    sql_ms: float
+
+
+class Sembrador:
+    def __init__(self):
+        self.unidades = 0
+        hoy = timezone.localdate()
+        self.cliente = Contactos.objects.create(nombre="Cliente Principal", tipo="cliente", saldo_contacto=Decimal("100.00"))
+        self.proveedor = Contactos.objects.create(nombre="Proveedor Principal", tipo="proveedor")
+        self.producto = Productos.objects.create(nombre="Producto Principal", rubro="huevos", unidad_medida="un")
+        user = User.objects.create_user(username="usuario_principal", password="x")
+        self.usuario = Usuarios.objects.create(user=user, nombre_completo="Usuario Principal")
+
+        self.venta = Ventas.objects.create(
+            cliente=self.cliente, forma_pago="cuenta corriente",
+            total=Decimal("1000.00"), saldo_pendiente=Decimal("1000.00"), vencimiento=hoy,
+        )
+        self.cobro = Cobros.objects.create(cliente=self.cliente, monto=Decimal("1000.00"), saldo_disponible=Decimal("1000.00"))
+        self.compra = Compras.objects.create(proveedor=self.proveedor, total=Decimal("1000.00"), saldo_pendiente=Decimal("1000.00"))
+        self.pago = Pagos.objects.create(proveedor=self.proveedor, monto=Decimal("1000.00"), saldo_disponible=Decimal("1000.00"))
+        self.nota_credito = NotasCredito.objects.create(contacto=self.cliente, tipo="venta", total=Decimal("10.00"))
+
+        self.venta_detalle = VentasDetalle.objects.create(venta=self.venta, producto=self.producto, cantidad=1, precio_unitario=10)
+        self.cobro_detalle = CobrosDetalle.objects.create(cobro=self.cobro, venta=self.venta, monto_aplicado=Decimal("1.00"))
+        self.compra_detalle = ComprasDetalle.objects.create(compra=self.compra, producto=self.producto, cantidad=1, precio_unitario=10)
+        self.pago_detalle = PagosDetalle.objects.create(pago=self.pago, compra=self.compra, monto_aplicado=Decimal("1.00"))
+
+    def agregar(self, unidades):
+        hoy = timezone.localdate()
+        for _ in range(unidades):
+            i = self.unidades = self.unidades + 1
+            fecha = hoy - timedelta(days=i % 30)
+            cliente = Contactos.objects.create(nombre=f"Cliente {i}", tipo="cliente", saldo_contacto=Decimal("50.00"))
+            proveedor = Contactos.objects.create(nombre=f"Proveedor {i}", tipo="proveedor")
+            producto = Productos.objects.create(nombre=f"Producto {i}", rubro="huevos", unidad_medida="un")
+            user = User.objects.create_user(username=f"usuario_{i}", password="x")
+            Usuarios.objects.create(user=user, nombre_completo=f"Usuario {i}")
+
+            for cliente_venta in (self.cliente, cliente):
+                venta = Ventas.objects.create(
+                    cliente=cliente_venta, forma_pago="cuenta corriente", fecha_venta=fecha,
+                    total=Decimal("100.00"), saldo_pendiente=Decimal("50.00"), estado_cobro="parcial",
+                    vencimiento=hoy + timedelta(days=i % 10),
+                )
+                VentasDetalle.objects.create(venta=venta, producto=producto, cantidad=1, precio_unitario=60)
+                VentasDetalle.objects.create(venta=venta, producto=self.producto, cantidad=1, precio_unitario=40)
+
+                cobro = Cobros.objects.create(cliente=cliente_venta, fecha_cobro=fecha, monto=Decimal("50.00"))
+                CobrosDetalle.objects.create(cobro=cobro, venta=venta, monto_aplicado=Decimal("50.00"))
+                CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("20.00"))
+                CobrosMedioPago.objects.create(cobro=cobro, medio_pago="transferencia", monto=Decimal("30.00"))
+
+            compra = Compras.objects.create(
+                proveedor=proveedor, fecha_compra=fecha,
+                total=Decimal("80.00"), saldo_pendiente=Decimal("40.00"), estado_pago="parcial",
+            )
+            ComprasDetalle.objects.create(compra=compra, producto=producto, cantidad=2, precio_unitario=40)
+            pago = Pagos.objects.create(proveedor=proveedor, fecha_pago=fecha, monto=Decimal("40.00"))
+            PagosDetalle.objects.create(pago=pago, compra=compra, monto_aplicado=Decimal("40.00"))
+            PagosMedioPago.objects.create(pago=pago, medio_pago="efectivo", monto=Decimal("40.00"))
+
+            nota = NotasCredito.objects.create(contacto=cliente, tipo="venta", total=Decimal("10.00"))
+            NotasCreditoDetalle.objects.create(nota_credito=nota, producto=producto, cantidad=1, precio_unitario=10)
+            NotasCreditoAplicacion.objects.create(nota_credito=nota, venta=venta, monto_aplicado=Decimal("10.00"))
+
+            # Hijos de los documentos principales: las rutas de detalle tambien crecen
+            VentasDetalle.objects.create(venta=self.venta, producto=producto, cantidad=1, precio_unitario=10)
+            CobrosDetalle.objects.create(cobro=self.cobro, venta=venta, monto_aplicado=Decimal("1.00"))
+            CobrosMedioPago.objects.create(cobro=self.cobro, medio_pago="efectivo", monto=Decimal("1.00"))
+            ComprasDetalle.objects.create(compra=self.compra, producto=producto, cantidad=1, precio_unitario=10)
+            PagosDetalle.objects.create(pago=self.pago, compra=compra, monto_aplicado=Decimal("1.00"))
+            PagosMedioPago.objects.create(pago=self.pago, medio_pago="efectivo", monto=Decimal("1.00"))
+            NotasCreditoDetalle.objects.create(nota_credito=self.nota_credito, producto=producto, cantidad=1, precio_unitario=1)
+            NotasCreditoAplicacion.objects.create(nota_credito=self.nota_credito, venta=venta, monto_aplicado=Decimal("1.00"))
+        # Los documentos se crean sin automatizaciones: el resumen y los saldos mensuales se arman aparte
+        reconstruir_resumen()
+        reconstruir_saldos_mensuales()
+        # Los indices en memoria (autocompletado) se reconstruyen con los datos nuevos
+        cache.clear()
+        return self
+
+
+@pytest.fixture
+def sembrador(db):
+    return Sembrador()
+
+
+@pytest.fixture
+def medir_queries():
+    def medir(client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            inicio = time.perf_counter()
+            response = client.get(url)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+            total_ms = (time.perf_counter() - inicio) * 1000
+        sql_ms = sum(float(query["time"]) for query in ctx.captured_queries) * 1000
+        return Medicion(
+            status=response.status_code,
+            queries=len(ctx.captured_queries),
+            ms=total_ms,
+            sql_ms=sql_ms,
+        )
+
+    return medir
@@ -0,0 +1,135 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core import autocompletado
+from core.autocompletado import version_catalogo
+from core.models import Contactos, Productos, Ventas, VentasDetalle
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    # La base se revierte entre tests; la version del indice tambien
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def contactos():
+    return {
+        "martinez": Contactos.objects.create(nombre="Martínez Hnos", tipo="cliente"),
+        "marta": Contactos.objects.create(nombre="Marta Díaz", nombre_fantasia="Almacén La Esquina", tipo="cliente"),
+        "mayorista": Contactos.objects.create(nombre="Mayorista Sur", tipo="proveedor"),
+        "inactivo": Contactos.objects.create(nombre="Mario Inactivo", tipo="cliente", activo=False),
+    }
+
+
+def nombres(res):
+    return [item["nombre"] for item in res.data]
+
+
+def test_autocompletado_por_prefijo_sin_acentos(api_client, user, contactos):
+    res = api_client.get("/api/autocomplete/contactos/?q=MAR")
+
+    assert res.status_code == 200
+    assert nombres(res) == ["Marta Díaz", "Martínez Hnos"]
+    assert nombres(api_client.get("/api/autocomplete/contactos/?q=martin")) == ["Martínez Hnos"]
+    assert nombres(api_client.get("/api/autocomplete/contactos/?q=esq alm")) == ["Marta Díaz"]
+
+
+def test_autocompletado_ordena_por_uso_reciente(api_client, user, contactos):
+    hoy = timezone.localdate()
+    for _ in range(3):
+        Ventas.objects.create(cliente=contactos["martinez"], forma_pago="contado", fecha_venta=hoy)
+    for _ in range(5):
+        Ventas.objects.create(
+            cliente=contactos["marta"], forma_pago="contado", fecha_venta=hoy - timedelta(days=365)
+        )
+
+    assert nombres(api_client.get("/api/autocomplete/contactos/?q=mar")) == ["Martínez Hnos", "Marta Díaz"]
+
+
+def test_autocompletado_filtra_por_tipo_y_limita(api_client, user, contactos):
+    assert nombres(api_client.get("/api/autocomplete/contactos/?q=ma&tipo=proveedor")) == ["Mayorista Sur"]
+    assert len(api_client.get("/api/autocomplete/contactos/?q=ma&limit=1").data) == 1
+
+
+def test_autocompletado_no_consulta_la_base_si_no_hay_cambios(api_client, user, contactos):
+    api_client.get("/api/autocomplete/contactos/?q=mar")
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get("/api/autocomplete/contactos/?q=may")
+
+    assert nombres(res) == ["Mayorista Sur"]
+    assert len(ctx.captured_queries) == 0
+
+
+def test_autocompletado_se_invalida_al_modificar(api_client, user, contactos, django_capture_on_commit_callbacks):
+    api_client.get("/api/autocomplete/contactos/?q=mar")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Contactos.objects.create(nombre="Marcos Nuevo", tipo="cliente")
+    assert "Marcos Nuevo" in nombres(api_client.get("/api/autocomplete/contactos/?q=marc"))
+
+    # Guardar solo el saldo no invalida el indice
+    version = version_catalogo("contactos")
+    with django_capture_on_commit_callbacks(execute=True):
+        contactos["marta"].saldo_contacto = Decimal("10.00")
+        contactos["marta"].save(update_fields=["saldo_contacto", "actualizado_en"])
+    assert version_catalogo("contactos") == version
+
+
+def test_autocompletado_de_productos(api_client, user):
+    hoy = timezone.localdate()
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    pechuga = Productos.objects.create(nombre="Pechuga", rubro="trozados y derivados", unidad_medida="kg")
+    Productos.objects.create(nombre="Pata muslo", rubro="trozados y derivados", unidad_medida="kg")
+    venta = Ventas.objects.create(cliente=cliente, forma_pago="contado", fecha_venta=hoy)
+    VentasDetalle.objects.create(venta=venta, producto=pechuga, cantidad=1, precio_unitario=10)
+
+    res = api_client.get("/api/autocomplete/productos/?q=p")
+
+    assert nombres(res) == ["Pechuga", "Pata muslo"]
+    assert res.data[0]["unidad_medida"] == "kg"
+    assert isinstance(res.data[0]["precio_minorista"], str)
+
+
+def test_autocompletado_catalogo_inexistente(api_client, user):
+    assert api_client.get("/api/autocomplete/usuarios/?q=a").status_code == 404
+
+
+@pytest.mark.parametrize("a_ordenar", [0, 10_000])
+def test_indice_recorre_en_orden_de_ranking(monkeypatch, a_ordenar):
+    # Con 0 todo prefijo recorre las entradas; con 10000 se ordena el rango de bisect
+    monkeypatch.setattr(autocompletado, "COINCIDENCIAS_A_ORDENAR", a_ordenar)
+    textos = [f"{chr(97 + i % 3)}{chr(97 + i % 7)}{i} zeta{i % 5}" for i in range(500)]
+    entradas = [{"id": i} for i in range(500)]
+    indice = autocompletado.IndicePrefijos(entradas, textos)
+
+    for consulta in ["a", "ab", "zeta3", "b zeta1", "ca1", "x"]:
+        palabras = consulta.split()
+        esperado = [
+            entrada for entrada, texto in zip(entradas, textos)
+            if all(any(p.startswith(prefijo) for p in texto.split()) for prefijo in palabras)
+        ][:7]
+        assert indice.buscar(consulta, 7) == esperado, consulta
+    assert indice.buscar("a", 3, filtro=lambda entrada: entrada["id"] % 2) == [{"id": 3}, {"id": 9}, {"id": 15}]
@@ -0,0 +1,75 @@
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Productos
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def datos():
+    Contactos.objects.create(nombre="Cliente A", tipo="cliente")
+    Contactos.objects.create(nombre="Proveedor A", tipo="proveedor")
+    Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+
+def test_batch_devuelve_las_respuestas_en_orden(api_client, user, datos):
+    rutas = ["/contactos/?tipo=cliente", "/api/productos/", "/dashboard/"]
+
+    res = api_client.post("/api/batch/", {"requests": rutas}, format="json")
+
+    assert res.status_code == 200
+    respuestas = res.data["responses"]
+    assert [item["path"] for item in respuestas] == rutas
+    assert [item["status"] for item in respuestas] == [200, 200, 200]
+    assert respuestas[0]["body"] == api_client.get("/api/contactos/?tipo=cliente").data
+    assert [item["nombre"] for item in respuestas[1]["body"]] == ["Huevos"]
+    assert "cards" in respuestas[2]["body"]
+    assert respuestas[0]["etag"] == api_client.get("/api/contactos/?tipo=cliente")["ETag"]
+
+
+def test_batch_usa_autenticacion_con_jwt(datos):
+    User.objects.create_user(username="jwtuser", password="jwtpass")
+    client = APIClient()
+    token = client.post(
+        "/api/token/", {"username": "jwtuser", "password": "jwtpass"}, format="json"
+    ).data["access"]
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    res = client.post("/api/batch/", {"requests": ["/productos/"]}, format="json")
+
+    assert res.data["responses"][0]["status"] == 200
+    assert len(res.data["responses"][0]["body"]) == 1
+
+
+def test_batch_requiere_autenticacion(datos):
+    res = APIClient().post("/api/batch/", {"requests": ["/productos/"]}, format="json")
+
+    assert res.status_code == 403
+
+
+def test_batch_informa_errores_por_item(api_client, user, datos):
+    rutas = ["/no-existe/", "/contactos/999999/", "/batch/", "/ventas/?format=ndjson"]
+
+    res = api_client.post("/api/batch/", {"requests": rutas}, format="json")
+
+    assert [item["status"] for item in res.data["responses"]] == [404, 404, 400, 406]
+
+
+def test_batch_valida_cantidad_de_requests(api_client, user):
+    assert api_client.post("/api/batch/", {"requests": []}, format="json").status_code == 400
+    res = api_client.post("/api/batch/", {"requests": ["/productos/"] * 21}, format="json")
+    assert res.status_code == 400
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Productos, Ventas, Compras
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def contactos():
+    return {
+        "jose": Contactos.objects.create(nombre="José Pérez", tipo="cliente"),
+        "maria": Contactos.objects.create(nombre="María Josefina Gómez", tipo="cliente"),
+        "almacen": Contactos.objects.create(nombre="Juan Lopez", nombre_fantasia="Almacén Don Juan", tipo="cliente"),
+        "granja": Contactos.objects.create(nombre="Granja Ñandú", tipo="proveedor"),
+    }
+
+
+def nombres(res):
+    return [item["nombre"] for item in res.data]
+
+
+def test_busqueda_de_contactos_ignora_acentos_y_mayusculas(api_client, user, contactos):
+    assert nombres(api_client.get("/api/contactos/?nombre=PEREZ")) == ["José Pérez"]
+    assert nombres(api_client.get("/api/contactos/?nombre=nandu")) == ["Granja Ñandú"]
+
+
+def test_busqueda_de_contactos_incluye_nombre_fantasia(api_client, user, contactos):
+    assert nombres(api_client.get("/api/contactos/?nombre=almacen")) == ["Juan Lopez"]
+
+
+def test_busqueda_ordena_por_relevancia(api_client, user, contactos):
+    # "José Pérez" empieza con el texto; "María Josefina" solo lo contiene
+    assert nombres(api_client.get("/api/contactos/?nombre=jose")) == ["José Pérez", "María Josefina Gómez"]
+
+
+def test_busqueda_de_productos(api_client, user):
+    Productos.objects.create(nombre="Pechuga de pollo", rubro="trozados y derivados", unidad_medida="kg")
+    Productos.objects.create(nombre="Huevos blancos", rubro="huevos", unidad_medida="un")
+
+    assert nombres(api_client.get("/api/productos/?nombre=POLLO")) == ["Pechuga de pollo"]
+
+
+def test_busqueda_por_nombre_de_cliente_y_proveedor(api_client, user, contactos):
+    venta = Ventas.objects.create(cliente=contactos["jose"], forma_pago="contado")
+    Ventas.objects.create(cliente=contactos["almacen"], forma_pago="contado")
+    compra = Compras.objects.create(proveedor=contactos["granja"])
+
+    assert [item["id"] for item in api_client.get("/api/ventas/?cliente=perez").data] == [venta.id]
+    assert [item["id"] for item in api_client.get("/api/compras/?proveedor=ñandu").data] == [compra.id]
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="la similitud por trigramas requiere PostgreSQL")
+def test_busqueda_tolera_errores_de_tipeo(api_client, user, contactos):
+    assert "José Pérez" in nombres(api_client.get("/api/contactos/?nombre=jose peres"))
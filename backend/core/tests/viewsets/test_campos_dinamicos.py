@@ -0,0 +1,108 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import (
+    Contactos,
+    Productos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosDetalle,
+    CobrosMedioPago,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente Test", tipo="cliente")
+
+
+@pytest.fixture
+def venta(cliente):
+    producto = Productos.objects.create(nombre="Producto", rubro="huevos", unidad_medida="un")
+    venta = Ventas.objects.create(
+        cliente=cliente,
+        forma_pago="contado",
+        total=Decimal("100.00"),
+        saldo_pendiente=Decimal("40.00"),
+    )
+    VentasDetalle.objects.create(venta=venta, producto=producto, cantidad=1, precio_unitario=100)
+    cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("60.00"))
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("60.00"))
+    CobrosDetalle.objects.create(cobro=cobro, venta=venta, monto_aplicado=Decimal("60.00"))
+    return venta
+
+
+def test_sin_parametros_devuelve_representacion_completa(api_client, user, venta):
+    res = api_client.get(f"/api/ventas/{venta.id}/")
+
+    item = res.data
+    assert "detalles" in item
+    assert "cliente_nombre" in item
+    assert "cobros_detalle" not in item
+
+
+def test_fields_limita_campos(api_client, user, venta):
+    res = api_client.get("/api/ventas/?fields=id,fecha_venta,total,estado_cobro")
+
+    assert res.status_code == 200
+    assert set(res.data[0]) == {"id", "fecha_venta", "total", "estado_cobro"}
+
+
+def test_fields_no_consulta_relaciones_omitidas(api_client, user, venta):
+    with CaptureQueriesContext(connection) as ctx:
+        api_client.get(f"/api/ventas/{venta.id}/?fields=id,total")
+
+    sql = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert "core_ventasdetalle" not in sql
+    assert "core_contactos" not in sql
+    assert "direccion_entrega" not in sql
+
+
+def test_expand_agrega_relaciones(api_client, user, venta):
+    res = api_client.get("/api/ventas/?fields=id,total&expand=detalles,cobros_detalle")
+
+    item = res.data[0]
+    assert set(item) == {"id", "total", "detalles", "cobros_detalle"}
+    assert len(item["detalles"]) == 1
+    assert item["cobros_detalle"][0]["monto_aplicado"] == "60.00"
+
+
+def test_fields_con_campo_calculado(api_client, user, venta):
+    res = api_client.get("/api/cobros/?fields=id,medio_pago_resumen")
+
+    assert res.data == [{"id": res.data[0]["id"], "medio_pago_resumen": "efectivo"}]
+
+
+def test_escritura_ignora_fields(api_client, user, cliente):
+    producto = Productos.objects.create(nombre="Otro", rubro="huevos", unidad_medida="un")
+    res = api_client.post(
+        "/api/ventas/?fields=id",
+        {
+            "cliente": cliente.id,
+            "forma_pago": "contado",
+            "detalles": [{"producto": producto.id, "cantidad": 1, "precio_unitario": "10.00"}],
+        },
+        format="json",
+    )
+
+    assert res.status_code == 201
+    assert "detalles" in res.data
@@ -0,0 +1,259 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import dashboard
+from core.dashboard import cerrar_pools, clave_dashboard, evaluar_secciones, invalidar_dashboard, version_dashboard
+from core.models import Contactos, Productos, Ventas, Cobros, CobrosMedioPago, Compras, Pagos
+from core.servicios.resumen_diario import reconstruir_resumen
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def datos():
+    hoy = timezone.localdate()
+    cliente = Contactos.objects.create(nombre="Cliente A", tipo="cliente", saldo_contacto=Decimal("100.00"))
+    proveedor = Contactos.objects.create(nombre="Proveedor A", tipo="proveedor")
+
+    def venta(total, saldo, estado_cobro, vencimiento=None, **extra):
+        return Ventas.objects.create(
+            cliente=cliente, forma_pago="cuenta corriente", total=Decimal(total),
+            saldo_pendiente=Decimal(saldo), estado_cobro=estado_cobro, vencimiento=vencimiento, **extra,
+        )
+
+    venta("100.00", "0.00", "cobrado")
+    venta("50.00", "20.00", "parcial", hoy)
+    venta("30.00", "30.00", "pendiente", hoy + timedelta(days=5))
+    venta("40.00", "40.00", "pendiente", hoy + timedelta(days=20))
+    venta("10.00", "10.00", "pendiente", hoy - timedelta(days=1))
+    venta("999.00", "999.00", "pendiente", hoy, estado_venta="cancelada")
+
+    Compras.objects.create(proveedor=proveedor, total=Decimal("60.00"), saldo_pendiente=Decimal("0.00"), estado_pago="pagado")
+    Compras.objects.create(proveedor=proveedor, total=Decimal("40.00"), saldo_pendiente=Decimal("40.00"), estado_pago="pendiente")
+    Compras.objects.create(
+        proveedor=proveedor, total=Decimal("500.00"), saldo_pendiente=Decimal("500.00"), estado_compra="cancelada"
+    )
+
+    cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("70.00"))
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("50.00"))
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="transferencia", monto=Decimal("20.00"))
+    # Cobro legado, sin medios de pago
+    Cobros.objects.create(cliente=cliente, monto=Decimal("15.00"), medio_pago="efectivo")
+
+    Pagos.objects.create(proveedor=proveedor, monto=Decimal("30.00"))
+    # Los documentos se crearon sin pasar por las automatizaciones
+    reconstruir_resumen()
+    return {"cliente": cliente, "proveedor": proveedor}
+
+
+def _decimales(data):
+    if isinstance(data, dict):
+        return {clave: _decimales(valor) for clave, valor in data.items()}
+    return Decimal(data)
+
+
+def test_dashboard_tarjetas(api_client, datos):
+    res = api_client.get("/api/dashboard/")
+
+    assert res.status_code == 200
+    cards = res.data["cards"]
+    assert _decimales(cards["ventas_totales"]) == {
+        "total": Decimal("230"), "cobradas": Decimal("100"), "parciales": Decimal("50"), "pendientes": Decimal("80"),
+    }
+    assert _decimales(cards["compras_totales"]) == {
+        "total": Decimal("100"), "pagadas": Decimal("60"), "parciales": Decimal("0"), "pendientes": Decimal("40"),
+    }
+    assert Decimal(cards["ganancia_bruta"]) == Decimal("130")
+    assert _decimales(cards["ingresos_caja"]) == {
+        "total": Decimal("85"),
+        "por_medio_pago": {"efectivo": Decimal("65"), "transferencia": Decimal("20")},
+    }
+    assert Decimal(cards["egresos_caja"]["total"]) == Decimal("30")
+    assert Decimal(cards["flujo_neto"]) == Decimal("55")
+    assert Decimal(cards["deuda_clientes"]) == Decimal("100")
+    assert Decimal(cards["deuda_proveedores"]) == Decimal("40")
+
+
+def test_dashboard_vencimientos(api_client, datos):
+    res = api_client.get("/api/dashboard/")
+
+    por_vencer = res.data["documentos_por_vencer"]
+    assert {nombre: bucket["cantidad"] for nombre, bucket in por_vencer.items()} == {
+        "hoy": 1, "proximos_7_dias": 1, "proximos_30_dias": 1,
+    }
+    assert {nombre: Decimal(bucket["saldo"]) for nombre, bucket in por_vencer.items()} == {
+        "hoy": Decimal("20"), "proximos_7_dias": Decimal("30"), "proximos_30_dias": Decimal("40"),
+    }
+    assert res.data["documentos_vencidos"]["cantidad"] == 1
+    assert Decimal(res.data["documentos_vencidos"]["saldo"]) == Decimal("10")
+
+
+def test_dashboard_filtro_medio_pago(api_client, datos):
+    res = api_client.get("/api/dashboard/?medio_pago=efectivo")
+
+    ingresos = res.data["cards"]["ingresos_caja"]
+    assert Decimal(ingresos["total"]) == Decimal("85")
+    assert Decimal(ingresos["por_medio_pago"]["efectivo"]) == Decimal("65")
+
+
+def test_dashboard_sin_datos(api_client):
+    res = api_client.get("/api/dashboard/")
+
+    assert res.data["cards"]["ventas_totales"]["total"] == "0"
+    assert res.data["documentos_vencidos"] == {"cantidad": 0, "saldo": "0"}
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+
+def test_dashboard_repetido_sale_de_cache(api_client, datos, django_assert_num_queries):
+    primera = api_client.get("/api/dashboard/?cliente=%s&medio_pago=efectivo" % datos["cliente"].id)
+
+    # Mismos filtros en otro orden y con parametros ajenos: misma entrada
+    with django_assert_num_queries(0):
+        segunda = api_client.get("/api/dashboard/?medio_pago=efectivo&_=123&cliente=%s" % datos["cliente"].id)
+
+    assert segunda.data == primera.data
+
+
+def test_dashboard_se_invalida_al_escribir(api_client, datos, django_capture_on_commit_callbacks):
+    assert api_client.get("/api/dashboard/").data["cards"]["ventas_totales"]["total"] != "0"
+
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        res = api_client.post("/api/ventas/", {
+            "cliente": datos["cliente"].id,
+            "forma_pago": "contado",
+            "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": "70.00"}],
+        }, format="json")
+    assert res.status_code == 201
+
+    cards = api_client.get("/api/dashboard/").data["cards"]
+    assert Decimal(cards["ventas_totales"]["total"]) == Decimal("300")
+    assert Decimal(cards["ventas_totales"]["pendientes"]) == Decimal("150")
+
+
+def test_dashboard_se_invalida_con_alta_masiva(api_client, datos, django_capture_on_commit_callbacks):
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+    api_client.get("/api/dashboard/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        res = api_client.post("/api/ventas/bulk/", [{
+            "cliente": datos["cliente"].id,
+            "forma_pago": "contado",
+            "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": "20.00"}],
+        }], format="json")
+    assert res.status_code == 201
+
+    cards = api_client.get("/api/dashboard/").data["cards"]
+    assert Decimal(cards["ventas_totales"]["total"]) == Decimal("250")
+
+
+def test_version_cambia_sin_repetirse():
+    versiones = [version_dashboard()]
+    for _ in range(3):
+        invalidar_dashboard()
+        versiones.append(version_dashboard())
+
+    assert len(set(versiones)) == 4
+
+
+def test_produccion_usa_una_cache_compartida():
+    # Con LocMemCache cada worker tendria su propia version del dashboard
+    from lupon_admin import settings as produccion
+
+    assert produccion.CACHES["default"]["BACKEND"] == "django.core.cache.backends.db.DatabaseCache"
+
+
+def test_dashboard_clave_cambia_con_el_dia():
+    hoy = timezone.localdate()
+    filtros = {"cliente": "1"}
+
+    assert clave_dashboard(filtros, hoy, 1) != clave_dashboard(filtros, hoy + timedelta(days=1), 1)
+    assert clave_dashboard(filtros, hoy, 1) != clave_dashboard(filtros, hoy, 2)
+
+
+# ============================================================
+# Secciones en paralelo
+# ============================================================
+
+
+def _hilo():
+    return threading.current_thread().name
+
+
+def test_secciones_en_serie_por_defecto(settings):
+    settings.DASHBOARD_HILOS = 0
+
+    resultado = evaluar_secciones({"a": _hilo, "b": _hilo})
+
+    assert resultado == {"a": threading.current_thread().name, "b": threading.current_thread().name}
+
+
+def test_secciones_en_serie_dentro_de_una_transaccion(settings):
+    # Los tests corren dentro de una transaccion: otra conexion no veria los datos
+    settings.DASHBOARD_HILOS = 4
+
+    assert set(evaluar_secciones({"a": _hilo, "b": _hilo}).values()) == {threading.current_thread().name}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dashboard_en_paralelo_igual_que_en_serie(api_client, datos, settings):
+    settings.DASHBOARD_HILOS = 0
+    en_serie = {
+        url: api_client.get(url).data
+        for url in ("/api/dashboard/", "/api/dashboard/?medio_pago=efectivo")
+    }
+    assert en_serie["/api/dashboard/"]["cards"]["ventas_totales"]["total"] != "0"
+    cache.clear()
+
+    settings.DASHBOARD_HILOS = 4
+    for url, esperado in en_serie.items():
+        assert api_client.get(url).data == esperado
+    hilos = evaluar_secciones({"a": _hilo, "b": _hilo})
+    assert all(nombre.startswith("dashboard") for nombre in hilos.values())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hilos_conservan_su_conexion_hasta_cerrar_el_pool(settings):
+    settings.DASHBOARD_HILOS = 2
+
+    def conexion():
+        from django.db import connection
+        connection.ensure_connection()
+        return id(connection.connection)
+
+    primeras = set(evaluar_secciones({"a": conexion, "b": conexion}).values())
+    segundas = set(evaluar_secciones({"a": conexion, "b": conexion}).values())
+    # Cuatro tareas, una conexion por hilo
+    assert len(primeras | segundas) <= 2
+    assert dashboard._conexiones_pool
+
+    cerrar_pools()
+    assert not dashboard._pools and not dashboard._conexiones_pool
+    assert len(evaluar_secciones({"a": _hilo, "b": _hilo})) == 2
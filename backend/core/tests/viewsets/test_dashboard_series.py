@@ -0,0 +1,140 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from core.dashboard import periodos, sumar_periodos
+from core.models import Contactos, Cobros, CobrosMedioPago, Compras, Pagos, Ventas
+from core.servicios.resumen_diario import reconstruir_resumen
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def datos():
+    cliente = Contactos.objects.create(nombre="Cliente A", tipo="cliente")
+    otro = Contactos.objects.create(nombre="Cliente B", tipo="cliente")
+    proveedor = Contactos.objects.create(nombre="Proveedor A", tipo="proveedor")
+
+    def venta(fecha, total, contacto=cliente, **extra):
+        Ventas.objects.create(
+            cliente=contacto, forma_pago="contado", fecha_venta=fecha,
+            total=Decimal(total), saldo_pendiente=Decimal(total), **extra,
+        )
+
+    # Octubre 2026 (periodo pedido) y septiembre 2026 (periodo anterior)
+    venta(date(2026, 10, 1), "100.00")
+    venta(date(2026, 10, 1), "50.00", contacto=otro)
+    venta(date(2026, 10, 3), "20.00")
+    venta(date(2026, 10, 3), "999.00", estado_venta="cancelada")
+    venta(date(2026, 9, 30), "10.00")
+    venta(date(2026, 9, 12), "7.00")
+
+    Compras.objects.create(
+        proveedor=proveedor, forma_pago="contado", fecha_compra=date(2026, 10, 2),
+        total=Decimal("40.00"), saldo_pendiente=Decimal("40.00"),
+    )
+    cobro = Cobros.objects.create(cliente=cliente, fecha_cobro=date(2026, 10, 3), monto=Decimal("30.00"))
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("10.00"))
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="transferencia", monto=Decimal("20.00"))
+    Cobros.objects.create(
+        cliente=cliente, fecha_cobro=date(2026, 10, 2), monto=Decimal("5.00"), medio_pago="transferencia"
+    )
+    Pagos.objects.create(proveedor=proveedor, fecha_pago=date(2026, 9, 29), monto=Decimal("15.00"))
+    reconstruir_resumen()
+    return {"cliente": cliente}
+
+
+def test_series_diarias_completan_huecos(api_client, datos):
+    res = api_client.get("/api/dashboard/series/?granularity=day&fecha_desde=2026-10-01&fecha_hasta=2026-10-03")
+
+    assert res.status_code == 200
+    series = res.data["series"]
+    assert [fila["periodo"] for fila in series] == [date(2026, 10, 1), date(2026, 10, 2), date(2026, 10, 3)]
+    assert [Decimal(fila["ventas"]) for fila in series] == [Decimal("150"), Decimal("0"), Decimal("20")]
+    assert [Decimal(fila["compras"]) for fila in series] == [Decimal("0"), Decimal("40"), Decimal("0")]
+    assert [Decimal(fila["cobros"]) for fila in series] == [Decimal("0"), Decimal("5"), Decimal("30")]
+
+    # Periodo anterior: los tres dias previos
+    assert res.data["periodo_anterior"] == {"desde": date(2026, 9, 28), "hasta": date(2026, 9, 30)}
+    anteriores = [fila["anterior"] for fila in series]
+    assert [fila["periodo"] for fila in anteriores] == [date(2026, 9, 28), date(2026, 9, 29), date(2026, 9, 30)]
+    assert [Decimal(fila["ventas"]) for fila in anteriores] == [Decimal("0"), Decimal("0"), Decimal("10")]
+    assert [Decimal(fila["pagos"]) for fila in anteriores] == [Decimal("0"), Decimal("15"), Decimal("0")]
+
+
+def test_series_mensuales_con_filtros(api_client, datos):
+    res = api_client.get(
+        f"/api/dashboard/series/?granularity=month&fecha_desde=2026-10-01&fecha_hasta=2026-10-31"
+        f"&cliente={datos['cliente'].id}"
+    )
+
+    (octubre,) = res.data["series"]
+    assert octubre["periodo"] == date(2026, 10, 1)
+    assert Decimal(octubre["ventas"]) == Decimal("120")
+    assert octubre["anterior"]["periodo"] == date(2026, 9, 1)
+    assert Decimal(octubre["anterior"]["ventas"]) == Decimal("17")
+
+
+def test_series_semanales(api_client, datos):
+    res = api_client.get("/api/dashboard/series/?granularity=week&fecha_desde=2026-09-28&fecha_hasta=2026-10-04")
+
+    (semana,) = res.data["series"]
+    assert semana["periodo"] == date(2026, 9, 28)
+    assert Decimal(semana["ventas"]) == Decimal("180")
+    assert semana["anterior"]["periodo"] == date(2026, 9, 21)
+
+
+def test_series_por_medio_de_pago(api_client, datos):
+    res = api_client.get(
+        "/api/dashboard/series/?granularity=month&fecha_desde=2026-10-01&fecha_hasta=2026-10-31&medio_pago=efectivo"
+    )
+
+    (octubre,) = res.data["series"]
+    # Igual que el dashboard: el cobro con un medio en efectivo cuenta por su monto total
+    assert Decimal(octubre["cobros"]) == Decimal("30")
+    assert Decimal(octubre["ventas"]) == Decimal("170")
+
+
+def test_series_valida_parametros(api_client, datos):
+    assert api_client.get("/api/dashboard/series/?granularity=year").status_code == 400
+    assert api_client.get(
+        "/api/dashboard/series/?fecha_desde=2026-10-05&fecha_hasta=2026-10-01"
+    ).status_code == 400
+    assert api_client.get(
+        "/api/dashboard/series/?granularity=day&fecha_desde=2020-01-01&fecha_hasta=2026-01-01"
+    ).status_code == 400
+
+
+def test_series_por_defecto_ultimos_periodos(api_client, datos):
+    res = api_client.get("/api/dashboard/series/?granularity=month&fecha_hasta=2026-10-15")
+
+    assert len(res.data["series"]) == 12
+    assert res.data["series"][-1]["periodo"] == date(2026, 10, 1)
+    assert res.data["periodo"]["desde"] == date(2025, 11, 1)
+
+
+def test_sumar_periodos_mensuales_ajusta_el_dia():
+    assert sumar_periodos(date(2026, 3, 31), "month", -1) == date(2026, 2, 28)
+    assert sumar_periodos(date(2026, 1, 15), "month", -2) == date(2025, 11, 15)
+    assert periodos(date(2026, 1, 31), date(2026, 3, 1), "month") == [
+        date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1),
+    ]
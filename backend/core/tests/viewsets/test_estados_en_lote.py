@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Cobros, Contactos, NotasCredito, NotasCreditoAplicacion, Productos, Ventas
+from core.servicios.automatizaciones import actualizar_estado_ventas_al_cobrar, aplicar_nota_credito
+from core.servicios.reconciliacion import reconciliar_saldos
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def producto():
+    return Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+
+def _ventas(api_client, cliente, producto, cantidad, precio="10.00"):
+    ids = []
+    for _ in range(cantidad):
+        res = api_client.post("/api/ventas/", {
+            "cliente": cliente.id,
+            "forma_pago": "cuenta corriente",
+            "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}],
+        }, format="json")
+        assert res.status_code == 201, res.data
+        ids.append(res.data["id"])
+    return ids
+
+
+def _queries(funcion, *args):
+    with CaptureQueriesContext(connection) as ctx:
+        funcion(*args)
+    return len(ctx.captured_queries)
+
+
+def test_cobro_recalcula_estados_de_todas_sus_ventas(api_client, producto):
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    completa, parcial = _ventas(api_client, cliente, producto, 2)
+
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": "15.00", "medio_pago": "efectivo",
+        "detalles": [
+            {"venta": completa, "monto_aplicado": "10.00"},
+            {"venta": parcial, "monto_aplicado": "5.00"},
+        ],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    assert dict(Ventas.objects.values_list("id", "estado_cobro")) == {completa: "cobrado", parcial: "parcial"}
+
+
+def test_nota_credito_recalcula_estados(api_client, producto):
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    cubierta, parcial, cobrada = _ventas(api_client, cliente, producto, 3)
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": "5.00", "medio_pago": "efectivo",
+        "detalles": [{"venta": cobrada, "monto_aplicado": "5.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    res = api_client.post("/api/notas-credito/", {
+        "contacto": cliente.id, "tipo": "venta", "monto": "19.00",
+        "aplicaciones": [
+            {"venta": cubierta, "monto_aplicado": "10.00"},
+            {"venta": parcial, "monto_aplicado": "4.00"},
+            {"venta": cobrada, "monto_aplicado": "5.00"},
+        ],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    estados = {v.id: (v.saldo_pendiente, v.estado_cobro, v.estado_venta) for v in Ventas.objects.all()}
+    # Cubierta solo por NC: cancelada contablemente; con un cobro real queda cobrada
+    assert estados[cubierta][:2] == (Decimal("0.00"), "cancelado")
+    assert estados[cubierta][2] == "cancelada"
+    assert estados[parcial][:2] == (Decimal("6.00"), "parcial")
+    assert estados[cobrada][:2] == (Decimal("0.00"), "cobrado")
+    assert estados[cobrada][2] != "cancelada"
+    assert all(not diferencias for diferencias in reconciliar_saldos().values())
+
+
+def test_cobro_sobre_muchas_ventas_usa_queries_constantes(api_client, producto):
+    def medir(cantidad):
+        cliente = Contactos.objects.create(nombre=f"Cliente {cantidad}", tipo="cliente")
+        ids = _ventas(api_client, cliente, producto, cantidad)
+        res = api_client.post("/api/cobros/", {
+            "cliente": cliente.id, "monto": f"{5 * cantidad}.00", "medio_pago": "efectivo",
+            "detalles": [{"venta": venta, "monto_aplicado": "5.00"} for venta in ids],
+        }, format="json")
+        assert res.status_code == 201, res.data
+        return _queries(actualizar_estado_ventas_al_cobrar, Cobros.objects.get(pk=res.data["id"]))
+
+    assert medir(5) == medir(50)
+
+
+def test_nota_credito_sobre_muchas_ventas_usa_queries_constantes(api_client, producto):
+    def medir(cantidad):
+        cliente = Contactos.objects.create(nombre=f"Cliente {cantidad}", tipo="cliente")
+        ids = _ventas(api_client, cliente, producto, cantidad)
+        nota = NotasCredito.objects.create(contacto=cliente, tipo="venta", total=Decimal(cantidad))
+        NotasCreditoAplicacion.objects.bulk_create([
+            NotasCreditoAplicacion(nota_credito=nota, venta_id=venta, monto_aplicado=Decimal("1.00")) for venta in ids
+        ])
+        nota = NotasCredito.objects.get(pk=nota.pk)
+        queries = _queries(aplicar_nota_credito, nota)
+        assert set(Ventas.objects.filter(pk__in=ids).values_list("saldo_pendiente", "estado_cobro")) == {
+            (Decimal("9.00"), "parcial")
+        }
+        return queries
+
+    assert medir(5) == medir(50)
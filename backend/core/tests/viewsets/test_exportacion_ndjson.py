@@ -0,0 +1,103 @@
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Ventas, Cobros, CobrosMedioPago
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente Test", tipo="cliente")
+
+
+def leer_ndjson(response):
+    contenido = b"".join(response.streaming_content).decode("utf-8")
+    return [json.loads(linea) for linea in contenido.splitlines()]
+
+
+def test_export_ndjson_coincide_con_listado(api_client, user, cliente):
+    for dia in range(1, 6):
+        Ventas.objects.create(
+            cliente=cliente,
+            forma_pago="contado",
+            fecha_venta=date(2024, 1, dia),
+            total=Decimal("10.50"),
+        )
+
+    listado = api_client.get("/api/ventas/").data
+    res = api_client.get("/api/ventas/?format=ndjson")
+
+    assert res.status_code == 200
+    assert res.streaming
+    assert res["Content-Type"] == "application/x-ndjson"
+    assert leer_ndjson(res) == json.loads(json.dumps(listado))
+
+
+def test_export_ndjson_respeta_filtros_y_fields(api_client, user, cliente):
+    for dia in range(1, 11):
+        Ventas.objects.create(cliente=cliente, forma_pago="contado", fecha_venta=date(2024, 1, dia))
+
+    res = api_client.get(
+        "/api/ventas/?format=ndjson&fecha_desde=2024-01-03&fecha_hasta=2024-01-05&fields=id,fecha_venta"
+    )
+
+    filas = leer_ndjson(res)
+    assert [fila["fecha_venta"] for fila in filas] == ["2024-01-05", "2024-01-04", "2024-01-03"]
+    assert all(set(fila) == {"id", "fecha_venta"} for fila in filas)
+
+
+def test_export_ndjson_ignora_paginacion_y_usa_queries_constantes(api_client, user, cliente, monkeypatch):
+    from core.views import CobrosViewSet
+
+    monkeypatch.setattr(CobrosViewSet, "ndjson_chunk_size", 7)
+    monkeypatch.setattr(CobrosViewSet, "ndjson_filas_por_envio", 5)
+    for _ in range(23):
+        cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("10.00"))
+        CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("10.00"))
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get("/api/cobros/?format=ndjson&page_size=2")
+        filas = leer_ndjson(res)
+
+    assert len(filas) == 23
+    assert {fila["medio_pago_resumen"] for fila in filas} == {"efectivo"}
+    # validadores (ETag) + un solo cursor para todas las filas
+    assert len(ctx.captured_queries) == 2
+
+
+def test_export_ndjson_por_header_accept(api_client, user, cliente):
+    Ventas.objects.create(cliente=cliente, forma_pago="contado")
+
+    res = api_client.get("/api/ventas/", HTTP_ACCEPT="application/x-ndjson")
+
+    assert res.streaming
+    assert len(leer_ndjson(res)) == 1
+
+
+def test_detalle_en_ndjson_es_una_linea(api_client, user, cliente):
+    venta = Ventas.objects.create(cliente=cliente, forma_pago="contado")
+
+    res = api_client.get(f"/api/ventas/{venta.id}/?format=ndjson")
+
+    lineas = res.content.decode("utf-8").splitlines()
+    assert len(lineas) == 1
+    assert json.loads(lineas[0])["id"] == venta.id
@@ -0,0 +1,148 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.models import Cobros, CobrosDetalle, Contactos, Productos, Ventas, VentasDetalle
+from core.servicios.automatizaciones import saldos_al_crear_venta
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente Test", tipo="cliente")
+
+
+@pytest.fixture
+def venta(cliente):
+    return Ventas.objects.create(cliente=cliente, forma_pago="contado", total=Decimal("100.00"))
+
+
+def test_detalle_devuelve_validadores(api_client, user, venta):
+    res = api_client.get(f"/api/ventas/{venta.id}/")
+
+    assert res.status_code == 200
+    assert res["ETag"]
+    assert res["Last-Modified"]
+
+
+def test_detalle_304_si_no_cambio(api_client, user, venta):
+    etag = api_client.get(f"/api/ventas/{venta.id}/")["ETag"]
+
+    res = api_client.get(f"/api/ventas/{venta.id}/", HTTP_IF_NONE_MATCH=etag)
+
+    assert res.status_code == 304
+    assert not res.content
+
+
+def test_detalle_cambia_etag_al_actualizar_saldo(api_client, user, venta):
+    etag = api_client.get(f"/api/ventas/{venta.id}/")["ETag"]
+
+    saldos_al_crear_venta(venta)
+
+    res = api_client.get(f"/api/ventas/{venta.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res["ETag"] != etag
+
+
+def test_listado_304_si_no_cambio(api_client, user, venta):
+    etag = api_client.get("/api/ventas/")["ETag"]
+
+    res = api_client.get("/api/ventas/", HTTP_IF_NONE_MATCH=etag)
+
+    assert res.status_code == 304
+
+
+def test_listado_etag_depende_de_filtros(api_client, user, venta):
+    todos = api_client.get("/api/ventas/")["ETag"]
+    filtrados = api_client.get("/api/ventas/?estado_venta=pendiente")["ETag"]
+
+    assert todos != filtrados
+
+
+def test_listado_cambia_etag_con_alta_y_baja(api_client, user, cliente, venta):
+    etag = api_client.get("/api/ventas/")["ETag"]
+
+    otra = Ventas.objects.create(cliente=cliente, forma_pago="contado")
+    etag_alta = api_client.get("/api/ventas/", HTTP_IF_NONE_MATCH=etag)["ETag"]
+    assert etag_alta != etag
+
+    otra.delete()
+    res = api_client.get("/api/ventas/", HTTP_IF_NONE_MATCH=etag_alta)
+    assert res.status_code == 200
+
+
+def test_listado_if_modified_since_ve_las_bajas(api_client, user, cliente, venta):
+    otra = Ventas.objects.create(cliente=cliente, forma_pago="contado")
+    Ventas.objects.update(actualizado_en=timezone.now() - timedelta(hours=1))
+    Contactos.objects.update(actualizado_en=timezone.now() - timedelta(hours=1))
+    last_modified = api_client.get("/api/ventas/")["Last-Modified"]
+
+    otra.delete()
+    res = api_client.get("/api/ventas/", HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert res.status_code == 200
+    assert [item["id"] for item in res.data] == [venta.id]
+    assert res["Last-Modified"] != last_modified
+
+
+def test_detalle_inexistente_sigue_dando_404(api_client, user):
+    res = api_client.get("/api/ventas/999/")
+
+    assert res.status_code == 404
+
+
+def test_renombrar_cliente_cambia_validadores(api_client, user, cliente, venta):
+    etag_listado = api_client.get("/api/ventas/")["ETag"]
+    etag_detalle = api_client.get(f"/api/ventas/{venta.id}/")["ETag"]
+
+    cliente.nombre = "Cliente Renombrado"
+    cliente.save()
+
+    res = api_client.get("/api/ventas/", HTTP_IF_NONE_MATCH=etag_listado)
+    assert res.status_code == 200
+    assert res.data[0]["cliente_nombre"] == "Cliente Renombrado"
+    res = api_client.get(f"/api/ventas/{venta.id}/", HTTP_IF_NONE_MATCH=etag_detalle)
+    assert res.status_code == 200
+    assert res.data["cliente_nombre"] == "Cliente Renombrado"
+
+
+def test_filas_hijas_y_expansiones_cambian_validadores(api_client, user, cliente, venta):
+    url = f"/api/ventas/{venta.id}/?expand=cobros_detalle"
+    etag = api_client.get(url)["ETag"]
+
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+    VentasDetalle.objects.create(venta=venta, producto=producto, cantidad=1, precio_unitario=100)
+    res = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert len(res.data["detalles"]) == 1
+
+    cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("40.00"))
+    CobrosDetalle.objects.create(cobro=cobro, venta=venta, monto_aplicado=Decimal("40.00"))
+    etag = api_client.get(url)["ETag"]
+    listado = api_client.get("/api/ventas/?expand=cobros_detalle")["ETag"]
+
+    # Cambia solo el cobro: la venta muestra su fecha en cobros_detalle
+    cobro.fecha_cobro = cobro.fecha_cobro - timedelta(days=1)
+    cobro.save()
+    res = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res.data["cobros_detalle"][0]["fecha_cobro"] == cobro.fecha_cobro.isoformat()
+    res = api_client.get("/api/ventas/?expand=cobros_detalle", HTTP_IF_NONE_MATCH=listado)
+    assert res.status_code == 200
+    assert len(res.data) == 1
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Cobros, CobrosDetalle, Contactos, MovimientosCuenta, Productos, Ventas
+from core.servicios.reconciliacion import reconciliar_saldos
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def producto():
+    return Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+
+def _cliente(nombre="Cliente"):
+    return Contactos.objects.create(nombre=nombre, tipo="cliente", forma_pago="cuenta corriente")
+
+
+def _venta(api_client, cliente, producto, precio, dias_venta=0, dias_vencimiento=None):
+    hoy = timezone.localdate()
+    datos = {
+        "cliente": cliente.id,
+        "forma_pago": "cuenta corriente",
+        "fecha_venta": str(hoy - timedelta(days=dias_venta)),
+        "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}],
+    }
+    res = api_client.post("/api/ventas/", datos, format="json")
+    assert res.status_code == 201, res.data
+    if dias_vencimiento is not None:
+        # vencimiento es de solo lectura en la API
+        Ventas.objects.filter(pk=res.data["id"]).update(vencimiento=hoy + timedelta(days=dias_vencimiento))
+    return res.data["id"]
+
+
+def _cobro(api_client, cliente, monto, dias=0):
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": monto, "medio_pago": "efectivo",
+        "fecha_cobro": str(timezone.localdate() - timedelta(days=dias)),
+    }, format="json")
+    assert res.status_code == 201, res.data
+    return res.data["id"]
+
+
+def _sin_diferencias():
+    return all(not diferencias for diferencias in reconciliar_saldos().values())
+
+
+def test_imputar_cobro_por_vencimiento(api_client, producto):
+    cliente = _cliente()
+    tardia = _venta(api_client, cliente, producto, "100.00", dias_vencimiento=30)
+    sin_vencimiento = _venta(api_client, cliente, producto, "40.00", dias_venta=5)
+    primera = _venta(api_client, cliente, producto, "50.00", dias_vencimiento=-10)
+    cobro = _cobro(api_client, cliente, "120.00")
+
+    res = api_client.post(f"/api/cobros/{cobro}/imputar/")
+    assert res.status_code == 200, res.data
+    assert Decimal(res.data["saldo_disponible"]) == Decimal("0.00")
+    assert [(d["venta"], Decimal(d["monto_aplicado"])) for d in res.data["detalles"]] == [
+        (primera, Decimal("50.00")),
+        (sin_vencimiento, Decimal("40.00")),
+        (tardia, Decimal("30.00")),
+    ]
+
+    ventas = {v.id: v for v in Ventas.objects.all()}
+    assert (ventas[primera].saldo_pendiente, ventas[primera].estado_cobro) == (Decimal("0.00"), "cobrado")
+    assert (ventas[sin_vencimiento].saldo_pendiente, ventas[sin_vencimiento].estado_cobro) == (Decimal("0.00"), "cobrado")
+    assert (ventas[tardia].saldo_pendiente, ventas[tardia].estado_cobro) == (Decimal("70.00"), "parcial")
+
+    assert list(
+        MovimientosCuenta.objects.filter(cuenta="cobro", documento=cobro).order_by("id").values_list("delta", "saldo")
+    ) == [
+        (Decimal("120.00"), Decimal("120.00")),
+        (Decimal("-50.00"), Decimal("70.00")),
+        (Decimal("-40.00"), Decimal("30.00")),
+        (Decimal("-30.00"), Decimal("0.00")),
+    ]
+    assert _sin_diferencias()
+
+    # Sin saldo disponible no hay nada para aplicar
+    res = api_client.post(f"/api/cobros/{cobro}/imputar/")
+    assert res.status_code == 200, res.data
+    assert CobrosDetalle.objects.count() == 3
+
+
+def test_imputar_usa_queries_constantes(api_client, producto):
+    def medir(cantidad):
+        cliente = _cliente(f"Cliente {cantidad}")
+        for i in range(cantidad):
+            _venta(api_client, cliente, producto, "10.00", dias_vencimiento=i)
+        cobro = _cobro(api_client, cliente, f"{10 * cantidad}.00")
+        with CaptureQueriesContext(connection) as ctx:
+            res = api_client.post(f"/api/cobros/{cobro}/imputar/")
+        assert res.status_code == 200, res.data
+        assert len(res.data["detalles"]) == cantidad
+        return len(ctx.captured_queries)
+
+    assert medir(2) == medir(20)
+
+
+def test_comando_imputa_todos_los_clientes(api_client, producto):
+    cliente = _cliente("Cliente A")
+    otro = _cliente("Cliente B")
+    sin_cobros = _cliente("Cliente C")
+    vieja = _venta(api_client, cliente, producto, "60.00", dias_vencimiento=1)
+    nueva = _venta(api_client, cliente, producto, "60.00", dias_vencimiento=2)
+    cancelada = _venta(api_client, otro, producto, "30.00", dias_vencimiento=-5)
+    de_otro = _venta(api_client, otro, producto, "30.00", dias_vencimiento=3)
+    ajena = _venta(api_client, sin_cobros, producto, "30.00")
+    res = api_client.post(f"/api/ventas/{cancelada}/cancelar_venta/", {"motivo_cancelacion": "Error"}, format="json")
+    assert res.status_code == 200, res.data
+
+    cobro_nuevo = _cobro(api_client, cliente, "50.00")
+    cobro_viejo = _cobro(api_client, cliente, "30.00", dias=3)
+    cobro_otro = _cobro(api_client, otro, "100.00")
+
+    salida = StringIO()
+    call_command("imputar_cobros", "--tamano-lote", "1", stdout=salida)
+    assert "4 aplicaciones" in salida.getvalue()
+
+    assert sorted(CobrosDetalle.objects.values_list("cobro_id", "venta_id", "monto_aplicado")) == sorted([
+        (cobro_viejo, vieja, Decimal("30.00")),
+        (cobro_nuevo, vieja, Decimal("30.00")),
+        (cobro_nuevo, nueva, Decimal("20.00")),
+        (cobro_otro, de_otro, Decimal("30.00")),
+    ])
+    assert Cobros.objects.get(pk=cobro_otro).saldo_disponible == Decimal("70.00")
+    assert Ventas.objects.get(pk=ajena).saldo_pendiente == Decimal("30.00")
+    assert Ventas.objects.get(pk=nueva).saldo_pendiente == Decimal("40.00")
+    assert _sin_diferencias()
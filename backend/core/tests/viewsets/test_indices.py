@@ -0,0 +1,116 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+
+from core.models import Contactos, Ventas, Compras
+
+pytestmark = pytest.mark.django_db
+
+# Verifica con EXPLAIN que los filtros de los listados y del dashboard usan los
+# indices de Meta.indexes. En PostgreSQL se desactiva el seq scan para que el
+# resultado no dependa del volumen de la base de prueba; para correrlo:
+#   DATABASE_URL=postgres://... pytest --create-db -p no:cacheprovider \
+#       --ds=lupon_admin.settings core/tests/viewsets/test_indices.py
+# En SQLite se usa EXPLAIN QUERY PLAN, que tambien reporta el indice elegido.
+
+
+@pytest.fixture
+def plan():
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    elif connection.vendor != "sqlite":
+        pytest.skip("EXPLAIN solo se verifica en PostgreSQL y SQLite")
+
+    def explicar(queryset):
+        return queryset.explain()
+
+    return explicar
+
+
+@pytest.fixture
+def datos():
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente", saldo_contacto=Decimal("50.00"))
+    proveedor = Contactos.objects.create(nombre="Proveedor", tipo="proveedor")
+    hoy = date(2024, 6, 1)
+    for dia in range(30):
+        Ventas.objects.create(
+            cliente=cliente,
+            forma_pago="cuenta corriente",
+            fecha_venta=hoy - timedelta(days=dia),
+            total=Decimal("10.00"),
+            estado_venta="cancelada" if dia % 3 == 0 else "pendiente",
+            vencimiento=hoy + timedelta(days=dia),
+        )
+        Compras.objects.create(proveedor=proveedor, fecha_compra=hoy - timedelta(days=dia))
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return {"cliente": cliente, "proveedor": proveedor, "hoy": hoy}
+
+
+def usa_indice(resultado, *indices):
+    assert "Seq Scan" not in resultado
+    assert any(indice in resultado for indice in indices), resultado
+
+
+def test_listado_ventas_por_rango_de_fechas(plan, datos):
+    qs = Ventas.objects.filter(
+        fecha_venta__gte=datos["hoy"] - timedelta(days=7), fecha_venta__lte=datos["hoy"]
+    ).order_by("-fecha_venta", "id")
+
+    usa_indice(plan(qs), "ventas_fecha_idx")
+
+
+def test_listado_ventas_por_cliente(plan, datos):
+    qs = Ventas.objects.filter(cliente_id=datos["cliente"].id).order_by("-fecha_venta", "id")
+
+    usa_indice(plan(qs), "ventas_cliente_fecha_idx")
+
+
+def test_dashboard_ventas_por_estado_de_cobro(plan, datos):
+    qs = Ventas.objects.exclude(estado_venta="cancelada").filter(
+        estado_cobro="pendiente", fecha_venta__gte=datos["hoy"] - timedelta(days=7)
+    )
+
+    usa_indice(plan(qs), "ventas_cobro_fecha_idx")
+
+
+def test_ventas_abiertas_de_un_cliente(plan, datos):
+    qs = Ventas.objects.exclude(estado_venta="cancelada").filter(
+        saldo_pendiente__gt=0, cliente_id=datos["cliente"].id
+    )
+
+    usa_indice(plan(qs), "ventas_abiertas_idx", "ventas_cliente_fecha_idx")
+
+
+def test_vencimientos_del_dashboard(plan, datos):
+    hoy = datos["hoy"]
+    qs = Ventas.objects.exclude(estado_venta="cancelada").filter(
+        saldo_pendiente__gt=0,
+        vencimiento__isnull=False,
+        vencimiento__gt=hoy,
+        vencimiento__lte=hoy + timedelta(days=7),
+    )
+
+    usa_indice(plan(qs), "ventas_abiertas_venc_idx")
+
+
+def test_compras_abiertas(plan, datos):
+    qs = Compras.objects.exclude(estado_compra="cancelada").filter(
+        saldo_pendiente__gt=0, proveedor_id=datos["proveedor"].id
+    )
+
+    usa_indice(plan(qs), "compras_abiertas_idx", "compras_proveedor_fecha_idx")
+
+
+def test_clientes_con_deuda(plan, datos):
+    qs = Contactos.objects.filter(tipo="cliente", saldo_contacto__gt=0).order_by("-saldo_contacto", "nombre")
+
+    usa_indice(plan(qs), "contactos_deudores_idx")
+
+
+def test_contactos_por_tipo(plan, datos):
+    qs = Contactos.objects.filter(tipo="cliente").order_by("nombre")
+
+    usa_indice(plan(qs), "contactos_tipo_nombre_idx")
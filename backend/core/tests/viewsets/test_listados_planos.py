@@ -0,0 +1,120 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import (
+    Contactos,
+    Productos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosMedioPago,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente Test", tipo="cliente")
+
+
+@pytest.fixture
+def venta(cliente):
+    producto = Productos.objects.create(nombre="Producto", rubro="huevos", unidad_medida="un")
+    venta = Ventas.objects.create(
+        cliente=cliente,
+        forma_pago="contado",
+        subtotal=Decimal("100.00"),
+        total=Decimal("100.00"),
+        saldo_pendiente=Decimal("100.00"),
+    )
+    VentasDetalle.objects.create(venta=venta, producto=producto, cantidad=1, precio_unitario=100)
+    return venta
+
+
+def test_listado_ventas_coincide_con_detalle_sin_anidados(api_client, user, venta):
+    listado = api_client.get("/api/ventas/").data[0]
+    detalle = api_client.get(f"/api/ventas/{venta.id}/").data
+
+    esperado = {campo: valor for campo, valor in detalle.items() if campo != "detalles"}
+    assert listado == esperado
+
+
+def test_listado_ventas_queries_constantes(api_client, user, cliente):
+    for _ in range(20):
+        Ventas.objects.create(cliente=cliente, forma_pago="contado")
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get("/api/ventas/")
+
+    assert len(res.data) == 20
+    # validadores (ETag) + datos
+    assert len(ctx.captured_queries) == 2
+
+
+def test_listado_cobros_resume_medios_de_pago(api_client, user, cliente):
+    simple = Cobros.objects.create(cliente=cliente, monto=Decimal("50.00"))
+    CobrosMedioPago.objects.create(cobro=simple, medio_pago="transferencia", monto=Decimal("50.00"))
+    multiple = Cobros.objects.create(cliente=cliente, monto=Decimal("80.00"))
+    CobrosMedioPago.objects.create(cobro=multiple, medio_pago="efectivo", monto=Decimal("30.00"))
+    CobrosMedioPago.objects.create(cobro=multiple, medio_pago="transferencia", monto=Decimal("50.00"))
+    legado = Cobros.objects.create(cliente=cliente, monto=Decimal("10.00"), medio_pago="efectivo")
+
+    res = api_client.get("/api/cobros/")
+
+    resumen = {item["id"]: item["medio_pago_resumen"] for item in res.data}
+    assert resumen == {simple.id: "transferencia", multiple.id: "multiple", legado.id: "efectivo"}
+    assert "medios_pago" not in res.data[0]
+
+
+def test_listado_plano_con_fields_y_paginacion(api_client, user, cliente):
+    for _ in range(3):
+        Ventas.objects.create(cliente=cliente, forma_pago="contado")
+
+    res = api_client.get("/api/ventas/?fields=id,total&page_size=2")
+
+    assert [set(item) for item in res.data["results"]] == [{"id", "total"}, {"id", "total"}]
+    res = api_client.get(res.data["next"])
+    assert len(res.data["results"]) == 1
+
+
+def test_expand_usa_serializer_completo(api_client, user, venta):
+    res = api_client.get("/api/ventas/?expand=detalles")
+
+    assert len(res.data[0]["detalles"]) == 1
+
+
+def test_fields_limita_la_consulta(api_client, user, cliente):
+    cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("50.00"), observaciones="nota")
+    CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("50.00"))
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get("/api/cobros/?fields=id,monto")
+    assert res.data == [{"id": cobro.id, "monto": "50.00"}]
+    sql = ctx.captured_queries[-1]["sql"]
+    assert '"monto"' in sql
+    assert "observaciones" not in sql
+    assert "core_cobrosmediopago" not in sql.lower()
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get("/api/cobros/?fields=id,medio_pago_resumen")
+    assert res.data == [{"id": cobro.id, "medio_pago_resumen": "efectivo"}]
+    sql = ctx.captured_queries[-1]["sql"]
+    assert "core_cobrosmediopago" in sql.lower()
+    assert "observaciones" not in sql
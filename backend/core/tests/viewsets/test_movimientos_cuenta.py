@@ -0,0 +1,231 @@
+import importlib
+
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Cobros, Compras, Contactos, MovimientosCuenta, Pagos, Productos, Ventas
+from core.servicios.saldos import CUENTAS, mover_saldo, saldo_contacto_al
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente", tipo="cliente")
+
+
+@pytest.fixture
+def proveedor():
+    return Contactos.objects.create(nombre="Proveedor", tipo="proveedor")
+
+
+@pytest.fixture
+def producto():
+    return Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+
+def _venta(api_client, cliente, producto, precio, **extra):
+    res = api_client.post("/api/ventas/", {
+        "cliente": cliente.id,
+        "forma_pago": "cuenta corriente",
+        "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}],
+        **extra,
+    }, format="json")
+    assert res.status_code == 201, res.data
+    return Ventas.objects.get(pk=res.data["id"])
+
+
+def _assert_libro_cuadra():
+    # Por cada cuenta: la suma de los deltas y el ultimo saldo del libro son el saldo guardado
+    for modelo, (cuenta, campo, _) in CUENTAS.items():
+        for documento_id, saldo in modelo.objects.values_list("id", campo):
+            movimientos = MovimientosCuenta.objects.filter(cuenta=cuenta, documento=documento_id)
+            assert (movimientos.aggregate(total=Sum("delta"))["total"] or 0) == saldo, (cuenta, documento_id)
+            ultimo = movimientos.order_by("-id").first()
+            assert (ultimo.saldo if ultimo else 0) == saldo, (cuenta, documento_id)
+
+
+def test_libro_registra_ventas_cobros_y_notas_de_credito(api_client, cliente, producto):
+    venta = _venta(api_client, cliente, producto, "300.00")
+    otra = _venta(api_client, cliente, producto, "50.00")
+
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id,
+        "monto": "100.00",
+        "medio_pago": "efectivo",
+        "detalles": [{"venta": venta.id, "monto_aplicado": "100.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    cobro = Cobros.objects.get(pk=res.data["id"])
+
+    res = api_client.post("/api/notas-credito/", {
+        "contacto": cliente.id,
+        "tipo": "venta",
+        "monto": "20.00",
+        "aplicaciones": [{"venta": venta.id, "monto_aplicado": "20.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    nota_id = res.data["id"]
+
+    res = api_client.post(f"/api/ventas/{otra.id}/cancelar_venta/", {"motivo_cancelacion": "Error"}, format="json")
+    assert res.status_code == 200, res.data
+
+    movimientos = list(
+        MovimientosCuenta.objects.filter(cuenta="contacto", contacto=cliente)
+        .order_by("id").values_list("tipo", "origen", "delta", "saldo")
+    )
+    assert movimientos == [
+        ("venta", venta.id, Decimal("300.00"), Decimal("300.00")),
+        ("venta", otra.id, Decimal("50.00"), Decimal("350.00")),
+        ("cobro", cobro.id, Decimal("-100.00"), Decimal("250.00")),
+        ("nota_credito", nota_id, Decimal("-20.00"), Decimal("230.00")),
+        ("cancelacion_venta", otra.id, Decimal("-50.00"), Decimal("180.00")),
+    ]
+
+    de_la_venta = list(
+        MovimientosCuenta.objects.filter(cuenta="venta", documento=venta.id)
+        .order_by("id").values_list("tipo", "delta", "saldo")
+    )
+    assert de_la_venta == [
+        ("venta", Decimal("300.00"), Decimal("300.00")),
+        ("cobro", Decimal("-100.00"), Decimal("200.00")),
+        ("nota_credito", Decimal("-20.00"), Decimal("180.00")),
+    ]
+    _assert_libro_cuadra()
+
+
+def test_libro_registra_compras_y_pagos(api_client, proveedor, producto):
+    res = api_client.post("/api/compras/", {
+        "proveedor": proveedor.id,
+        "extra": "0.00",
+        "descuento": "0.00",
+        "detalles": [{"producto": producto.id, "cantidad": 2, "precio_unitario": "100.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    compra = Compras.objects.get(pk=res.data["id"])
+
+    res = api_client.post("/api/pagos/", {
+        "proveedor": proveedor.id,
+        "monto": "150.00",
+        "medio_pago": "efectivo",
+        "detalles": [{"compra": compra.id, "monto_aplicado": "150.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    pago = Pagos.objects.get(pk=res.data["id"])
+
+    res = api_client.post(
+        f"/api/compras/{compra.id}/cambiar_estado_compra/",
+        {"estado_compra": "cancelada", "motivo_cancelacion": "Error de carga"},
+        format="json",
+    )
+    assert res.status_code == 200, res.data
+
+    assert list(
+        MovimientosCuenta.objects.filter(cuenta="compra", documento=compra.id)
+        .order_by("id").values_list("tipo", "origen", "delta")
+    ) == [
+        ("compra", compra.id, Decimal("200.00")),
+        ("pago", pago.id, Decimal("-150.00")),
+        ("cancelacion_compra", compra.id, Decimal("-50.00")),
+    ]
+    assert list(
+        MovimientosCuenta.objects.filter(cuenta="pago", documento=pago.id).values_list("delta", "saldo")
+    ) == [(Decimal("150.00"), Decimal("150.00")), (Decimal("-150.00"), Decimal("0.00"))]
+    _assert_libro_cuadra()
+
+
+def test_alta_masiva_registra_el_saldo_corrido(api_client, cliente, producto):
+    otro = Contactos.objects.create(nombre="Otro", tipo="cliente", saldo_contacto=Decimal("5.00"))
+    MovimientosCuenta.objects.create(
+        contacto=otro, fecha=timezone.localdate(), cuenta="contacto", documento=otro.id,
+        tipo="apertura", delta=Decimal("5.00"), saldo=Decimal("5.00"),
+    )
+    res = api_client.post("/api/ventas/bulk/", [
+        {"cliente": c.id, "forma_pago": "contado",
+         "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}]}
+        for c, precio in ((cliente, "10.00"), (otro, "20.00"), (cliente, "30.00"))
+    ], format="json")
+    assert res.status_code == 201, res.data
+
+    assert list(
+        MovimientosCuenta.objects.filter(cuenta="contacto", contacto=cliente).order_by("id").values_list("delta", "saldo")
+    ) == [(Decimal("10.00"), Decimal("10.00")), (Decimal("30.00"), Decimal("40.00"))]
+    _assert_libro_cuadra()
+
+
+def test_saldo_contacto_a_una_fecha(api_client, cliente, producto):
+    hoy = timezone.localdate()
+    _venta(api_client, cliente, producto, "100.00", fecha_venta=str(hoy - timedelta(days=10)))
+    _venta(api_client, cliente, producto, "40.00", fecha_venta=str(hoy - timedelta(days=2)))
+    api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": "30.00", "medio_pago": "efectivo",
+        "fecha_cobro": str(hoy - timedelta(days=5)),
+    }, format="json")
+
+    assert saldo_contacto_al(cliente, hoy - timedelta(days=11)) == Decimal("0")
+    assert saldo_contacto_al(cliente, hoy - timedelta(days=5)) == Decimal("70.00")
+    assert saldo_contacto_al(cliente, hoy) == Decimal("110.00")
+
+
+def test_movimientos_no_se_modifican(cliente):
+    movimiento = MovimientosCuenta.objects.create(
+        contacto=cliente, fecha=timezone.localdate(), cuenta="contacto", documento=cliente.id,
+        tipo="ajuste", delta=Decimal("1.00"), saldo=Decimal("1.00"),
+    )
+    movimiento.delta = Decimal("2.00")
+    with pytest.raises(ValueError):
+        movimiento.save()
+
+
+def test_mover_saldo_de_una_fila_borrada(cliente):
+    venta = Ventas.objects.create(cliente=cliente, forma_pago="contado", total=Decimal("10.00"))
+    Ventas.objects.filter(pk=venta.pk).delete()
+
+    with pytest.raises(Ventas.DoesNotExist):
+        mover_saldo(venta, Decimal("-5.00"), venta)
+    assert not MovimientosCuenta.objects.filter(cuenta="venta", documento=venta.pk).exists()
+
+
+def test_aperturas_toman_la_fecha_de_los_documentos(cliente):
+    migracion = importlib.import_module("core.migrations.0030_movimientos_cuenta")
+    hoy = timezone.localdate()
+    venta = Ventas.objects.create(
+        cliente=cliente, forma_pago="cuenta corriente", fecha_venta=hoy - timedelta(days=10),
+        total=Decimal("100.00"), saldo_pendiente=Decimal("70.00"),
+    )
+    Ventas.objects.create(
+        cliente=cliente, forma_pago="cuenta corriente", fecha_venta=hoy - timedelta(days=8),
+        total=Decimal("60.00"), fecha_cancelacion=hoy - timedelta(days=7),
+    )
+    Ventas.objects.create(
+        cliente=cliente, forma_pago="cuenta corriente", fecha_venta=hoy - timedelta(days=2),
+        total=Decimal("40.00"), saldo_pendiente=Decimal("40.00"),
+    )
+    Cobros.objects.create(cliente=cliente, monto=Decimal("30.00"), fecha_cobro=hoy - timedelta(days=5))
+    # 5.00 que los documentos no explican entran hoy
+    Contactos.objects.filter(pk=cliente.pk).update(saldo_contacto=Decimal("115.00"))
+
+    migracion.registrar_aperturas(django_apps, None)
+
+    assert saldo_contacto_al(cliente, hoy - timedelta(days=11)) == Decimal("0")
+    assert saldo_contacto_al(cliente, hoy - timedelta(days=5)) == Decimal("70.00")
+    assert saldo_contacto_al(cliente, hoy - timedelta(days=1)) == Decimal("110.00")
+    assert saldo_contacto_al(cliente, hoy) == Decimal("115.00")
+    apertura = MovimientosCuenta.objects.get(cuenta="venta", documento=venta.pk)
+    assert (apertura.tipo, apertura.fecha, apertura.saldo) == ("apertura", venta.fecha_venta, Decimal("70.00"))
+    _assert_libro_cuadra()
@@ -0,0 +1,79 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import (
+    Contactos,
+    Productos,
+    Ventas,
+    VentasDetalle,
+    Cobros,
+    CobrosMedioPago,
+    Compras,
+    ComprasDetalle,
+)
+from core.mixins import relaciones_serializer
+from core.serializers import VentasSerializer, CobrosSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def producto():
+    return Productos.objects.create(
+        nombre="Producto Test",
+        rubro="pollo entero",
+        unidad_medida="kg",
+    )
+
+
+def crear_documentos(n, producto):
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    proveedor = Contactos.objects.create(nombre="Proveedor", tipo="proveedor")
+    for _ in range(n):
+        venta = Ventas.objects.create(cliente=cliente, forma_pago="contado", total=Decimal("100"))
+        VentasDetalle.objects.create(venta=venta, producto=producto, cantidad=1, precio_unitario=100)
+        cobro = Cobros.objects.create(cliente=cliente, monto=Decimal("100"))
+        CobrosMedioPago.objects.create(cobro=cobro, medio_pago="efectivo", monto=Decimal("100"))
+        compra = Compras.objects.create(proveedor=proveedor, forma_pago="contado", total=Decimal("50"))
+        ComprasDetalle.objects.create(compra=compra, producto=producto, cantidad=1, precio_unitario=50)
+
+
+def contar_queries(api_client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        res = api_client.get(url)
+    assert res.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_relaciones_declaradas():
+    assert relaciones_serializer(VentasSerializer) == (["cliente"], ["detalles"])
+    select, prefetch = relaciones_serializer(CobrosSerializer)
+    assert select == []
+    assert set(prefetch) == {"detalles", "medios_pago"}
+
+
+@pytest.mark.parametrize("url", ["/api/ventas/", "/api/cobros/", "/api/compras/", "/api/pagos/"])
+def test_listado_con_cantidad_constante_de_queries(api_client, user, producto, url):
+    crear_documentos(2, producto)
+    pocas = contar_queries(api_client, url)
+
+    crear_documentos(10, producto)
+    muchas = contar_queries(api_client, url)
+
+    assert pocas == muchas
@@ -0,0 +1,110 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Ventas
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(
+        nombre="Cliente Test",
+        tipo="cliente",
+        forma_pago="contado",
+    )
+
+
+@pytest.fixture
+def ventas(cliente):
+    hoy = date(2026, 3, 10)
+    creadas = []
+    # Dos ventas por dia para forzar empates en fecha_venta
+    for i in range(7):
+        creadas.append(
+            Ventas.objects.create(
+                cliente=cliente,
+                forma_pago="contado",
+                fecha_venta=hoy - timedelta(days=i // 2),
+                total=Decimal("100.00"),
+            )
+        )
+    return creadas
+
+
+def test_listado_sin_parametros_no_pagina(api_client, user, ventas):
+    res = api_client.get("/api/ventas/")
+
+    assert res.status_code == 200
+    assert isinstance(res.data, list)
+    assert len(res.data) == 7
+
+
+def test_recorre_todas_las_paginas_sin_repetir(api_client, user, ventas):
+    vistos = []
+    url = "/api/ventas/?page_size=3"
+
+    while url:
+        res = api_client.get(url)
+        assert res.status_code == 200
+        assert len(res.data["results"]) <= 3
+        vistos.extend(item["id"] for item in res.data["results"])
+        url = res.data["next"]
+
+    esperado = list(
+        Ventas.objects.order_by("-fecha_venta", "id").values_list("id", flat=True)
+    )
+    assert vistos == esperado
+
+
+def test_count_es_opt_in(api_client, user, ventas):
+    res = api_client.get("/api/ventas/?page_size=2")
+    assert "count" not in res.data
+
+    res = api_client.get("/api/ventas/?page_size=2&include_count=true")
+    assert res.data["count"] == 7
+
+
+def test_respeta_filtros(api_client, user, ventas):
+    res = api_client.get("/api/ventas/?page_size=10&fecha_desde=2026-03-09")
+
+    assert [item["fecha_venta"] for item in res.data["results"]] == [
+        "2026-03-10",
+        "2026-03-10",
+        "2026-03-09",
+        "2026-03-09",
+    ]
+    assert res.data["next"] is None
+
+
+def test_cursor_invalido(api_client, user, ventas):
+    res = api_client.get("/api/ventas/?cursor=no-es-un-cursor")
+
+    assert res.status_code == 404
+
+
+def test_pagina_contactos_por_nombre(api_client, user):
+    for nombre in ["Delta", "Alfa", "Charlie", "Bravo"]:
+        Contactos.objects.create(nombre=nombre, tipo="cliente")
+
+    res = api_client.get("/api/contactos/?page_size=2")
+    assert [item["nombre"] for item in res.data["results"]] == ["Alfa", "Bravo"]
+
+    res = api_client.get(res.data["next"])
+    assert [item["nombre"] for item in res.data["results"]] == ["Charlie", "Delta"]
+    assert res.data["next"] is None
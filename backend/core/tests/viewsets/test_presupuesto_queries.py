@@ -0,0 +1,148 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import URLResolver
+from rest_framework.test import APIClient
+
+import core.urls
+import documentos.urls
+
+pytestmark = pytest.mark.django_db
+
+# Cada ruta GET de core/urls.py y documentos/urls.py se mide con N y 10xN
+# unidades de datos (ver conftest.sembrador): la cantidad de queries tiene que
+# ser la misma y no superar el presupuesto de la ruta. Una ruta GET nueva sin
+# entrada en PRESUPUESTOS hace fallar test_todas_las_rutas_tienen_presupuesto.
+# El tiempo de SQL y de respuesta queda registrado como propiedad del test
+# (ver --junitxml).
+
+N = 2
+
+# nombre de ruta -> (url a partir de los datos sembrados, queries maximas)
+PRESUPUESTOS = {
+    "api-root": (lambda d: "/api/", 0),
+    "dashboard": (lambda d: "/api/dashboard/", 4),
+    "dashboard-series": (lambda d: "/api/dashboard/series/?granularity=week", 1),
+    "autocomplete": (lambda d: "/api/autocomplete/contactos/?q=cli", 3),
+    "usuarios-list": (lambda d: "/api/usuarios/", 2),
+    "usuarios-detail": (lambda d: f"/api/usuarios/{d.usuario.id}/", 2),
+    "contactos-list": (lambda d: "/api/contactos/", 2),
+    "contactos-detail": (lambda d: f"/api/contactos/{d.cliente.id}/", 2),
+    "productos-list": (lambda d: "/api/productos/", 2),
+    "productos-detail": (lambda d: f"/api/productos/{d.producto.id}/", 2),
+    "ventas-list": (lambda d: "/api/ventas/", 2),
+    "ventas-detail": (lambda d: f"/api/ventas/{d.venta.id}/", 3),
+    "ventas-detalle-list": (lambda d: "/api/ventas-detalle/", 1),
+    "ventas-detalle-detail": (lambda d: f"/api/ventas-detalle/{d.venta_detalle.id}/", 1),
+    "cobros-list": (lambda d: "/api/cobros/", 2),
+    "cobros-detail": (lambda d: f"/api/cobros/{d.cobro.id}/", 4),
+    "cobros-detalle-list": (lambda d: "/api/cobros-detalle/", 1),
+    "cobros-detalle-detail": (lambda d: f"/api/cobros-detalle/{d.cobro_detalle.id}/", 1),
+    "compras-list": (lambda d: "/api/compras/", 2),
+    "compras-detail": (lambda d: f"/api/compras/{d.compra.id}/", 3),
+    "compras-detalle-list": (lambda d: "/api/compras-detalle/", 1),
+    "compras-detalle-detail": (lambda d: f"/api/compras-detalle/{d.compra_detalle.id}/", 1),
+    "pagos-list": (lambda d: "/api/pagos/", 2),
+    "pagos-detail": (lambda d: f"/api/pagos/{d.pago.id}/", 4),
+    "pagos-detalle-list": (lambda d: "/api/pagos-detalle/", 1),
+    "pagos-detalle-detail": (lambda d: f"/api/pagos-detalle/{d.pago_detalle.id}/", 1),
+    "notas-credito-list": (lambda d: "/api/notas-credito/", 2),
+    "notas-credito-detail": (lambda d: f"/api/notas-credito/{d.nota_credito.id}/", 4),
+    "documentos:preview_index": (lambda d: "/documentos/preview/", 0),
+    "documentos:preview": (lambda d: "/documentos/preview/factura_venta/", 0),
+    "documentos:factura_venta_html": (lambda d: f"/documentos/ventas/{d.venta.id}/", 2),
+    "documentos:factura_venta_pdf": (lambda d: f"/documentos/ventas/{d.venta.id}/pdf/", 2),
+    "documentos:cuenta_corriente_cliente_html": (lambda d: f"/documentos/cuenta-corriente/clientes/{d.cliente.id}/", 3),
+    "documentos:cuenta_corriente_cliente_pdf": (lambda d: f"/documentos/cuenta-corriente/clientes/{d.cliente.id}/pdf/", 3),
+}
+
+# Rutas que hoy no responden 200 por motivos ajenos a las queries
+ROTAS = {
+    "documentos:preview_index": "no existe el template documentos/preview_index.html",
+}
+
+# Variantes de una misma ruta con caminos de codigo propios
+VARIANTES = {
+    "dashboard?medio_pago": (lambda d: "/api/dashboard/?medio_pago=efectivo", 8),
+    "dashboard-series?medio_pago": (lambda d: "/api/dashboard/series/?medio_pago=efectivo", 3),
+    "ventas-list?expand": (lambda d: "/api/ventas/?expand=detalles,cobros_detalle", 5),
+    "ventas-list?page_size": (lambda d: "/api/ventas/?page_size=5&include_count=1", 3),
+    "ventas-list?format=ndjson": (lambda d: "/api/ventas/?format=ndjson", 2),
+    "cobros-list?expand": (lambda d: "/api/cobros/?expand=detalles", 4),
+    "compras-list?expand": (lambda d: "/api/compras/?expand=detalles,pagos_detalle", 5),
+    "contactos-list?nombre": (lambda d: "/api/contactos/?nombre=cliente", 2),
+    "documentos:cuenta_corriente_cliente_html?fecha_desde": (
+        lambda d: f"/documentos/cuenta-corriente/clientes/{d.cliente.id}/?fecha_desde=2000-01-01", 4
+    ),
+}
+
+
+def _rutas_get(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _rutas_get(pattern.url_patterns, pattern.namespace or namespace)
+            continue
+        callback = pattern.callback
+        actions = getattr(callback, "actions", None)
+        view_class = getattr(callback, "view_class", None)
+        if actions is not None:
+            if "get" not in actions:
+                continue
+        elif view_class is not None and not hasattr(view_class, "get"):
+            continue
+        yield f"{namespace}:{pattern.name}" if namespace else pattern.name
+
+
+def rutas_get():
+    rutas = [
+        *_rutas_get(core.urls.urlpatterns),
+        *_rutas_get(documentos.urls.urlpatterns, documentos.urls.app_name),
+    ]
+    return sorted(set(rutas))
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="medidor", password="x", is_staff=True, is_superuser=True)
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def pdf_disponible():
+    try:
+        from weasyprint import HTML  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def test_todas_las_rutas_tienen_presupuesto():
+    sin_presupuesto = [ruta for ruta in rutas_get() if ruta not in PRESUPUESTOS]
+    assert sin_presupuesto == [], f"Rutas GET sin presupuesto de queries: {sin_presupuesto}"
+
+
+@pytest.mark.parametrize("ruta", sorted({**PRESUPUESTOS, **VARIANTES}))
+def test_queries_constantes(ruta, api_client, sembrador, medir_queries, record_property, pdf_disponible):
+    if ruta in ROTAS:
+        pytest.xfail(ROTAS[ruta])
+    if ruta.endswith("_pdf") and not pdf_disponible:
+        pytest.skip("WeasyPrint no disponible")
+    construir_url, presupuesto = {**PRESUPUESTOS, **VARIANTES}[ruta]
+
+    sembrador.agregar(N)
+    url = construir_url(sembrador)
+    chico = medir_queries(api_client, url)
+    sembrador.agregar(9 * N)
+    grande = medir_queries(api_client, url)
+
+    record_property("queries", grande.queries)
+    record_property("sql_ms_n", round(chico.sql_ms, 2))
+    record_property("sql_ms_10n", round(grande.sql_ms, 2))
+    record_property("ms_10n", round(grande.ms, 2))
+
+    assert chico.status == 200 and grande.status == 200, (chico, grande)
+    assert grande.queries == chico.queries, (
+        f"{url}: {chico.queries} queries con {N} unidades y {grande.queries} con {10 * N} (N+1?)"
+    )
+    assert grande.queries <= presupuesto, f"{url}: {grande.queries} queries, presupuesto {presupuesto}"
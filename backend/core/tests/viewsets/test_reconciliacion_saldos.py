@@ -0,0 +1,164 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from core.models import (
+    Cobros,
+    Compras,
+    Contactos,
+    MovimientosCuenta,
+    Pagos,
+    Productos,
+    ResumenDiario,
+    SaldoMensual,
+    Ventas,
+)
+from core.servicios.reconciliacion import reconciliar_saldos
+from core.servicios.saldos_mensuales import reconstruir_saldos_mensuales
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def documentos(api_client):
+    # Ventas cobradas en parte, con NC y canceladas; compras pagadas y canceladas
+    cliente = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    proveedor = Contactos.objects.create(nombre="Proveedor", tipo="proveedor")
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+    ventas = []
+    for precio in ("300.00", "50.00", "80.00"):
+        res = api_client.post("/api/ventas/", {
+            "cliente": cliente.id,
+            "forma_pago": "cuenta corriente",
+            "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}],
+        }, format="json")
+        assert res.status_code == 201, res.data
+        ventas.append(res.data["id"])
+
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": "150.00", "medio_pago": "efectivo",
+        "detalles": [{"venta": ventas[0], "monto_aplicado": "100.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    res = api_client.post("/api/notas-credito/", {
+        "contacto": cliente.id, "tipo": "venta", "monto": "20.00",
+        "aplicaciones": [{"venta": ventas[0], "monto_aplicado": "20.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    res = api_client.post(f"/api/ventas/{ventas[1]}/cancelar_venta/", {"motivo_cancelacion": "Error"}, format="json")
+    assert res.status_code == 200, res.data
+
+    compras = []
+    for precio in ("100.00", "60.00"):
+        res = api_client.post("/api/compras/", {
+            "proveedor": proveedor.id, "extra": "0.00", "descuento": "0.00",
+            "detalles": [{"producto": producto.id, "cantidad": 1, "precio_unitario": precio}],
+        }, format="json")
+        assert res.status_code == 201, res.data
+        compras.append(res.data["id"])
+    res = api_client.post("/api/pagos/", {
+        "proveedor": proveedor.id, "monto": "70.00", "medio_pago": "efectivo",
+        "detalles": [{"compra": compras[0], "monto_aplicado": "40.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    res = api_client.post(
+        f"/api/compras/{compras[1]}/cambiar_estado_compra/",
+        {"estado_compra": "cancelada", "motivo_cancelacion": "Error"}, format="json",
+    )
+    assert res.status_code == 200, res.data
+
+    return cliente, proveedor, ventas, compras
+
+
+def _cantidades(resultado):
+    return {cuenta: len(diferencias) for cuenta, diferencias in resultado.items()}
+
+
+def test_automatizaciones_dejan_los_saldos_conciliados(documentos):
+    assert _cantidades(reconciliar_saldos()) == {"contacto": 0, "venta": 0, "compra": 0, "cobro": 0, "pago": 0}
+
+
+def test_detecta_y_corrige_diferencias_por_bloques(documentos):
+    cliente, proveedor, ventas, compras = documentos
+    Contactos.objects.filter(pk=cliente.pk).update(saldo_contacto=Decimal("1.00"))
+    Ventas.objects.filter(pk=ventas[0]).update(saldo_pendiente=Decimal("300.00"))
+    Compras.objects.filter(pk=compras[0]).update(saldo_pendiente=Decimal("0.00"))
+    Cobros.objects.update(saldo_disponible=Decimal("0.00"))
+    Pagos.objects.update(saldo_disponible=Decimal("70.00"))
+
+    resultado = reconciliar_saldos(tamano=1)
+    assert _cantidades(resultado) == {"contacto": 1, "venta": 1, "compra": 1, "cobro": 1, "pago": 1}
+    (venta,) = resultado["venta"]
+    assert (venta.documento, venta.guardado, venta.esperado) == (ventas[0], Decimal("300.00"), Decimal("180.00"))
+    # Solo se informa: nada cambia
+    assert Ventas.objects.get(pk=ventas[0]).saldo_pendiente == Decimal("300.00")
+
+    resultado = reconciliar_saldos(corregir=True, tamano=2)
+    assert sum(_cantidades(resultado).values()) == 5
+    assert Contactos.objects.get(pk=cliente.pk).saldo_contacto == Decimal("210.00")
+    assert Contactos.objects.get(pk=proveedor.pk).saldo_contacto == Decimal("-130.00")
+    assert Ventas.objects.get(pk=ventas[0]).saldo_pendiente == Decimal("180.00")
+    assert Compras.objects.get(pk=compras[0]).saldo_pendiente == Decimal("60.00")
+    assert Cobros.objects.get().saldo_disponible == Decimal("50.00")
+    assert Pagos.objects.get().saldo_disponible == Decimal("30.00")
+
+    ajuste = MovimientosCuenta.objects.get(tipo="ajuste", cuenta="venta")
+    assert (ajuste.documento, ajuste.delta, ajuste.saldo) == (ventas[0], Decimal("-120.00"), Decimal("180.00"))
+    assert MovimientosCuenta.objects.filter(tipo="ajuste").count() == 5
+    # El resumen diario toma el saldo corregido
+    assert ResumenDiario.objects.get(tipo="compra", estado="parcial").saldo == Decimal("60.00")
+
+    assert sum(_cantidades(reconciliar_saldos()).values()) == 0
+
+
+def test_comando(documentos):
+    cliente, *_ = documentos
+    Contactos.objects.filter(pk=cliente.pk).update(saldo_contacto=Decimal("0.00"))
+
+    salida = StringIO()
+    call_command("reconciliar_saldos", stdout=salida)
+    assert f"contacto #{cliente.id}: guardado 0.00, esperado 210.00" in salida.getvalue()
+    assert Contactos.objects.get(pk=cliente.pk).saldo_contacto == Decimal("0.00")
+
+    call_command("reconciliar_saldos", "--corregir", "--tamano-bloque", "1", stdout=StringIO())
+    salida = StringIO()
+    call_command("reconciliar_saldos", stdout=salida)
+    assert "sin diferencias" in salida.getvalue()
+
+
+def test_venta_cubierta_por_nota_de_credito_no_es_una_cancelacion(api_client, documentos):
+    cliente, _, ventas, _ = documentos
+    res = api_client.post("/api/notas-credito/", {
+        "contacto": cliente.id, "tipo": "venta", "monto": "80.00",
+        "aplicaciones": [{"venta": ventas[2], "monto_aplicado": "80.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    assert Ventas.objects.get(pk=ventas[2]).estado_venta == "cancelada"
+
+    assert sum(_cantidades(reconciliar_saldos()).values()) == 0
+
+
+def test_corregir_rearma_los_saldos_mensuales(documentos):
+    cliente, *_ = documentos
+    esperado = list(SaldoMensual.objects.filter(contacto=cliente).values_list("mes", "debe", "haber", "saldo"))
+    Contactos.objects.filter(pk=cliente.pk).update(saldo_contacto=Decimal("0.00"))
+    SaldoMensual.objects.filter(contacto=cliente).update(saldo=Decimal("999.00"))
+
+    reconciliar_saldos(corregir=True)
+
+    assert list(SaldoMensual.objects.filter(contacto=cliente).values_list("mes", "debe", "haber", "saldo")) == esperado
+    reconstruir_saldos_mensuales()
+    assert list(SaldoMensual.objects.filter(contacto=cliente).values_list("mes", "debe", "haber", "saldo")) == esperado
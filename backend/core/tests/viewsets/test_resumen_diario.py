@@ -0,0 +1,199 @@
+import importlib
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Contactos, Productos, ResumenDiario, Ventas
+from core.servicios.resumen_diario import reconstruir_resumen
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente A", tipo="cliente", forma_pago="cuenta corriente")
+
+
+@pytest.fixture
+def proveedor():
+    return Contactos.objects.create(nombre="Proveedor A", tipo="proveedor")
+
+
+@pytest.fixture
+def producto():
+    return Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+
+
+def filas_resumen():
+    return sorted(
+        ResumenDiario.objects.values_list(
+            "tipo", "fecha", "contacto_id", "forma_pago", "estado",
+            "cantidad", "total", "saldo", "efectivo", "transferencia",
+        )
+    )
+
+
+def crear_venta(api_client, cliente, producto, precio):
+    res = api_client.post("/api/ventas/", {
+        "cliente": cliente.id,
+        "forma_pago": "cuenta corriente",
+        "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": precio}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    return res.data["id"]
+
+
+def test_automatizaciones_mantienen_el_resumen(api_client, cliente, proveedor, producto):
+    venta_cobrada = crear_venta(api_client, cliente, producto, "100.00")
+    venta_nc = crear_venta(api_client, cliente, producto, "80.00")
+    venta_cancelada = crear_venta(api_client, cliente, producto, "60.00")
+
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id,
+        "monto": "70.00",
+        "medios_pago": [
+            {"medio_pago": "efectivo", "monto": "50.00"},
+            {"medio_pago": "transferencia", "monto": "20.00"},
+        ],
+        "detalles": [{"venta": venta_cobrada, "monto_aplicado": "70.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    res = api_client.post("/api/notas-credito/", {
+        "contacto": cliente.id,
+        "tipo": "venta",
+        "monto": "30.00",
+        "detalles": [{"producto": producto.id, "cantidad": 1, "precio_unitario": "30.00"}],
+        "aplicaciones": [{"venta": venta_nc, "monto_aplicado": "30.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    res = api_client.post(
+        f"/api/ventas/{venta_cancelada}/cancelar_venta/", {"motivo_cancelacion": "error"}, format="json"
+    )
+    assert res.status_code == 200, res.data
+
+    res = api_client.post("/api/compras/", {
+        "proveedor": proveedor.id,
+        "forma_pago": "cuenta corriente",
+        "detalles": [{"producto": producto.id, "cantidad": 2, "precio_unitario": "40.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    res = api_client.post("/api/pagos/", {
+        "proveedor": proveedor.id,
+        "medio_pago": "efectivo",
+        "monto": "50.00",
+        "detalles": [{"compra": res.data["id"], "monto_aplicado": "50.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    incremental = filas_resumen()
+    reconstruir_resumen()
+
+    assert incremental == filas_resumen()
+    ventas = ResumenDiario.objects.filter(tipo="venta")
+    assert {fila.estado: fila.total for fila in ventas} == {
+        "parcial": Decimal("180.00"),
+    }
+    cobro = ResumenDiario.objects.get(tipo="cobro")
+    assert (cobro.total, cobro.efectivo, cobro.transferencia) == (
+        Decimal("70.00"), Decimal("50.00"), Decimal("20.00"),
+    )
+
+
+def test_dashboard_suma_el_resumen(api_client, cliente, producto):
+    crear_venta(api_client, cliente, producto, "100.00")
+    crear_venta(api_client, cliente, producto, "50.00")
+
+    # El dashboard lee las tarjetas del resumen, no de Ventas
+    Ventas.objects.update(total=Decimal("1.00"))
+
+    cards = api_client.get("/api/dashboard/").data["cards"]
+    assert Decimal(cards["ventas_totales"]["total"]) == Decimal("150")
+    assert Decimal(cards["deuda_clientes"]) == Decimal("150")
+
+
+def test_comando_reconstruye_por_rango(cliente):
+    hoy = timezone.localdate()
+    for dias in range(3):
+        Ventas.objects.create(
+            cliente=cliente, forma_pago="contado", fecha_venta=hoy - timedelta(days=dias),
+            total=Decimal("10.00"), saldo_pendiente=Decimal("10.00"),
+        )
+
+    call_command("reconstruir_resumen_diario", "--desde", (hoy - timedelta(days=1)).isoformat())
+    assert ResumenDiario.objects.count() == 2
+
+    call_command("reconstruir_resumen_diario")
+    assert ResumenDiario.objects.count() == 3
+    assert sum(fila.total for fila in ResumenDiario.objects.all()) == Decimal("30.00")
+
+
+def test_edicion_y_baja_actualizan_el_resumen(api_client, cliente, producto):
+    otro = Contactos.objects.create(nombre="Cliente B", tipo="cliente", forma_pago="cuenta corriente")
+    venta = crear_venta(api_client, cliente, producto, "100.00")
+    cancelada = crear_venta(api_client, cliente, producto, "50.00")
+    movida = crear_venta(api_client, cliente, producto, "30.00")
+
+    res = api_client.patch(f"/api/ventas/{cancelada}/", {"estado_venta": "cancelada"}, format="json")
+    assert res.status_code == 200, res.data
+    ayer = (timezone.localdate() - timedelta(days=1)).isoformat()
+    res = api_client.patch(f"/api/ventas/{movida}/", {"cliente": otro.id, "fecha_venta": ayer}, format="json")
+    assert res.status_code == 200, res.data
+
+    incremental = filas_resumen()
+    reconstruir_resumen()
+    assert incremental == filas_resumen()
+    assert ResumenDiario.objects.get(tipo="venta", contacto=cliente).total == Decimal("100.00")
+    assert ResumenDiario.objects.get(tipo="venta", contacto=otro).total == Decimal("30.00")
+
+    res = api_client.delete(f"/api/ventas/{movida}/")
+    assert res.status_code == 204
+    cards = api_client.get("/api/dashboard/").data["cards"]
+    assert Decimal(cards["ventas_totales"]["total"]) == Decimal("100")
+
+    res = api_client.delete(f"/api/ventas/{venta}/")
+    assert res.status_code == 204
+    assert not ResumenDiario.objects.filter(tipo="venta").exists()
+
+
+def test_migracion_arma_el_resumen_existente(api_client, cliente, proveedor, producto):
+    migracion = importlib.import_module("core.migrations.0029_resumen_diario")
+    crear_venta(api_client, cliente, producto, "100.00")
+    cancelada = crear_venta(api_client, cliente, producto, "60.00")
+    api_client.post(f"/api/ventas/{cancelada}/cancelar_venta/", {"motivo_cancelacion": "error"}, format="json")
+    api_client.post("/api/cobros/", {
+        "cliente": cliente.id, "monto": "70.00",
+        "medios_pago": [{"medio_pago": "efectivo", "monto": "70.00"}],
+    }, format="json")
+    api_client.post("/api/pagos/", {"proveedor": proveedor.id, "medio_pago": "efectivo", "monto": "50.00"}, format="json")
+    reconstruir_resumen()
+    esperado = filas_resumen()
+    assert {fila[0] for fila in esperado} == {"venta", "cobro", "pago"}
+
+    ResumenDiario.objects.all().delete()
+    migracion.armar_resumen(django_apps, None)
+    assert filas_resumen() == esperado
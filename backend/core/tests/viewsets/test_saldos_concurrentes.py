@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from rest_framework.test import APIClient
+
+from core.models import Cobros, Contactos, Productos, Ventas
+from core.servicios.automatizaciones import saldos_al_crear_cobro
+
+# Varios hilos (cada uno con su conexion, como varios workers de gunicorn)
+# cargan cobros al mismo cliente a la vez. Los saldos se actualizan con
+# UPDATE saldo = saldo + delta, asi que ningun cobro se pierde.
+#
+# SQLite en memoria (tests) no espera a que se libere una tabla: responde
+# "database table is locked" y el cobro se reintenta. Cada cobro lleva una
+# marca en observaciones para no duplicarlo si el error llego despues del
+# commit (por ejemplo, al serializar la respuesta).
+
+HILOS = 8
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="cajero", password="x")
+
+
+@pytest.fixture
+def cliente(db):
+    return Contactos.objects.create(nombre="Cliente", tipo="cliente", saldo_contacto=Decimal("0.00"))
+
+
+def _api(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _reintentar(funcion):
+    for _ in range(500):
+        try:
+            return funcion()
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+        time.sleep(0.005)
+    raise AssertionError("la base siguio bloqueada")
+
+
+def _cobrar(client, data):
+    def intentar():
+        if Cobros.objects.filter(observaciones=data["observaciones"]).exists():
+            return
+        response = client.post("/api/cobros/", data, format="json")
+        assert response.status_code == 201, response.data
+
+    _reintentar(intentar)
+
+
+def _en_paralelo(trabajo):
+    barrera = threading.Barrier(HILOS)
+    errores = []
+
+    def hilo(i):
+        try:
+            barrera.wait()
+            trabajo(i)
+        except Exception as error:  # se informa desde el hilo principal
+            errores.append(error)
+        finally:
+            connection.close()
+
+    hilos = [threading.Thread(target=hilo, args=(i,)) for i in range(HILOS)]
+    for t in hilos:
+        t.start()
+    for t in hilos:
+        t.join()
+    assert errores == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cobros_concurrentes_no_pierden_saldo(user, cliente, caplog):
+    # Los reintentos por tabla bloqueada se loguean como error 500
+    caplog.set_level(logging.CRITICAL, logger="django.request")
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+    venta = _api(user).post("/api/ventas/", {
+        "cliente": cliente.id,
+        "forma_pago": "cuenta corriente",
+        "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": f"{100 * HILOS}.00"}],
+    }, format="json")
+    assert venta.status_code == 201, venta.data
+
+    _en_paralelo(lambda i: _cobrar(_api(user), {
+        "cliente": cliente.id,
+        "monto": "100.00",
+        "medio_pago": "efectivo",
+        "observaciones": f"cobro {i}",
+        "detalles": [{"venta": venta.data["id"], "monto_aplicado": "100.00"}],
+    }))
+
+    assert Cobros.objects.filter(cliente=cliente).count() == HILOS
+    cliente.refresh_from_db()
+    assert cliente.saldo_contacto == Decimal("0.00")
+    venta = Ventas.objects.get(pk=venta.data["id"])
+    assert venta.saldo_pendiente == Decimal("0.00")
+    assert venta.estado_cobro == "cobrado"
+    assert not Cobros.objects.exclude(saldo_disponible=0).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cobros_con_cliente_leido_antes_no_pierden_saldo(cliente):
+    # Peor caso de dos workers: todos leen el cliente antes de que cualquiera
+    # escriba. Con saldo = saldo - monto calculado en Python, todos escribirian
+    # el mismo valor y se perderian HILOS - 1 cobros.
+    Contactos.objects.filter(pk=cliente.pk).update(saldo_contacto=Decimal(100 * HILOS))
+
+    def cobrar(i):
+        leido = _reintentar(lambda: Contactos.objects.get(pk=cliente.pk))
+
+        def intentar():
+            with transaction.atomic():
+                cobro = Cobros.objects.create(cliente=leido, monto=Decimal("100.00"), medio_pago="efectivo")
+                saldos_al_crear_cobro(cobro)
+
+        _reintentar(intentar)
+
+    _en_paralelo(cobrar)
+
+    cliente.refresh_from_db()
+    assert cliente.saldo_contacto == Decimal("0.00")
+    assert Cobros.objects.filter(cliente=cliente).count() == HILOS
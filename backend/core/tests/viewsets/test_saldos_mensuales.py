@@ -0,0 +1,188 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework.test import APIClient
+
+from core.models import Cobros, Contactos, Productos, SaldoMensual, Ventas
+from core.servicios.saldos_mensuales import (
+    actualizar_saldos_mensuales,
+    reconstruir_saldos_mensuales,
+    saldo_cuenta_corriente_al_inicio,
+)
+from documentos.views import _build_cuenta_corriente_context
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    user = User.objects.create_user(username="testuser", password="testpass")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def cliente():
+    return Contactos.objects.create(nombre="Cliente A", tipo="cliente", forma_pago="cuenta corriente")
+
+
+@pytest.fixture
+def otro_cliente():
+    return Contactos.objects.create(nombre="Cliente B", tipo="cliente", forma_pago="cuenta corriente")
+
+
+def venta(cliente, fecha, total, **extra):
+    return Ventas.objects.create(
+        cliente=cliente, forma_pago="cuenta corriente", fecha_venta=fecha,
+        total=Decimal(total), saldo_pendiente=Decimal(total), **extra,
+    )
+
+
+def cobro(cliente, fecha, monto):
+    return Cobros.objects.create(cliente=cliente, fecha_cobro=fecha, monto=Decimal(monto))
+
+
+def sembrar_historia(cliente, otro_cliente):
+    venta(cliente, date(2026, 1, 10), "100.00")
+    venta(cliente, date(2026, 1, 31), "50.00")
+    cobro(cliente, date(2026, 2, 1), "30.00")
+    venta(cliente, date(2026, 2, 15), "999.00", estado_venta="cancelada")
+    venta(cliente, date(2026, 4, 2), "70.00")
+    cobro(cliente, date(2026, 4, 20), "40.00")
+    venta(otro_cliente, date(2026, 2, 5), "500.00")
+
+
+def saldo_recorriendo(cliente, fecha):
+    debe = Ventas.objects.filter(cliente=cliente, fecha_venta__lt=fecha).exclude(
+        estado_venta="cancelada"
+    ).aggregate(total=Sum("total"))["total"] or Decimal("0")
+    haber = Cobros.objects.filter(cliente=cliente, fecha_cobro__lt=fecha).aggregate(
+        total=Sum("monto")
+    )["total"] or Decimal("0")
+    return debe - haber
+
+
+def filas_saldos():
+    return sorted(SaldoMensual.objects.values_list("contacto_id", "mes", "debe", "haber", "saldo"))
+
+
+def test_cierres_acumulan_por_mes(cliente, otro_cliente):
+    sembrar_historia(cliente, otro_cliente)
+
+    assert reconstruir_saldos_mensuales() == 4
+    assert filas_saldos() == sorted([
+        (cliente.id, date(2026, 1, 1), Decimal("150.00"), Decimal("0.00"), Decimal("150.00")),
+        (cliente.id, date(2026, 2, 1), Decimal("0.00"), Decimal("30.00"), Decimal("120.00")),
+        (cliente.id, date(2026, 4, 1), Decimal("70.00"), Decimal("40.00"), Decimal("150.00")),
+        (otro_cliente.id, date(2026, 2, 1), Decimal("500.00"), Decimal("0.00"), Decimal("500.00")),
+    ])
+
+
+@pytest.mark.parametrize("fecha", [
+    date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 31), date(2026, 2, 1), date(2026, 2, 2),
+    date(2026, 3, 15), date(2026, 4, 1), date(2026, 4, 20), date(2026, 4, 21), date(2026, 6, 1),
+])
+def test_saldo_inicial_igual_a_recorrer_la_historia(cliente, otro_cliente, fecha):
+    sembrar_historia(cliente, otro_cliente)
+    reconstruir_saldos_mensuales()
+
+    assert saldo_cuenta_corriente_al_inicio(cliente, fecha) == saldo_recorriendo(cliente, fecha)
+    contexto = _build_cuenta_corriente_context(cliente, fecha.isoformat())
+    assert contexto["saldo_inicial"] == saldo_recorriendo(cliente, fecha)
+
+
+def test_actualizacion_incremental_igual_a_reconstruir(cliente, otro_cliente):
+    sembrar_historia(cliente, otro_cliente)
+    reconstruir_saldos_mensuales()
+
+    # Documentos con fecha en meses ya cerrados: se rearman los cierres posteriores
+    nuevos_ventas = [venta(cliente, date(2026, 1, 20), "25.00"), venta(otro_cliente, date(2026, 3, 3), "10.00")]
+    nuevos_cobros = [cobro(cliente, date(2026, 3, 9), "5.00")]
+    anulada = Ventas.objects.get(cliente=cliente, fecha_venta=date(2026, 4, 2))
+    anulada.estado_venta = "cancelada"
+    anulada.save()
+    actualizar_saldos_mensuales(ventas=[*nuevos_ventas, anulada], cobros=nuevos_cobros)
+
+    incremental = filas_saldos()
+    reconstruir_saldos_mensuales()
+    assert incremental == filas_saldos()
+    assert SaldoMensual.objects.get(contacto=cliente, mes=date(2026, 4, 1)).saldo == Decimal("100.00")
+
+
+def test_automatizaciones_mantienen_los_cierres(api_client, cliente):
+    producto = Productos.objects.create(nombre="Huevos", rubro="huevos", unidad_medida="un")
+    res = api_client.post("/api/ventas/", {
+        "cliente": cliente.id,
+        "forma_pago": "cuenta corriente",
+        "detalles": [{"producto": producto.id, "cantidad": "1", "precio_unitario": "100.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+    res = api_client.post("/api/cobros/", {
+        "cliente": cliente.id,
+        "monto": "40.00",
+        "medio_pago": "efectivo",
+        "detalles": [{"venta": res.data["id"], "monto_aplicado": "40.00"}],
+    }, format="json")
+    assert res.status_code == 201, res.data
+
+    incremental = filas_saldos()
+    reconstruir_saldos_mensuales()
+    assert incremental == filas_saldos()
+    assert [fila[-1] for fila in incremental] == [Decimal("60.00")]
+
+
+def test_comando_reconstruye(cliente, otro_cliente):
+    sembrar_historia(cliente, otro_cliente)
+
+    call_command("reconstruir_saldos_mensuales", "--contacto", str(otro_cliente.id))
+    assert SaldoMensual.objects.count() == 1
+
+    call_command("reconstruir_saldos_mensuales")
+    assert SaldoMensual.objects.count() == 4
+
+
+def test_ediciones_y_bajas_actualizan_los_cierres(api_client, cliente, otro_cliente):
+    sembrar_historia(cliente, otro_cliente)
+    reconstruir_saldos_mensuales()
+    primera = Ventas.objects.get(cliente=cliente, fecha_venta=date(2026, 1, 10))
+    primer_cobro = Cobros.objects.get(cliente=cliente, fecha_cobro=date(2026, 2, 1))
+
+    def coincide_con_reconstruir():
+        incremental = filas_saldos()
+        reconstruir_saldos_mensuales()
+        return incremental == filas_saldos()
+
+    # La venta de enero pasa a marzo, con otro total
+    res = api_client.patch(
+        f"/api/ventas/{primera.id}/", {"fecha_venta": "2026-03-05", "total": "120.00"}, format="json"
+    )
+    assert res.status_code == 200, res.data
+    assert coincide_con_reconstruir()
+    assert SaldoMensual.objects.get(contacto=cliente, mes=date(2026, 1, 1)).saldo == Decimal("50.00")
+
+    # El cobro de febrero vuelve a enero y cambia de cliente
+    res = api_client.patch(
+        f"/api/cobros/{primer_cobro.id}/", {"fecha_cobro": "2026-01-31", "cliente": otro_cliente.id}, format="json"
+    )
+    assert res.status_code == 200, res.data
+    assert coincide_con_reconstruir()
+    assert SaldoMensual.objects.get(contacto=otro_cliente, mes=date(2026, 1, 1)).saldo == Decimal("-30.00")
+
+    res = api_client.delete(f"/api/cobros/{primer_cobro.id}/")
+    assert res.status_code == 204
+    assert coincide_con_reconstruir()
+    assert not SaldoMensual.objects.filter(contacto=otro_cliente, mes=date(2026, 1, 1)).exists()
+    assert saldo_cuenta_corriente_al_inicio(cliente, date(2026, 5, 1)) == saldo_recorriendo(cliente, date(2026, 5, 1))
+
+
+@pytest.mark.parametrize("ruta", ["", "pdf/"])
+@pytest.mark.parametrize("query", ["fecha_desde=2026-13-01", "fecha_hasta=ayer"])
+def test_cuenta_corriente_rechaza_fechas_invalidas(api_client, cliente, ruta, query):
+    res = api_client.get(f"/documentos/cuenta-corriente/clientes/{cliente.id}/{ruta}?{query}")
+
+    assert res.status_code == 400
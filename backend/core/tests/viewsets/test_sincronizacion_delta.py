@@ -0,0 +1,85 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Productos, Eliminaciones
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def crear_producto(nombre):
+    return Productos.objects.create(nombre=nombre, rubro="huevos", unidad_medida="un")
+
+
+def test_devuelve_solo_cambios_y_eliminados(api_client, user):
+    viejo = crear_producto("Viejo")
+    borrado = crear_producto("Borrado")
+    Productos.objects.filter(pk__in=[viejo.pk, borrado.pk]).update(
+        actualizado_en=timezone.now() - timedelta(days=2)
+    )
+    desde = timezone.now() - timedelta(days=1)
+
+    nuevo = crear_producto("Nuevo")
+    borrado_id = borrado.id
+    borrado.delete()
+
+    res = api_client.get("/api/productos/", {"updated_since": desde.isoformat()})
+
+    assert res.status_code == 200
+    assert [item["id"] for item in res.data["results"]] == [nuevo.id]
+    assert res.data["deleted"] == [borrado_id]
+    assert res.data["server_time"]
+
+
+def test_sin_updated_since_devuelve_lista(api_client, user):
+    crear_producto("Uno")
+
+    res = api_client.get("/api/productos/")
+
+    assert isinstance(res.data, list)
+
+
+def test_tombstone_solo_del_modelo_consultado(api_client, user):
+    contacto = Contactos.objects.create(nombre="Cliente", tipo="cliente")
+    desde = timezone.now() - timedelta(minutes=1)
+    contacto_id = contacto.id
+    contacto.delete()
+
+    res = api_client.get("/api/productos/", {"updated_since": desde.isoformat()})
+
+    assert res.data["deleted"] == []
+    assert Eliminaciones.objects.filter(modelo="core.Contactos", objeto_id=contacto_id).exists()
+
+
+def test_etag_cambia_con_eliminaciones(api_client, user):
+    producto = crear_producto("Uno")
+    Productos.objects.filter(pk=producto.pk).update(actualizado_en=timezone.now() - timedelta(days=2))
+    params = {"updated_since": (timezone.now() - timedelta(days=1)).isoformat()}
+    etag = api_client.get("/api/productos/", params)["ETag"]
+
+    producto_id = producto.id
+    producto.delete()
+
+    res = api_client.get("/api/productos/", params, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res.data["deleted"] == [producto_id]
+
+
+def test_updated_since_invalido(api_client, user):
+    res = api_client.get("/api/productos/", {"updated_since": "ayer"})
+
+    assert res.status_code == 400
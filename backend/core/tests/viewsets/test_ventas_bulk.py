@@ -0,0 +1,128 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from core.models import Contactos, Productos, Ventas, VentasDetalle
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(api_client):
+    user = User.objects.create_user(username="testuser", password="testpass")
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def clientes():
+    return [
+        Contactos.objects.create(nombre=f"Cliente {i}", tipo="cliente", saldo_contacto=Decimal("10.00"))
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def productos():
+    return [
+        Productos.objects.create(nombre=f"Producto {i}", rubro="huevos", unidad_medida="un")
+        for i in range(3)
+    ]
+
+
+def payload_ventas(clientes, productos, cantidad):
+    return [
+        {
+            "cliente": clientes[i % len(clientes)].id,
+            "forma_pago": "cuenta corriente",
+            "costo_entrega": "5.00",
+            "descuento": "1.00",
+            "detalles": [
+                {"producto": productos[0].id, "cantidad": "2", "precio_unitario": "100.00"},
+                {"producto": productos[i % len(productos)].id, "cantidad": "1", "precio_unitario": "50.50"},
+            ],
+        }
+        for i in range(cantidad)
+    ]
+
+
+def test_bulk_crea_ventas_con_totales_y_saldos(api_client, user, clientes, productos):
+    res = api_client.post("/api/ventas/bulk/", payload_ventas(clientes, productos, 4), format="json")
+
+    assert res.status_code == 201
+    assert len(res.data) == 4
+    assert [venta["cliente"] for venta in res.data] == [clientes[i % 3].id for i in range(4)]
+    assert all(len(venta["detalles"]) == 2 for venta in res.data)
+    assert {venta["total"] for venta in res.data} == {"254.50"}
+
+    venta = Ventas.objects.get(pk=res.data[0]["id"])
+    assert venta.subtotal == Decimal("250.50")
+    assert venta.saldo_pendiente == Decimal("254.50")
+    assert venta.estado_cobro == "pendiente"
+
+    saldos = {c.id: c.saldo_contacto for c in Contactos.objects.all()}
+    assert saldos[clientes[0].id] == Decimal("10.00") + 2 * Decimal("254.50")
+    assert saldos[clientes[1].id] == Decimal("10.00") + Decimal("254.50")
+    assert saldos[clientes[2].id] == Decimal("10.00") + Decimal("254.50")
+
+
+def test_bulk_coincide_con_alta_individual(api_client, user, clientes, productos):
+    payload = payload_ventas(clientes, productos, 1)
+    individual = api_client.post("/api/ventas/", payload[0], format="json").data
+    masiva = api_client.post("/api/ventas/bulk/", payload, format="json").data[0]
+
+    ignorar = {"id", "detalles"}
+    assert {k: v for k, v in masiva.items() if k not in ignorar} == {
+        k: v for k, v in individual.items() if k not in ignorar
+    }
+
+
+def test_bulk_queries_constantes(api_client, user, clientes, productos):
+    def queries(cantidad):
+        with CaptureQueriesContext(connection) as ctx:
+            res = api_client.post("/api/ventas/bulk/", payload_ventas(clientes, productos, cantidad), format="json")
+        assert res.status_code == 201
+        return len(ctx.captured_queries)
+
+    assert queries(2) == queries(30)
+
+
+def test_bulk_valida_todo_antes_de_guardar(api_client, user, clientes, productos):
+    payload = payload_ventas(clientes, productos, 3)
+    payload[1]["detalles"] = []
+    payload[2]["detalles"][0]["producto"] = 999999
+
+    res = api_client.post("/api/ventas/bulk/", payload, format="json")
+
+    assert res.status_code == 400
+    assert res.data[0] == {}
+    assert "al menos un detalle" in str(res.data[1])
+    assert "producto" in str(res.data[2])
+    assert Ventas.objects.count() == 0
+    assert VentasDetalle.objects.count() == 0
+    assert Contactos.objects.get(pk=clientes[0].id).saldo_contacto == Decimal("10.00")
+
+
+def test_bulk_rechaza_cliente_inexistente(api_client, user, clientes, productos):
+    payload = payload_ventas(clientes, productos, 1)
+    payload[0]["cliente"] = 999999
+
+    res = api_client.post("/api/ventas/bulk/", payload, format="json")
+
+    assert res.status_code == 400
+    assert "cliente" in res.data[0]
+
+
+def test_bulk_rechaza_lista_vacia(api_client, user):
+    res = api_client.post("/api/ventas/bulk/", [], format="json")
+
+    assert res.status_code == 400
+    assert Ventas.objects.count() == 0
@@ -14,6 +14,9 @@ from .views import (
     PagosDetalleViewSet,
     NotasCreditoViewSet,
     DashboardView,
+    DashboardSeriesView,
+    BatchView,
+    AutocompletadoView,
 )
 
 router = DefaultRouter()
@@ -37,6 +40,9 @@ router.register(r'pagos-detalle', PagosDetalleViewSet, basename='pagos-detalle')
 router.register(r'notas-credito', NotasCreditoViewSet, basename='notas-credito')
 
 urlpatterns = [
-    path('dashboard/', DashboardView.as_view()),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/series/', DashboardSeriesView.as_view(), name='dashboard-series'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('autocomplete/<str:catalogo>/', AutocompletadoView.as_view(), name='autocomplete'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,33 @@
+import time
+
+from django.core.cache import cache
+
+# ============================================================
+# Versiones de datos en la cache compartida
+# ============================================================
+
+# Una version por conjunto de datos (catalogo de autocompletado, dashboard).
+# Quien cachea algo derivado incluye la version en la clave; quien escribe la
+# cambia, y las entradas viejas quedan sin leer hasta que expiran.
+# La cache tiene que ser compartida por todos los procesos (CACHES en
+# settings): con una cache por proceso, los demas workers no verian el cambio.
+# La version nueva es un valor que no se repite (time_ns) y se guarda con
+# set: no depende de un incr atomico, que la cache en base de datos no tiene.
+
+
+def _clave_version(nombre):
+    return f"version:{nombre}"
+
+
+def obtener_version(nombre):
+    clave = _clave_version(nombre)
+    version = cache.get(clave)
+    if version is None:
+        # Si la cache se vacio, arrancar de un valor que no repita versiones viejas
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+
+def incrementar_version(nombre):
+    cache.set(_clave_version(nombre), time.time_ns(), None)
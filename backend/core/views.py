@@ -1,3 +1,5 @@
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
 from django.utils import timezone
 from rest_framework import viewsets
 from rest_framework.views import APIView
@@ -8,16 +10,24 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
-from django.db.models import Sum, Count, Max, Q, F
-from django.db.models.functions import Coalesce
+from django.db.models import BooleanField, Case, Count, DateField, Exists, F, Max, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from collections import defaultdict
 from datetime import datetime, timedelta
-from .models import Usuarios, Contactos, Productos, Ventas, VentasDetalle, Cobros, CobrosDetalle, CobrosMedioPago, Compras, ComprasDetalle, Pagos, PagosDetalle, PagosMedioPago, NotasCredito, NotasCreditoDetalle
-from .serializers import UsuariosSerializer, ResetearContrasenaSerializer, CambiarContrasenaSerializer, CambiarEmailSerializer, CambiarEstadoUsuarioSerializer, ContactosSerializer, ProductosSerializer, VentasSerializer, CambiarEstadoVentaSerializer, VentasDetalleSerializer, CancelarVentaSerializer, CobrosSerializer, CobrosDetalleSerializer, ComprasSerializer, ComprasDetalleSerializer, CambiarEstadoCompraSerializer, CancelarCompraSerializer, PagosSerializer, PagosDetalleSerializer, NotasCreditoSerializer
+from urllib.parse import urlsplit
+from .models import Usuarios, Contactos, Productos, Ventas, VentasDetalle, Cobros, CobrosDetalle, CobrosMedioPago, Compras, ComprasDetalle, Pagos, PagosDetalle, PagosMedioPago, NotasCredito, NotasCreditoDetalle, ResumenDiario
+from .serializers import UsuariosSerializer, ResetearContrasenaSerializer, CambiarContrasenaSerializer, CambiarEmailSerializer, CambiarEstadoUsuarioSerializer, ContactosSerializer, ProductosSerializer, VentasSerializer, CambiarEstadoVentaSerializer, VentasDetalleSerializer, CancelarVentaSerializer, CobrosSerializer, CobrosDetalleSerializer, ComprasSerializer, ComprasDetalleSerializer, CambiarEstadoCompraSerializer, CancelarCompraSerializer, PagosSerializer, PagosDetalleSerializer, NotasCreditoSerializer, BatchSerializer, VentasListadoSerializer, CobrosListadoSerializer, ComprasListadoSerializer, PagosListadoSerializer, NotasCreditoListadoSerializer
 from .domain.logica import calcular_precios_producto, calcular_subtotal
 from .domain.validaciones_ventas import validar_cambio_estado_venta
 from .domain.validaciones_usuarios import validar_cambio_estado_usuario, validar_cambio_contrasena, validar_cambio_email
 from .domain.validaciones_compras import validar_cambio_estado_compra
+from .autocompletado import CATALOGOS, obtener_indice
+from .busqueda import filtrar_busqueda
+from .dashboard import GRANULARIDADES, MAXIMO_PERIODOS, PERIODOS_POR_DEFECTO, dashboard_cacheado, evaluar_secciones, inicio_periodo, periodos, sumar_periodos
+from .mixins import ExportacionNdjsonMixin, GetCondicionalMixin, ListadoPlanoMixin, QuerysetOptimizadoMixin, ResumenDiarioMixin, SincronizacionDeltaMixin, optimizar_queryset
+from .servicios.resumen_diario import actualizar_resumen
 from .servicios.automatizaciones import cancelar_compra, recalcular_estado_pago, recalcular_precios_producto, cancelar_venta_domain
+from .servicios.imputacion import imputar_cobros
 from decimal import Decimal
 
 # ============================================================
@@ -26,7 +36,7 @@ from decimal import Decimal
 
 # Usuarios
 
-class UsuariosViewSet(viewsets.ModelViewSet):
+class UsuariosViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = UsuariosSerializer
     queryset = Usuarios.objects.all()
 
@@ -51,7 +61,7 @@ class UsuariosViewSet(viewsets.ModelViewSet):
             return Response({"error": str(e)}, status=400)
 
         usuario_objetivo.activo = nuevo_estado
-        usuario_objetivo.save(update_fields=['activo'])
+        usuario_objetivo.save(update_fields=['activo', 'actualizado_en'])
 
         return Response({"status": "Estado del usuario actualizado correctamente."})
 
@@ -120,7 +130,7 @@ class UsuariosViewSet(viewsets.ModelViewSet):
 
 # Contactos
 
-class ContactosViewSet(viewsets.ModelViewSet):
+class ContactosViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = ContactosSerializer
     queryset = Contactos.objects.all()
 
@@ -140,13 +150,13 @@ class ContactosViewSet(viewsets.ModelViewSet):
         if forma_pago:
             queryset = queryset.filter(forma_pago=forma_pago)
         if nombre:
-            queryset = queryset.filter(nombre__icontains=nombre)
+            queryset = filtrar_busqueda(queryset, nombre, ['nombre', 'nombre_fantasia']).order_by('-relevancia', 'nombre')
 
         return queryset
 
 # Productos
 
-class ProductosViewSet(viewsets.ModelViewSet):
+class ProductosViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = ProductosSerializer
     queryset = Productos.objects.all()
 
@@ -155,7 +165,7 @@ class ProductosViewSet(viewsets.ModelViewSet):
         nombre = self.request.query_params.get('nombre', None)
 
         if nombre:
-            queryset = queryset.filter(nombre__icontains=nombre)
+            queryset = filtrar_busqueda(queryset, nombre, ['nombre']).order_by('-relevancia', 'nombre')
 
         return queryset
 
@@ -170,8 +180,12 @@ class ProductosViewSet(viewsets.ModelViewSet):
 
 # Ventas
 
-class VentasViewSet(viewsets.ModelViewSet):
+class VentasViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, ExportacionNdjsonMixin, ListadoPlanoMixin, ResumenDiarioMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = VentasSerializer
+    list_serializer_class = VentasListadoSerializer
+    resumen_documentos = 'ventas'
+    relaciones_modificacion = {'cliente_nombre': 'cliente'}
+    expansiones_modificacion = {'cobros_detalle': 'cobros_detalle__cobro'}
     queryset = Ventas.objects.all()
 
     @action(detail=True, methods=['post'], serializer_class=CambiarEstadoVentaSerializer)
@@ -188,7 +202,8 @@ class VentasViewSet(viewsets.ModelViewSet):
             return Response({"error": str(e)}, status=400)
 
         venta.estado_venta = nuevo_estado
-        venta.save(update_fields=['estado_venta'])
+        venta.save(update_fields=['estado_venta', 'actualizado_en'])
+        actualizar_resumen(ventas=[venta])
 
         return Response({"status": "Estado actualizado correctamente."})
 
@@ -207,12 +222,26 @@ class VentasViewSet(viewsets.ModelViewSet):
 
         venta.motivo_cancelacion = motivo_cancelacion
         venta.fecha_cancelacion = timezone.now().date()
-        venta.save(update_fields=['motivo_cancelacion', 'fecha_cancelacion'])
+        venta.save(update_fields=['motivo_cancelacion', 'fecha_cancelacion', 'actualizado_en'])
 
         cancelar_venta_domain(venta)
 
         return Response({"status": "Venta cancelada correctamente."})
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        ventas = serializer.save()
+
+        context = self.get_serializer_context()
+        queryset = optimizar_queryset(
+            Ventas.objects.filter(pk__in=[venta.pk for venta in ventas]).order_by('id'),
+            VentasSerializer(context=context),
+        )
+        data = VentasSerializer(queryset, many=True, context=context).data
+        return Response(data, status=201)
+
     def get_queryset(self):
         queryset = super().get_queryset()
         params = self.request.query_params
@@ -227,7 +256,7 @@ class VentasViewSet(viewsets.ModelViewSet):
         if estado_venta:
             queryset = queryset.filter(estado_venta=estado_venta)
         if cliente:
-            queryset = queryset.filter(cliente__nombre__icontains=cliente)
+            queryset = filtrar_busqueda(queryset, cliente, ['cliente__nombre'])
         if cliente_id:
             queryset = queryset.filter(cliente_id=cliente_id)
         if fecha_desde:
@@ -239,7 +268,7 @@ class VentasViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-fecha_venta', 'id')
 
-class VentasDetalleViewSet(ReadOnlyModelViewSet):
+class VentasDetalleViewSet(QuerysetOptimizadoMixin, ReadOnlyModelViewSet):
     serializer_class = VentasDetalleSerializer
     queryset = VentasDetalle.objects.all()
 
@@ -252,7 +281,7 @@ class VentasDetalleViewSet(ReadOnlyModelViewSet):
         queryset = super().get_queryset()
         producto = self.request.query_params.get('producto', None)
         if producto:
-            queryset = queryset.filter(producto__nombre__icontains=producto)
+            queryset = filtrar_busqueda(queryset, producto, ['producto__nombre'])
         venta_id = self.request.query_params.get('venta_id', None)
         if venta_id:
             queryset = queryset.filter(venta_id=venta_id)
@@ -260,8 +289,10 @@ class VentasDetalleViewSet(ReadOnlyModelViewSet):
 
 # Cobros
 
-class CobrosViewSet(viewsets.ModelViewSet):
+class CobrosViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, ExportacionNdjsonMixin, ListadoPlanoMixin, ResumenDiarioMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = CobrosSerializer
+    list_serializer_class = CobrosListadoSerializer
+    resumen_documentos = 'cobros'
     queryset = Cobros.objects.all()
 
     def get_queryset(self):
@@ -274,7 +305,7 @@ class CobrosViewSet(viewsets.ModelViewSet):
         fecha_hasta = params.get('fecha_hasta', None)
 
         if cliente:
-            queryset = queryset.filter(cliente__nombre__icontains=cliente)
+            queryset = filtrar_busqueda(queryset, cliente, ['cliente__nombre'])
         if cliente_id:
             queryset = queryset.filter(cliente_id=cliente_id)
         if fecha:
@@ -286,14 +317,22 @@ class CobrosViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-class CobrosDetalleViewSet(ReadOnlyModelViewSet):
+    @action(detail=True, methods=['post'])
+    def imputar(self, request, pk=None):
+        imputar_cobros(cobros=[self.get_object()])
+        return Response(self.get_serializer(self.get_object()).data)
+
+class CobrosDetalleViewSet(QuerysetOptimizadoMixin, ReadOnlyModelViewSet):
     serializer_class = CobrosDetalleSerializer
     queryset = CobrosDetalle.objects.all()
 
 # Compras
 
-class ComprasViewSet(viewsets.ModelViewSet):
+class ComprasViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, ExportacionNdjsonMixin, ListadoPlanoMixin, ResumenDiarioMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = ComprasSerializer
+    list_serializer_class = ComprasListadoSerializer
+    resumen_documentos = 'compras'
+    expansiones_modificacion = {'pagos_detalle': 'pagos_detalle__pago'}
     queryset = Compras.objects.all()
 
     def get_queryset(self):
@@ -305,7 +344,7 @@ class ComprasViewSet(viewsets.ModelViewSet):
         estado_pago = self.request.query_params.get('estado_pago')
 
         if proveedor:
-            queryset = queryset.filter(proveedor__nombre__icontains=proveedor)
+            queryset = filtrar_busqueda(queryset, proveedor, ['proveedor__nombre'])
         if estado_compra:
             queryset = queryset.filter(estado_compra=estado_compra)
         if fecha:
@@ -342,17 +381,20 @@ class ComprasViewSet(viewsets.ModelViewSet):
         compra.estado_compra = nuevo_estado
         compra.estado_pago = recalcular_estado_pago(compra)
         compra.save()
+        actualizar_resumen(compras=[compra])
 
         return Response({"status": "Estado de compra actualizado correctamente."})
 
-class ComprasDetalleViewSet(ReadOnlyModelViewSet):
+class ComprasDetalleViewSet(QuerysetOptimizadoMixin, ReadOnlyModelViewSet):
     serializer_class = ComprasDetalleSerializer
     queryset = ComprasDetalle.objects.all()
 
 # Pagos
 
-class PagosViewSet(viewsets.ModelViewSet):
+class PagosViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, ExportacionNdjsonMixin, ListadoPlanoMixin, ResumenDiarioMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = PagosSerializer
+    list_serializer_class = PagosListadoSerializer
+    resumen_documentos = 'pagos'
     queryset = Pagos.objects.all()
 
     def get_queryset(self):
@@ -361,26 +403,22 @@ class PagosViewSet(viewsets.ModelViewSet):
         fecha = self.request.query_params.get('fecha_pago', None)
 
         if proveedor:
-            queryset = queryset.filter(proveedor__nombre__icontains=proveedor)
+            queryset = filtrar_busqueda(queryset, proveedor, ['proveedor__nombre'])
         if fecha:
             queryset = queryset.filter(fecha_pago=fecha)
 
         return queryset
 
-class PagosDetalleViewSet(viewsets.ModelViewSet):
+class PagosDetalleViewSet(QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = PagosDetalleSerializer
     queryset = PagosDetalle.objects.all()
 
 # Notas de Credito
 
-class NotasCreditoViewSet(viewsets.ModelViewSet):
+class NotasCreditoViewSet(SincronizacionDeltaMixin, GetCondicionalMixin, ListadoPlanoMixin, QuerysetOptimizadoMixin, viewsets.ModelViewSet):
     serializer_class = NotasCreditoSerializer
-    queryset = NotasCredito.objects.all().select_related(
-        'contacto'
-        ).prefetch_related(
-        'detalles',
-        'aplicaciones'
-        )
+    list_serializer_class = NotasCreditoListadoSerializer
+    queryset = NotasCredito.objects.all()
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -407,16 +445,12 @@ class NotasCreditoViewSet(viewsets.ModelViewSet):
 
 class DashboardView(APIView):
     def get(self, request):
-        params = request.query_params
-        fecha_desde = params.get("fecha_desde")
-        fecha_hasta = params.get("fecha_hasta")
-        cliente = params.get("cliente")
-        proveedor = params.get("proveedor")
-        forma_pago = params.get("forma_pago")
-        estado_cobro = params.get("estado_cobro")
-        estado_pago = params.get("estado_pago")
-        medio_pago = params.get("medio_pago")
+        filtros = self.get_filtros(request.query_params)
+        hoy = timezone.localdate()
+        data = dashboard_cacheado(filtros, hoy, lambda: self.calcular(filtros, hoy))
+        return Response(data)
 
+    def get_filtros(self, params):
         def parse_date(value):
             if not value:
                 return None
@@ -425,8 +459,26 @@ class DashboardView(APIView):
             except ValueError:
                 raise ValidationError("Formato de fecha invalido. Usa YYYY-MM-DD.")
 
-        fecha_desde_date = parse_date(fecha_desde)
-        fecha_hasta_date = parse_date(fecha_hasta)
+        return {
+            "fecha_desde": parse_date(params.get("fecha_desde")),
+            "fecha_hasta": parse_date(params.get("fecha_hasta")),
+            "cliente": params.get("cliente"),
+            "proveedor": params.get("proveedor"),
+            "forma_pago": params.get("forma_pago"),
+            "estado_cobro": params.get("estado_cobro"),
+            "estado_pago": params.get("estado_pago"),
+            "medio_pago": params.get("medio_pago"),
+        }
+
+    def querysets(self, filtros):
+        fecha_desde_date = filtros["fecha_desde"]
+        fecha_hasta_date = filtros["fecha_hasta"]
+        cliente = filtros["cliente"]
+        proveedor = filtros["proveedor"]
+        forma_pago = filtros["forma_pago"]
+        estado_cobro = filtros["estado_cobro"]
+        estado_pago = filtros["estado_pago"]
+        medio_pago = filtros["medio_pago"]
 
         def apply_date_range(qs, field):
             if fecha_desde_date:
@@ -471,64 +523,107 @@ class DashboardView(APIView):
 
         ventas_validas = ventas_qs.exclude(estado_venta="cancelada")
         compras_validas = compras_qs.exclude(estado_compra="cancelada")
+        return ventas_validas, compras_validas, cobros_qs, pagos_qs
+
+    def calcular(self, filtros, hoy):
+        # Las secciones son independientes: con DASHBOARD_HILOS se evaluan en paralelo
+        secciones = evaluar_secciones({
+            "cards": lambda: self.seccion_tarjetas(filtros),
+            "clientes_con_deuda": lambda: self.seccion_clientes_con_deuda(filtros),
+            "compras_pendientes": lambda: self.seccion_compras_pendientes(filtros),
+            "vencimientos": lambda: self.seccion_vencimientos(filtros, hoy),
+        })
+        documentos_por_vencer, documentos_vencidos = secciones["vencimientos"]
+
+        return {
+            "filters": filtros,
+            "cards": secciones["cards"],
+            "clientes_con_deuda": secciones["clientes_con_deuda"],
+            "compras_pendientes": secciones["compras_pendientes"],
+            "documentos_por_vencer": documentos_por_vencer,
+            "documentos_vencidos": documentos_vencidos,
+        }
+
+    def seccion_tarjetas(self, filtros):
+        # Tarjetas: desde ResumenDiario, que tiene una fila por dia y contacto.
+        # El filtro por medio de pago no se puede resolver ahi y lee los documentos.
+        if filtros["medio_pago"]:
+            totales = self.totales_documentos(*self.querysets(filtros))
+        else:
+            totales = self.totales_resumen(filtros)
 
-        ventas_totales = ventas_validas.aggregate(total=Sum("total")).get("total") or Decimal("0")
-        compras_totales = compras_validas.aggregate(total=Sum("total")).get("total") or Decimal("0")
+        ventas_totales = totales["ventas_totales"]
+        compras_totales = totales["compras_totales"]
         ganancia_bruta = ventas_totales - compras_totales
         margen_bruto = (
             (ganancia_bruta / ventas_totales) if ventas_totales else Decimal("0")
         )
+        flujo_neto = totales["ingresos_caja"] - totales["egresos_caja"]
+
+        return {
+            "ventas_totales": {
+                "total": str(ventas_totales),
+                "cobradas": str(totales["ventas_cobradas"]),
+                "parciales": str(totales["ventas_parciales"]),
+                "pendientes": str(totales["ventas_pendientes"]),
+            },
+            "compras_totales": {
+                "total": str(compras_totales),
+                "pagadas": str(totales["compras_pagadas"]),
+                "parciales": str(totales["compras_parciales"]),
+                "pendientes": str(totales["compras_pendientes"]),
+            },
+            "ganancia_bruta": str(ganancia_bruta),
+            "margen_bruto": str(margen_bruto),
+            "ingresos_caja": {
+                "total": str(totales["ingresos_caja"]),
+                "por_medio_pago": {
+                    "efectivo": str(totales["ingresos_efectivo"]),
+                    "transferencia": str(totales["ingresos_transferencia"]),
+                },
+            },
+            "egresos_caja": {
+                "total": str(totales["egresos_caja"]),
+            },
+            "flujo_neto": str(flujo_neto),
+            "deuda_clientes": str(totales["deuda_clientes"]),
+            "deuda_proveedores": str(totales["deuda_proveedores"]),
+        }
 
-        ventas_cobradas = (
-            ventas_validas.filter(estado_cobro="cobrado").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-        ventas_parciales = (
-            ventas_validas.filter(estado_cobro="parcial").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-        ventas_pendientes = (
-            ventas_validas.filter(estado_cobro="pendiente").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-
-        compras_pagadas = (
-            compras_validas.filter(estado_pago="pagado").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-        compras_parciales = (
-            compras_validas.filter(estado_pago="parcial").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-        compras_pendientes = (
-            compras_validas.filter(estado_pago="pendiente").aggregate(total=Sum("total")).get("total")
-            or Decimal("0")
-        )
-
-        ingresos_caja = cobros_qs.aggregate(total=Sum("monto")).get("total") or Decimal("0")
-        egresos_caja = pagos_qs.aggregate(total=Sum("monto")).get("total") or Decimal("0")
-        flujo_neto = ingresos_caja - egresos_caja
+    def seccion_vencimientos(self, filtros, hoy):
+        # Los vencimientos dependen de `hoy`: se leen de las ventas abiertas
+        # (indice parcial ventas_abiertas_venc_idx), un Count/Sum por bucket.
+        ventas_validas = self.querysets(filtros)[0]
+        buckets_vencimiento = {
+            "hoy": Q(vencimiento=hoy),
+            "proximos_7_dias": Q(vencimiento__gt=hoy, vencimiento__lte=hoy + timedelta(days=7)),
+            "proximos_30_dias": Q(vencimiento__gt=hoy + timedelta(days=7), vencimiento__lte=hoy + timedelta(days=30)),
+            "vencidos": Q(vencimiento__lt=hoy),
+        }
+        agregados_vencimiento = {}
+        for nombre, condicion in buckets_vencimiento.items():
+            agregados_vencimiento[f"{nombre}_cantidad"] = Count("id", filter=condicion)
+            agregados_vencimiento[f"{nombre}_saldo"] = Sum("saldo_pendiente", filter=condicion)
+        vencimientos_data = ventas_validas.filter(
+            saldo_pendiente__gt=0, vencimiento__isnull=False
+        ).aggregate(**agregados_vencimiento)
 
-        cobros_medios_qs = CobrosMedioPago.objects.filter(cobro__in=cobros_qs)
-        cobros_legado_qs = cobros_qs.filter(medios_pago__isnull=True)
+        def resumen_vencimientos(nombre):
+            return {
+                "cantidad": vencimientos_data[f"{nombre}_cantidad"] or 0,
+                "saldo": str(vencimientos_data[f"{nombre}_saldo"] or Decimal("0")),
+            }
 
-        ingresos_efectivo = (
-            cobros_medios_qs.filter(medio_pago="efectivo").aggregate(total=Coalesce(Sum("monto"), Decimal("0"))).get("total")
-            + (cobros_legado_qs.filter(medio_pago="efectivo").aggregate(total=Sum("monto")).get("total") or Decimal("0"))
-        )
-        ingresos_transferencia = (
-            cobros_medios_qs.filter(medio_pago="transferencia").aggregate(total=Coalesce(Sum("monto"), Decimal("0"))).get("total")
-            + (cobros_legado_qs.filter(medio_pago="transferencia").aggregate(total=Sum("monto")).get("total") or Decimal("0"))
-        )
+        documentos_por_vencer = {
+            "hoy": resumen_vencimientos("hoy"),
+            "proximos_7_dias": resumen_vencimientos("proximos_7_dias"),
+            "proximos_30_dias": resumen_vencimientos("proximos_30_dias"),
+        }
+        return documentos_por_vencer, resumen_vencimientos("vencidos")
 
-        deuda_clientes = (
-            ventas_validas.filter(saldo_pendiente__gt=0).aggregate(total=Sum("saldo_pendiente")).get("total")
-            or Decimal("0")
-        )
-        deuda_proveedores = (
-            compras_validas.filter(saldo_pendiente__gt=0).aggregate(total=Sum("saldo_pendiente")).get("total")
-            or Decimal("0")
-        )
+    def seccion_clientes_con_deuda(self, filtros):
+        fecha_desde_date = filtros["fecha_desde"]
+        fecha_hasta_date = filtros["fecha_hasta"]
 
         ventas_deuda_filter = Q(ventas__saldo_pendiente__gt=0) & ~Q(ventas__estado_venta="cancelada")
         if fecha_desde_date:
@@ -543,15 +638,15 @@ class DashboardView(APIView):
             cobros_fecha_filter &= Q(cobros__fecha_cobro__lte=fecha_hasta_date)
 
         clientes_qs = Contactos.objects.filter(tipo="cliente", saldo_contacto__gt=0)
-        if cliente:
-            clientes_qs = clientes_qs.filter(id=cliente)
+        if filtros["cliente"]:
+            clientes_qs = clientes_qs.filter(id=filtros["cliente"])
 
         clientes_qs = clientes_qs.annotate(
             ventas_pendientes=Count("ventas", filter=ventas_deuda_filter, distinct=True),
             ultimo_cobro=Max("cobros__fecha_cobro", filter=cobros_fecha_filter),
         ).order_by("-saldo_contacto", "nombre")
 
-        clientes_con_deuda = [
+        return [
             {
                 "id": cliente_item.id,
                 "nombre": cliente_item.nombre,
@@ -562,8 +657,10 @@ class DashboardView(APIView):
             for cliente_item in clientes_qs
         ]
 
+    def seccion_compras_pendientes(self, filtros):
+        compras_validas = self.querysets(filtros)[1]
         compras_pendientes_qs = compras_validas.filter(saldo_pendiente__gt=0).select_related("proveedor")
-        compras_pendientes_list = [
+        return [
             {
                 "id": compra.id,
                 "proveedor": compra.proveedor.nombre,
@@ -575,83 +672,314 @@ class DashboardView(APIView):
             for compra in compras_pendientes_qs
         ]
 
+    def condiciones_resumen(self, filtros):
+        # Los filtros del dashboard como condiciones sobre ResumenDiario, por tipo
+        ventas = Q(tipo="venta")
+        cobros = Q(tipo="cobro")
+        if filtros["cliente"]:
+            ventas &= Q(contacto_id=filtros["cliente"])
+            cobros &= Q(contacto_id=filtros["cliente"])
+        compras = Q(tipo="compra")
+        pagos = Q(tipo="pago")
+        if filtros["proveedor"]:
+            compras &= Q(contacto_id=filtros["proveedor"])
+            pagos &= Q(contacto_id=filtros["proveedor"])
+        if filtros["forma_pago"]:
+            ventas &= Q(forma_pago=filtros["forma_pago"])
+            compras &= Q(forma_pago=filtros["forma_pago"])
+        if filtros["estado_cobro"]:
+            ventas &= Q(estado=filtros["estado_cobro"])
+        if filtros["estado_pago"]:
+            compras &= Q(estado=filtros["estado_pago"])
+        return ventas, compras, cobros, pagos
+
+    def totales_resumen(self, filtros):
+        resumen = ResumenDiario.objects.all()
+        if filtros["fecha_desde"]:
+            resumen = resumen.filter(fecha__gte=filtros["fecha_desde"])
+        if filtros["fecha_hasta"]:
+            resumen = resumen.filter(fecha__lte=filtros["fecha_hasta"])
+        ventas, compras, cobros, pagos = self.condiciones_resumen(filtros)
+
+        data = resumen.aggregate(
+            ventas_totales=Sum("total", filter=ventas),
+            ventas_cobradas=Sum("total", filter=ventas & Q(estado="cobrado")),
+            ventas_parciales=Sum("total", filter=ventas & Q(estado="parcial")),
+            ventas_pendientes=Sum("total", filter=ventas & Q(estado="pendiente")),
+            deuda_clientes=Sum("saldo", filter=ventas & Q(saldo__gt=0)),
+            compras_totales=Sum("total", filter=compras),
+            compras_pagadas=Sum("total", filter=compras & Q(estado="pagado")),
+            compras_parciales=Sum("total", filter=compras & Q(estado="parcial")),
+            compras_pendientes=Sum("total", filter=compras & Q(estado="pendiente")),
+            deuda_proveedores=Sum("saldo", filter=compras & Q(saldo__gt=0)),
+            ingresos_caja=Sum("total", filter=cobros),
+            ingresos_efectivo=Sum("efectivo", filter=cobros),
+            ingresos_transferencia=Sum("transferencia", filter=cobros),
+            egresos_caja=Sum("total", filter=pagos),
+        )
+        return {clave: valor or Decimal("0") for clave, valor in data.items()}
+
+    def totales_documentos(self, ventas_validas, compras_validas, cobros_qs, pagos_qs):
+        # Una query por entidad: cada tarjeta es un Sum con filter=Q(...)
+        ventas_data = ventas_validas.aggregate(
+            facturado=Sum("total"),
+            cobradas=Sum("total", filter=Q(estado_cobro="cobrado")),
+            parciales=Sum("total", filter=Q(estado_cobro="parcial")),
+            pendientes=Sum("total", filter=Q(estado_cobro="pendiente")),
+            deuda=Sum("saldo_pendiente", filter=Q(saldo_pendiente__gt=0)),
+        )
+        compras_data = compras_validas.aggregate(
+            facturado=Sum("total"),
+            pagadas=Sum("total", filter=Q(estado_pago="pagado")),
+            parciales=Sum("total", filter=Q(estado_pago="parcial")),
+            pendientes=Sum("total", filter=Q(estado_pago="pendiente")),
+            deuda=Sum("saldo_pendiente", filter=Q(saldo_pendiente__gt=0)),
+        )
+
+        # Los cobros sin medios de pago (legado) se cuentan por su medio_pago
+        cobros_data = cobros_qs.annotate(
+            con_medios=Exists(CobrosMedioPago.objects.filter(cobro=OuterRef("pk")))
+        ).aggregate(
+            total=Sum("monto"),
+            legado_efectivo=Sum("monto", filter=Q(con_medios=False, medio_pago="efectivo")),
+            legado_transferencia=Sum("monto", filter=Q(con_medios=False, medio_pago="transferencia")),
+        )
+        cobros_medios_data = CobrosMedioPago.objects.filter(cobro__in=cobros_qs).aggregate(
+            efectivo=Coalesce(Sum("monto", filter=Q(medio_pago="efectivo")), Decimal("0")),
+            transferencia=Coalesce(Sum("monto", filter=Q(medio_pago="transferencia")), Decimal("0")),
+        )
+
+        return {
+            "ventas_totales": ventas_data["facturado"] or Decimal("0"),
+            "ventas_cobradas": ventas_data["cobradas"] or Decimal("0"),
+            "ventas_parciales": ventas_data["parciales"] or Decimal("0"),
+            "ventas_pendientes": ventas_data["pendientes"] or Decimal("0"),
+            "compras_totales": compras_data["facturado"] or Decimal("0"),
+            "compras_pagadas": compras_data["pagadas"] or Decimal("0"),
+            "compras_parciales": compras_data["parciales"] or Decimal("0"),
+            "compras_pendientes": compras_data["pendientes"] or Decimal("0"),
+            "ingresos_caja": cobros_data["total"] or Decimal("0"),
+            "ingresos_efectivo": (
+                cobros_medios_data["efectivo"] + (cobros_data["legado_efectivo"] or Decimal("0"))
+            ),
+            "ingresos_transferencia": (
+                cobros_medios_data["transferencia"] + (cobros_data["legado_transferencia"] or Decimal("0"))
+            ),
+            "egresos_caja": pagos_qs.aggregate(total=Sum("monto")).get("total") or Decimal("0"),
+            "deuda_clientes": ventas_data["deuda"] or Decimal("0"),
+            "deuda_proveedores": compras_data["deuda"] or Decimal("0"),
+        }
+
+
+
+# Series del dashboard
+#
+# GET /api/dashboard/series/?granularity=day|week|month con los mismos filtros
+# que el dashboard. Sin fecha_desde se toman los ultimos PERIODOS_POR_DEFECTO
+# periodos hasta fecha_hasta (u hoy). Una sola query trae el periodo pedido y
+# el anterior; los periodos sin movimientos se completan con cero.
+
+class DashboardSeriesView(DashboardView):
+    truncar = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+    def get(self, request):
+        filtros = self.get_filtros(request.query_params)
+        granularidad = request.query_params.get("granularity", "day")
+        if granularidad not in GRANULARIDADES:
+            raise ValidationError(f"granularity debe ser uno de: {', '.join(GRANULARIDADES)}.")
         hoy = timezone.localdate()
-        ventas_vencimientos = ventas_validas.filter(
-            saldo_pendiente__gt=0, vencimiento__isnull=False
+        clave = {**filtros, "series": granularidad}
+        data = dashboard_cacheado(clave, hoy, lambda: self.calcular_series(filtros, granularidad, hoy))
+        return Response(data)
+
+    def agrupar(self, queryset, campo_fecha, granularidad, desde, sumas):
+        return (
+            queryset
+            .annotate(
+                periodo=self.truncar[granularidad](campo_fecha, output_field=DateField()),
+                actual=Case(
+                    When(**{f"{campo_fecha}__gte": desde}, then=Value(True)),
+                    default=Value(False),
+                    output_field=BooleanField(),
+                ),
+            )
+            .values("periodo", "actual")
+            .annotate(**sumas)
+            .order_by()
         )
-        if cliente:
-            ventas_vencimientos = ventas_vencimientos.filter(cliente_id=cliente)
-        if fecha_desde_date:
-            ventas_vencimientos = ventas_vencimientos.filter(fecha_venta__gte=fecha_desde_date)
-        if fecha_hasta_date:
-            ventas_vencimientos = ventas_vencimientos.filter(fecha_venta__lte=fecha_hasta_date)
 
-        def resumen_vencimientos(qs):
-            data = qs.aggregate(
-                cantidad=Count("id"),
-                saldo=Sum("saldo_pendiente"),
+    def calcular_series(self, filtros, granularidad, hoy):
+        hasta = filtros["fecha_hasta"] or hoy
+        desde = filtros["fecha_desde"] or sumar_periodos(
+            inicio_periodo(hasta, granularidad), granularidad, 1 - PERIODOS_POR_DEFECTO[granularidad]
+        )
+        if desde > hasta:
+            raise ValidationError("fecha_desde no puede ser posterior a fecha_hasta.")
+        actuales = periodos(desde, hasta, granularidad)
+        if len(actuales) > MAXIMO_PERIODOS:
+            raise ValidationError(f"El rango pedido supera los {MAXIMO_PERIODOS} periodos.")
+
+        cantidad = len(actuales)
+        anterior_desde = sumar_periodos(desde, granularidad, -cantidad)
+        anterior_hasta = sumar_periodos(hasta, granularidad, -cantidad)
+
+        def en_rangos(campo):
+            return (
+                Q(**{f"{campo}__gte": desde, f"{campo}__lte": hasta})
+                | Q(**{f"{campo}__gte": anterior_desde, f"{campo}__lte": anterior_hasta})
             )
+
+        ventas, compras, cobros, pagos = self.condiciones_resumen(filtros)
+        sumas = {
+            "ventas": Sum("total", filter=ventas),
+            "compras": Sum("total", filter=compras),
+            "cobros": Sum("total", filter=cobros),
+            "pagos": Sum("total", filter=pagos),
+        }
+        if filtros["medio_pago"]:
+            # El medio de pago no esta en ResumenDiario: cobros y pagos salen de los documentos
+            del sumas["cobros"], sumas["pagos"]
+        filas = list(self.agrupar(
+            ResumenDiario.objects.filter(en_rangos("fecha")), "fecha", granularidad, desde, sumas
+        ))
+        if filtros["medio_pago"]:
+            _, _, cobros_qs, pagos_qs = self.querysets({**filtros, "fecha_desde": None, "fecha_hasta": None})
+            for nombre, queryset, campo_fecha in (
+                ("cobros", cobros_qs, "fecha_cobro"),
+                ("pagos", pagos_qs, "fecha_pago"),
+            ):
+                # pk__in evita sumar dos veces un movimiento con varios medios de pago
+                movimientos = queryset.model.objects.filter(
+                    en_rangos(campo_fecha), pk__in=queryset.values("pk")
+                )
+                filas.extend(self.agrupar(
+                    movimientos, campo_fecha, granularidad, desde, {nombre: Sum("monto")}
+                ))
+
+        valores = defaultdict(dict)
+        for fila in filas:
+            clave = (fila.pop("periodo"), fila.pop("actual"))
+            valores[clave].update(fila)
+
+        def montos(periodo, actual):
+            fila = valores.get((periodo, actual), {})
             return {
-                "cantidad": data.get("cantidad") or 0,
-                "saldo": str(data.get("saldo") or Decimal("0")),
+                nombre: str(fila.get(nombre) or Decimal("0"))
+                for nombre in ("ventas", "compras", "cobros", "pagos")
             }
 
-        documentos_por_vencer = {
-            "hoy": resumen_vencimientos(ventas_vencimientos.filter(vencimiento=hoy)),
-            "proximos_7_dias": resumen_vencimientos(
-                ventas_vencimientos.filter(vencimiento__gt=hoy, vencimiento__lte=hoy + timedelta(days=7))
-            ),
-            "proximos_30_dias": resumen_vencimientos(
-                ventas_vencimientos.filter(vencimiento__gt=hoy + timedelta(days=7), vencimiento__lte=hoy + timedelta(days=30))
-            ),
+        series = []
+        for periodo in actuales:
+            anterior = sumar_periodos(periodo, granularidad, -cantidad)
+            series.append({
+                "periodo": periodo,
+                **montos(periodo, True),
+                "anterior": {"periodo": anterior, **montos(anterior, False)},
+            })
+
+        return {
+            "granularity": granularidad,
+            "filters": filtros,
+            "periodo": {"desde": desde, "hasta": hasta},
+            "periodo_anterior": {"desde": anterior_desde, "hasta": anterior_hasta},
+            "series": series,
         }
 
-        documentos_vencidos = resumen_vencimientos(ventas_vencimientos.filter(vencimiento__lt=hoy))
-
-        response = {
-            "filters": {
-                "fecha_desde": fecha_desde_date,
-                "fecha_hasta": fecha_hasta_date,
-                "cliente": cliente,
-                "proveedor": proveedor,
-                "forma_pago": forma_pago,
-                "estado_cobro": estado_cobro,
-                "estado_pago": estado_pago,
-                "medio_pago": medio_pago,
-            },
-            "cards": {
-                "ventas_totales": {
-                    "total": str(ventas_totales),
-                    "cobradas": str(ventas_cobradas),
-                    "parciales": str(ventas_parciales),
-                    "pendientes": str(ventas_pendientes),
-                },
-                "compras_totales": {
-                    "total": str(compras_totales),
-                    "pagadas": str(compras_pagadas),
-                    "parciales": str(compras_parciales),
-                    "pendientes": str(compras_pendientes),
-                },
-                "ganancia_bruta": str(ganancia_bruta),
-                "margen_bruto": str(margen_bruto),
-                "ingresos_caja": {
-                    "total": str(ingresos_caja),
-                    "por_medio_pago": {
-                        "efectivo": str(ingresos_efectivo),
-                        "transferencia": str(ingresos_transferencia),
-                    },
-                },
-                "egresos_caja": {
-                    "total": str(egresos_caja),
-                },
-                "flujo_neto": str(flujo_neto),
-                "deuda_clientes": str(deuda_clientes),
-                "deuda_proveedores": str(deuda_proveedores),
-            },
-            "clientes_con_deuda": clientes_con_deuda,
-            "compras_pendientes": compras_pendientes_list,
-            "documentos_por_vencer": documentos_por_vencer,
-            "documentos_vencidos": documentos_vencidos,
+# Autocompletado
+#
+# GET /api/autocomplete/{contactos,productos}/?q=...&limit=10 responde desde el
+# indice de prefijos del proceso (core.autocompletado), sin consultar la base
+# mientras el catalogo no cambie.
+
+class AutocompletadoView(APIView):
+    limite_por_defecto = 10
+    limite_maximo = 50
+
+    def get_limite(self, params):
+        try:
+            limite = int(params.get('limit', self.limite_por_defecto))
+        except ValueError:
+            return self.limite_por_defecto
+        return max(1, min(limite, self.limite_maximo))
+
+    def get(self, request, catalogo):
+        if catalogo not in CATALOGOS:
+            return Response({"detail": "Catalogo inexistente."}, status=404)
+
+        params = request.query_params
+        indice = obtener_indice(catalogo)
+        resultados = indice.buscar(
+            params.get('q', ''),
+            self.get_limite(params),
+            filtro=CATALOGOS[catalogo].filtro(params),
+        )
+        return Response(resultados)
+
+
+# Batch
+#
+# POST /api/batch/ con {"requests": ["/contactos/?tipo=cliente", "/dashboard/"]}
+# ejecuta cada GET en el mismo proceso, pasando por el router y los permisos de
+# cada vista, con el usuario ya autenticado de la request principal.
+
+class BatchView(APIView):
+    prefijo_api = "/api/"
+
+    def normalizar_ruta(self, ruta):
+        partes = urlsplit(ruta)
+        path = partes.path
+        if not path.startswith(self.prefijo_api):
+            path = self.prefijo_api + path.lstrip("/")
+        return path, partes.query
+
+    def sub_request(self, request, path, query):
+        sub = HttpRequest()
+        sub.method = "GET"
+        sub.path = sub.path_info = path
+        sub.META = {
+            clave: valor
+            for clave, valor in request.META.items()
+            if clave not in ("CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
         }
+        sub.META.update({
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "HTTP_ACCEPT": "application/json",
+        })
+        sub.GET = QueryDict(query)
+        sub.COOKIES = request.COOKIES
+        sub.user = request.user
+        # DRF usa ForcedAuthentication si encuentra estos atributos
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+        return sub
+
+    def ejecutar(self, request, ruta):
+        path, query = self.normalizar_ruta(ruta)
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return {"path": ruta, "status": 404, "body": {"detail": "No encontrado."}}
+        if getattr(match.func, "view_class", None) is type(self):
+            return {"path": ruta, "status": 400, "body": {"detail": "No se permite anidar batch."}}
+
+        response = match.func(self.sub_request(request, path, query), *match.args, **match.kwargs)
+        if response.streaming or not hasattr(response, "data"):
+            return {"path": ruta, "status": 400, "body": {"detail": "Respuesta no soportada en batch."}}
+
+        resultado = {"path": ruta, "status": response.status_code, "body": response.data}
+        if response.has_header("ETag"):
+            resultado["etag"] = response["ETag"]
+        return resultado
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        return Response(response)
+        return Response({
+            "responses": [
+                self.ejecutar(request, ruta)
+                for ruta in serializer.validated_data["requests"]
+            ],
+        })
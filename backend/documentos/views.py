@@ -1,12 +1,14 @@
 from pathlib import Path
+from datetime import date
 from decimal import Decimal
 
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, render
 from django.template import TemplateDoesNotExist
 from django.template.loader import get_template
 
 from core.models import Cobros, Contactos, Ventas
+from core.servicios.saldos_mensuales import saldo_cuenta_corriente_al_inicio
 from documentos.services.pdf_generator import generar_pdf
 
 
@@ -82,30 +84,29 @@ def _build_factura_context(venta, user):
     }
 
 
+def _fechas_cuenta_corriente(request):
+    fechas = (request.GET.get("fecha_desde") or None, request.GET.get("fecha_hasta") or None)
+    for fecha in fechas:
+        if fecha:
+            date.fromisoformat(fecha)
+    return fechas
+
+
 def _build_cuenta_corriente_context(cliente, fecha_desde=None, fecha_hasta=None):
     ventas_qs = Ventas.objects.filter(cliente=cliente).exclude(estado_venta="cancelada")
     cobros_qs = Cobros.objects.filter(cliente=cliente)
 
+    saldo_inicial = Decimal("0")
     if fecha_desde:
-        ventas_anteriores = ventas_qs.filter(fecha_venta__lt=fecha_desde)
-        cobros_anteriores = cobros_qs.filter(fecha_cobro__lt=fecha_desde)
-    else:
-        ventas_anteriores = ventas_qs.none()
-        cobros_anteriores = cobros_qs.none()
-
-    if fecha_desde:
+        # Ultimo cierre mensual anterior + ventas y cobros del mes hasta fecha_desde
+        desde = fecha_desde if isinstance(fecha_desde, date) else date.fromisoformat(fecha_desde)
+        saldo_inicial = saldo_cuenta_corriente_al_inicio(cliente, desde)
         ventas_qs = ventas_qs.filter(fecha_venta__gte=fecha_desde)
         cobros_qs = cobros_qs.filter(fecha_cobro__gte=fecha_desde)
     if fecha_hasta:
         ventas_qs = ventas_qs.filter(fecha_venta__lte=fecha_hasta)
         cobros_qs = cobros_qs.filter(fecha_cobro__lte=fecha_hasta)
 
-    saldo_inicial = Decimal("0")
-    for venta in ventas_anteriores:
-        saldo_inicial += venta.total or Decimal("0")
-    for cobro in cobros_anteriores:
-        saldo_inicial -= cobro.monto or Decimal("0")
-
     movimientos = [
         *[
             {
@@ -175,16 +176,20 @@ def factura_venta_pdf(request, venta_id):
 
 def cuenta_corriente_cliente_html(request, cliente_id):
     cliente = get_object_or_404(Contactos.objects.filter(tipo="cliente"), pk=cliente_id)
-    fecha_desde = request.GET.get("fecha_desde") or None
-    fecha_hasta = request.GET.get("fecha_hasta") or None
+    try:
+        fecha_desde, fecha_hasta = _fechas_cuenta_corriente(request)
+    except ValueError:
+        return HttpResponseBadRequest("Formato de fecha invalido. Usa YYYY-MM-DD.")
     context = _build_cuenta_corriente_context(cliente, fecha_desde, fecha_hasta)
     return render(request, "documentos/cuenta_corriente_cliente.html", context)
 
 
 def cuenta_corriente_cliente_pdf(request, cliente_id):
     cliente = get_object_or_404(Contactos.objects.filter(tipo="cliente"), pk=cliente_id)
-    fecha_desde = request.GET.get("fecha_desde") or None
-    fecha_hasta = request.GET.get("fecha_hasta") or None
+    try:
+        fecha_desde, fecha_hasta = _fechas_cuenta_corriente(request)
+    except ValueError:
+        return HttpResponseBadRequest("Formato de fecha invalido. Usa YYYY-MM-DD.")
     context = _build_cuenta_corriente_context(cliente, fecha_desde, fecha_hasta)
     pdf = generar_pdf("documentos/cuenta_corriente_cliente.html", context)
     filename = f"cuenta_corriente_cliente_{cliente.id}.pdf"
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -142,6 +143,16 @@ def _database_config():
 
 DATABASES = {"default": _database_config()}
 
+# Cache compartida por todos los workers: las versiones del dashboard y del
+# autocompletado (core.versiones) tienen que verse igual en cada proceso.
+# Tabla en la base, creada por la migracion core 0032 (createcachetable).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_compartida",
+    }
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
@@ -150,8 +161,14 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_PAGINATION_CLASS": "core.paginacion.KeysetPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "50")),
 }
 
+# Hilos para evaluar las secciones del dashboard en paralelo (0 = en serie).
+# Cada hilo mantiene abierta su conexion a la base, aparte de CONN_MAX_AGE.
+DASHBOARD_HILOS = int(os.getenv("DASHBOARD_HILOS", "0"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=8),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -1,7 +1,8 @@
 import { useEffect, useMemo, useState } from "react";
-import { getClientes } from "../services/api/clientes";
-import { getContactos } from "../services/api/contactos";
-import { getDashboard } from "../services/api/dashboard";
+import { getBatch } from "../services/api/batch";
+import { getClientesRequest } from "../services/api/clientes";
+import { getContactosRequest } from "../services/api/contactos";
+import { getDashboard, getDashboardPath } from "../services/api/dashboard";
 
 export const EMPTY_FILTERS = {
   fechaDesde: "",
@@ -53,6 +54,19 @@ export function safeRatio(value, total) {
   return toNumber(value) / parsedTotal;
 }
 
+function toDashboardParams(filters) {
+  return {
+    fecha_desde: filters.fechaDesde,
+    fecha_hasta: filters.fechaHasta,
+    cliente: filters.cliente,
+    proveedor: filters.proveedor,
+    forma_pago: filters.formaPago,
+    estado_cobro: filters.estadoCobro,
+    estado_pago: filters.estadoPago,
+    medio_pago: filters.medioPago,
+  };
+}
+
 export function useDashboardData(initialFilters = EMPTY_FILTERS) {
   const [clientes, setClientes] = useState([]);
   const [proveedores, setProveedores] = useState([]);
@@ -73,36 +87,11 @@ export function useDashboardData(initialFilters = EMPTY_FILTERS) {
     return undefined;
   }, [isFilterOpen]);
 
-  useEffect(() => {
-    const loadCombos = async () => {
-      try {
-        const [clientesData, proveedoresData] = await Promise.all([
-          getClientes(),
-          getContactos({ tipo: "proveedor" }),
-        ]);
-        setClientes(clientesData || []);
-        setProveedores(proveedoresData || []);
-      } catch (err) {
-        setError(err?.message || "No se pudieron cargar los filtros.");
-      }
-    };
-    loadCombos();
-  }, []);
-
   const loadDashboard = async (nextFilters = filters) => {
     setError("");
     setIsLoading(true);
     try {
-      const response = await getDashboard({
-        fecha_desde: nextFilters.fechaDesde,
-        fecha_hasta: nextFilters.fechaHasta,
-        cliente: nextFilters.cliente,
-        proveedor: nextFilters.proveedor,
-        forma_pago: nextFilters.formaPago,
-        estado_cobro: nextFilters.estadoCobro,
-        estado_pago: nextFilters.estadoPago,
-        medio_pago: nextFilters.medioPago,
-      });
+      const response = await getDashboard(toDashboardParams(nextFilters));
       setData(response);
     } catch (err) {
       setError(err?.message || "No se pudo cargar el dashboard.");
@@ -112,7 +101,31 @@ export function useDashboardData(initialFilters = EMPTY_FILTERS) {
   };
 
   useEffect(() => {
-    loadDashboard(initialFilters);
+    // Combos y dashboard en un solo round trip; los clientes salen de la cache si estan.
+    const loadInitial = async () => {
+      setError("");
+      setIsLoading(true);
+      try {
+        const [clientesResult, proveedoresResult, dashboardResult] = await getBatch([
+          { ...getClientesRequest(), useCache: true },
+          getContactosRequest({ tipo: "proveedor" }),
+          getDashboardPath(toDashboardParams(initialFilters)),
+        ]);
+        setClientes(clientesResult.data || []);
+        setProveedores(proveedoresResult.data || []);
+        setData(dashboardResult.data);
+        if (dashboardResult.error) {
+          setError(dashboardResult.error.message || "No se pudo cargar el dashboard.");
+        } else if (clientesResult.error || proveedoresResult.error) {
+          setError("No se pudieron cargar los filtros.");
+        }
+      } catch (err) {
+        setError(err?.message || "No se pudo cargar el dashboard.");
+      } finally {
+        setIsLoading(false);
+      }
+    };
+    loadInitial();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
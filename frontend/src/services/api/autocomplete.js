@@ -0,0 +1,8 @@
+import { getJson } from "./base";
+
+export function getAutocomplete(catalogo, q, { tipo, limit } = {}) {
+  const params = new URLSearchParams({ q });
+  if (tipo) params.set("tipo", tipo);
+  if (limit) params.set("limit", String(limit));
+  return getJson(`/autocomplete/${catalogo}/?${params.toString()}`);
+}
@@ -0,0 +1,37 @@
+import { postJson } from "./base";
+import { getCache, setCache } from "./cache";
+
+// Cada pedido es un path o { path, key, useCache, persist, ttlMs }: con `key`
+// el resultado se lee de la cache si `useCache` y se guarda ahi al volver.
+// Devuelve { data, error } por pedido, en el mismo orden.
+export async function getBatch(requests) {
+  const items = requests.map((item) => (typeof item === "string" ? { path: item } : item));
+  const results = items.map((item) => {
+    if (!item.key || !item.useCache) return undefined;
+    const cached = getCache(item.key, { persist: item.persist });
+    return cached ? { data: cached, error: null } : undefined;
+  });
+  const pending = items.filter((_, index) => !results[index]);
+  if (!pending.length) return results;
+
+  const data = await postJson("/batch/", { requests: pending.map((item) => item.path) });
+  const responses = data?.responses || [];
+  let position = 0;
+  return results.map((result, index) => {
+    if (result) return result;
+    const item = items[index];
+    const response = responses[position];
+    position += 1;
+    if (!response || response.status >= 400) {
+      const body = response?.body;
+      return {
+        data: null,
+        error: new Error(body?.error || body?.detail || `Error ${response?.status ?? ""}`.trim()),
+      };
+    }
+    if (item.key) {
+      setCache(item.key, response.body, { persist: item.persist, ttlMs: item.ttlMs });
+    }
+    return { data: response.body, error: null };
+  });
+}
@@ -3,15 +3,24 @@ import { getCache, setCache } from "./cache";
 
 const DAY_MS = 24 * 60 * 60 * 1000;
 
-export async function getClientes({ nombre, useCache = true } = {}) {
+export function getClientesRequest({ nombre } = {}) {
   const params = new URLSearchParams({ tipo: "cliente" });
   if (nombre) params.set("nombre", nombre);
-  const key = `clientes:${params.toString()}`;
+  return {
+    path: `/contactos/?${params.toString()}`,
+    key: `clientes:${params.toString()}`,
+    persist: true,
+    ttlMs: DAY_MS,
+  };
+}
+
+export async function getClientes({ nombre, useCache = true } = {}) {
+  const { path, key, persist, ttlMs } = getClientesRequest({ nombre });
   if (useCache) {
-    const cached = getCache(key, { persist: true });
+    const cached = getCache(key, { persist });
     if (cached) return cached;
   }
-  const data = await getJson(`/contactos/?${params.toString()}`);
-  setCache(key, data, { persist: true, ttlMs: DAY_MS });
+  const data = await getJson(path);
+  setCache(key, data, { persist, ttlMs });
   return data;
 }
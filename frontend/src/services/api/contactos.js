@@ -1,19 +1,23 @@
 import { deleteJson, getJson, patchJson, postJson } from "./base";
 import { clearCache, getCache, setCache } from "./cache";
 
-export async function getContactos(
-  { tipo, nombre, useCache = false } = {}
-) {
+export function getContactosRequest({ tipo, nombre } = {}) {
   const params = new URLSearchParams();
   if (tipo) params.set("tipo", tipo);
   if (nombre) params.set("nombre", nombre);
   const query = params.toString();
-  const key = `contactos:${query}`;
+  return { path: `/contactos/${query ? `?${query}` : ""}`, key: `contactos:${query}` };
+}
+
+export async function getContactos(
+  { tipo, nombre, useCache = false } = {}
+) {
+  const { path, key } = getContactosRequest({ tipo, nombre });
   if (useCache) {
     const cached = getCache(key);
     if (cached) return cached;
   }
-  const data = await getJson(`/contactos/${query ? `?${query}` : ""}`);
+  const data = await getJson(path);
   setCache(key, data);
   return data;
 }
@@ -1,6 +1,6 @@
 import { getJson } from "./base";
 
-export function getDashboard(params = {}) {
+export function getDashboardPath(params = {}) {
   const searchParams = new URLSearchParams();
   if (params.fecha_desde) searchParams.set("fecha_desde", params.fecha_desde);
   if (params.fecha_hasta) searchParams.set("fecha_hasta", params.fecha_hasta);
@@ -11,5 +11,9 @@ export function getDashboard(params = {}) {
   if (params.estado_pago) searchParams.set("estado_pago", params.estado_pago);
   if (params.medio_pago) searchParams.set("medio_pago", params.medio_pago);
   const query = searchParams.toString();
-  return getJson(`/dashboard/${query ? `?${query}` : ""}`);
+  return `/dashboard/${query ? `?${query}` : ""}`;
+}
+
+export function getDashboard(params = {}) {
+  return getJson(getDashboardPath(params));
 }